@@ -0,0 +1,295 @@
+#!/usr/bin/env python
+"""Benchmark every API endpoint against generated datasets
+
+For each scale a SQLite database under benchmarks/data/ is migrated and
+filled once with generate_load_data (same seed, so the same ids and paths
+every run) and reused afterwards. Every URL in skillswap_app/urls.py is
+then requested through the Django test client (the requests are the ones
+audit_indexes EXPLAINs, plus the auth views) and reported with p50/p95/p99
+latency, queries per request, response bytes and peak traced memory.
+Writes run in a rolled-back transaction so each iteration sees the same
+data; the response cache is off unless --cache is given.
+
+Run from the backend/ folder:
+    python -m benchmarks.bench_endpoints [--users 1000] [--iterations 30] [--output results.json]
+    python -m benchmarks.bench_endpoints --scales 1000,100000,1000000 --output results.json
+    python -m benchmarks.bench_endpoints --compare before.json after.json [--threshold 0.2]
+
+--database-url benchmarks an existing database instead (it is not modified).
+"""
+import argparse
+import itertools
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+PREFIX = 'bench'
+PASSWORD = 'loadtest'
+STAFF_USERNAME = 'bench-staff'
+
+
+def percentile(samples, q):
+    """Nearest-rank percentile of a list of numbers"""
+    ordered = sorted(samples)
+    rank = max(1, -(-len(ordered) * q // 100))
+    return ordered[int(rank) - 1]
+
+
+def setup_django(database_url):
+    if database_url:
+        os.environ['DATABASE_URL'] = database_url
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'skillswap_project.settings')
+    import django
+    django.setup()
+
+
+def prepare(users):
+    """Migrate and fill the per-scale database if it is empty"""
+    from django.contrib.auth.models import User
+    from django.core.management import call_command
+
+    call_command('migrate', verbosity=0)
+    if not User.objects.filter(username__startswith=PREFIX).exists():
+        print(f'generating {users:,} users (once per scale)...', file=sys.stderr)
+        call_command('generate_load_data', users=users, seed=42, prefix=PREFIX, password=PASSWORD,
+                     stdout=sys.stderr)
+    User.objects.get_or_create(username=STAFF_USERNAME, defaults={'is_staff': True})
+
+
+def auth_scenarios(user):
+    """register/login/logout, each with a fresh anonymous client"""
+    from django.urls import reverse
+
+    counter = itertools.count()
+    yield 'POST', reverse('register'), lambda: {
+        'username': f'{PREFIX}-new-{next(counter)}', 'email': 'new@example.com', 'password': PASSWORD,
+    }
+    if user is not None and user.username.startswith(PREFIX):
+        yield 'POST', reverse('login'), {'username': user.username, 'password': PASSWORD}
+    yield 'POST', reverse('logout'), None
+
+
+def table_rows():
+    from skillswap_app.models import Profile, Skill, UserSkill, SwapRequest, Review
+
+    return {model._meta.db_table: model.objects.count()
+            for model in (Profile, Skill, UserSkill, SwapRequest, Review)}
+
+
+class Runner:
+    def __init__(self, iterations, warmup):
+        self.iterations = iterations
+        self.warmup = warmup
+
+    def request(self, client, method, path, body):
+        """One request in a transaction that is always rolled back"""
+        from django.db import transaction
+
+        if callable(body):
+            body = body()
+        with transaction.atomic():
+            if method == 'GET':
+                response = client.get(path)
+            else:
+                response = client.generic(method, path, json.dumps(body) if body is not None else '',
+                                          content_type='application/json')
+            transaction.set_rollback(True)
+        return response
+
+    def measure(self, client, method, path, body):
+        from django.db import connection, reset_queries
+        from django.test.utils import CaptureQueriesContext
+
+        for _ in range(self.warmup):
+            self.request(client, method, path, body)
+
+        latencies = []
+        for _ in range(self.iterations):
+            started = time.perf_counter()
+            self.request(client, method, path, body)
+            latencies.append((time.perf_counter() - started) * 1000)
+
+        # Query capture and tracemalloc both slow requests down, so they get
+        # their own passes outside the timed loop
+        reset_queries()  # request_started clears the log; start the capture at 0
+        with CaptureQueriesContext(connection) as captured:
+            response = self.request(client, method, path, body)
+        tracemalloc.start()
+        self.request(client, method, path, body)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        return {
+            'status': response.status_code,
+            'p50_ms': round(percentile(latencies, 50), 3),
+            'p95_ms': round(percentile(latencies, 95), 3),
+            'p99_ms': round(percentile(latencies, 99), 3),
+            'mean_ms': round(sum(latencies) / len(latencies), 3),
+            'queries': len(captured.captured_queries),
+            'bytes': len(response.content),
+            'peak_memory_kb': round(peak / 1024, 1),
+        }
+
+    def run(self, user, staff):
+        from django.test import Client
+        from django.urls import resolve
+        from skillswap_app.management.commands.audit_indexes import request_scenarios, staff_scenarios
+
+        user_client = Client()
+        user_client.force_login(user)
+        plan = [(user_client, scenario) for scenario in request_scenarios(user)]
+        if staff is not None:
+            staff_client = Client()
+            staff_client.force_login(staff)
+            plan += [(staff_client, scenario) for scenario in staff_scenarios()]
+        plan += [(None, scenario) for scenario in auth_scenarios(user)]
+
+        results = {}
+        covered = set()
+        for client, (method, path, body) in plan:
+            covered.add(resolve(path.split('?')[0]).url_name)
+            label = f'{method} {path}'
+            result = self.measure(client or Client(), method, path, body)
+            results[label] = result
+            print(f'{label:<60} {result["status"]:>3} p50 {result["p50_ms"]:>8.2f}ms '
+                  f'p95 {result["p95_ms"]:>8.2f}ms p99 {result["p99_ms"]:>8.2f}ms '
+                  f'{result["queries"]:>3}q {result["bytes"]:>8}B {result["peak_memory_kb"]:>8.1f}KB')
+        return results, covered
+
+
+def run_scale(args):
+    database_url = args.database_url
+    if not database_url:
+        os.makedirs(DATA_DIR, exist_ok=True)
+        database_url = f'sqlite:///{os.path.join(DATA_DIR, f"bench-{args.users}.sqlite3")}'
+    setup_django(database_url)
+
+    from django.conf import settings
+    from django.contrib.auth.models import User
+    from django.db import connection
+    from django.test.utils import override_settings
+    from skillswap_app import urls
+
+    if not args.database_url:
+        prepare(args.users)
+    # Someone with sent, completed and received requests, so every view has ids to work with
+    user = (User.objects.filter(username__startswith=PREFIX, sent_requests__status='completed',
+                                received_requests__isnull=False).order_by('id').first()
+            or User.objects.filter(is_staff=False).order_by('id').first())
+    if user is None:
+        sys.exit('No users to benchmark as')
+    staff = User.objects.filter(is_staff=True).order_by('id').first()
+
+    with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'],
+                           RESPONSE_CACHE_ENABLED=args.cache):
+        results, covered = Runner(args.iterations, args.warmup).run(user, staff)
+
+    missing = sorted({pattern.name for pattern in urls.urlpatterns} - covered)
+    if missing:
+        print(f'warning: no benchmark for {", ".join(missing)}', file=sys.stderr)
+    return {
+        'meta': {
+            'users': args.users,
+            'vendor': connection.vendor,
+            'rows': table_rows(),
+            'iterations': args.iterations,
+            'cache': args.cache,
+            'as_user': user.username,
+        },
+        'endpoints': results,
+    }
+
+
+def run_scales(args):
+    """One subprocess per scale, so every scale gets its own settings and database"""
+    scales = {}
+    for users in [int(value) for value in args.scales.split(',')]:
+        with tempfile.NamedTemporaryFile(suffix='.json', delete=False) as handle:
+            output = handle.name
+        command = [sys.executable, '-m', 'benchmarks.bench_endpoints', '--users', str(users),
+                   '--iterations', str(args.iterations), '--warmup', str(args.warmup), '--output', output]
+        if args.cache:
+            command.append('--cache')
+        print(f'\n== {users:,} users ==')
+        try:
+            subprocess.run(command, check=True)
+            with open(output) as handle:
+                scales.update(json.load(handle)['scales'])
+        finally:
+            os.unlink(output)
+    return scales
+
+
+def compare(before_path, after_path, threshold, min_ms):
+    """Print per-endpoint changes; returns the number of regressions"""
+    with open(before_path) as handle:
+        before = json.load(handle)['scales']
+    with open(after_path) as handle:
+        after = json.load(handle)['scales']
+
+    regressions = 0
+    for scale in sorted(set(before) & set(after), key=int):
+        print(f'\n== {int(scale):,} users ==')
+        old_endpoints, new_endpoints = before[scale]['endpoints'], after[scale]['endpoints']
+        for label in sorted(set(old_endpoints) & set(new_endpoints)):
+            old, new = old_endpoints[label], new_endpoints[label]
+            problems = []
+            for key in ('p50_ms', 'p95_ms'):
+                if new[key] - old[key] > max(old[key] * threshold, min_ms):
+                    problems.append(f'{key} {old[key]:.2f} -> {new[key]:.2f}')
+            if new['queries'] > old['queries']:
+                problems.append(f'queries {old["queries"]} -> {new["queries"]}')
+            if new['status'] != old['status']:
+                problems.append(f'status {old["status"]} -> {new["status"]}')
+            change = (new['p50_ms'] - old['p50_ms']) / old['p50_ms'] * 100 if old['p50_ms'] else 0.0
+            mark = 'REGRESSION' if problems else 'ok'
+            print(f'{mark:<10} {label:<60} p50 {change:+6.1f}%  {"; ".join(problems)}')
+            regressions += bool(problems)
+        for label in sorted(set(old_endpoints) - set(new_endpoints)):
+            print(f'{"gone":<10} {label}')
+        for label in sorted(set(new_endpoints) - set(old_endpoints)):
+            print(f'{"new":<10} {label}')
+    print(f'\n{regressions} regressions (threshold {threshold:.0%}, min {min_ms}ms)')
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--users', type=int, default=1000, help='Dataset scale (generated users)')
+    parser.add_argument('--scales', help='Comma-separated user counts, e.g. 1000,100000,1000000')
+    parser.add_argument('--database-url', help='Benchmark this existing database instead')
+    parser.add_argument('--iterations', type=int, default=30)
+    parser.add_argument('--warmup', type=int, default=3)
+    parser.add_argument('--cache', action='store_true', help='Leave the response cache on')
+    parser.add_argument('--output', help='Write the results as JSON')
+    parser.add_argument('--compare', nargs=2, metavar=('BEFORE', 'AFTER'), help='Diff two result files')
+    parser.add_argument('--threshold', type=float, default=0.2, help='Relative latency increase that fails')
+    parser.add_argument('--min-ms', type=float, default=0.5, help='Ignore latency changes smaller than this')
+    args = parser.parse_args()
+
+    if args.compare:
+        sys.exit(1 if compare(*args.compare, args.threshold, args.min_ms) else 0)
+
+    if args.scales:
+        scales = run_scales(args)
+    else:
+        result = run_scale(args)
+        scales = {str(args.users): result}
+    if args.output:
+        with open(args.output, 'w') as handle:
+            json.dump({
+                'created_at': datetime.now(timezone.utc).isoformat(),
+                'python': sys.version.split()[0],
+                'scales': scales,
+            }, handle, indent=2)
+        print(f'results written to {args.output}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python
+"""Benchmark for the geohash radius search
+
+Generates synthetic profiles (clustered around cities, plus a uniform
+background), loads them into a stdlib sqlite3 table with the same columns
+and index as the profiles table, and compares the query Profile.objects.
+within_radius() issues (geohash range scans + lat/lon box, exact distance
+on candidates only) against a full scan that computes every distance.
+
+Run from the backend/ folder:
+    python -m benchmarks.bench_geo [--profiles 1000000] [--queries 200] [--radius 10]
+"""
+import argparse
+import math
+import random
+import sqlite3
+import time
+
+from skillswap_app import geo
+
+CITIES = [
+    (19.076, 72.878), (28.614, 77.209), (12.972, 77.595), (18.520, 73.857), (13.083, 80.271),
+    (22.573, 88.364), (17.385, 78.487), (51.507, -0.128), (40.713, -74.006), (37.775, -122.419),
+    (48.857, 2.352), (52.520, 13.405), (35.690, 139.692), (-33.869, 151.209), (-23.551, -46.633),
+    (1.352, 103.820), (55.756, 37.617), (30.044, 31.236), (-1.292, 36.822), (64.147, -21.942),
+]
+
+
+def synthetic_points(count, seed=42):
+    """90% within ~30 km of a city, 10% anywhere"""
+    rng = random.Random(seed)
+    for user_id in range(1, count + 1):
+        if rng.random() < 0.9:
+            lat, lon = rng.choice(CITIES)
+            lat = min(max(lat + rng.gauss(0, 0.15), -90.0), 90.0)
+            lon = (lon + rng.gauss(0, 0.15) / max(0.05, math.cos(math.radians(lat))) + 180) % 360 - 180
+        else:
+            lat = math.degrees(math.asin(rng.uniform(-1, 1)))
+            lon = rng.uniform(-180, 180)
+        yield user_id, lat, lon, geo.encode(lat, lon)
+
+
+def build_table(count):
+    db = sqlite3.connect(':memory:')
+    db.execute('CREATE TABLE profiles (user_id INTEGER PRIMARY KEY, latitude REAL, longitude REAL, geohash INTEGER)')
+    started = time.perf_counter()
+    db.executemany('INSERT INTO profiles VALUES (?, ?, ?, ?)', synthetic_points(count))
+    db.execute('CREATE INDEX profiles_geohash ON profiles (geohash)')
+    db.commit()
+    print(f'loaded {count:,} profiles in {time.perf_counter() - started:.1f}s')
+    return db
+
+
+def indexed_query(lat, lon, radius_km):
+    """Same SQL shape as ProfileManager.within_radius"""
+    ranges = geo.covering_ranges(lat, lon, radius_km)
+    min_lat, max_lat, min_lon, max_lon = geo.bounding_box(lat, lon, radius_km)
+    sql = ('SELECT user_id, latitude, longitude FROM profiles WHERE ('
+           + ' OR '.join(['(geohash >= ? AND geohash < ?)'] * len(ranges))
+           + ') AND latitude >= ? AND latitude <= ?')
+    params = [bound for pair in ranges for bound in pair] + [min_lat, max_lat]
+    if min_lon is not None:
+        sql += ' AND longitude >= ? AND longitude <= ?'
+        params += [min_lon, max_lon]
+    return sql, params
+
+
+def search_indexed(db, lat, lon, radius_km):
+    sql, params = indexed_query(lat, lon, radius_km)
+    rows = db.execute(sql, params).fetchall()
+    matches = {user_id for user_id, p_lat, p_lon in rows
+               if geo.haversine_km(lat, lon, p_lat, p_lon) <= radius_km}
+    return matches, len(rows)
+
+
+def search_full_scan(db, lat, lon, radius_km):
+    rows = db.execute('SELECT user_id, latitude, longitude FROM profiles').fetchall()
+    return {user_id for user_id, p_lat, p_lon in rows
+            if geo.haversine_km(lat, lon, p_lat, p_lon) <= radius_km}, len(rows)
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--profiles', type=int, default=1_000_000)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--radius', type=float, default=10.0, help='Search radius in km')
+    parser.add_argument('--full-scans', type=int, default=3,
+                        help='Full-scan queries to run for comparison (they are slow)')
+    args = parser.parse_args()
+
+    db = build_table(args.profiles)
+    rng = random.Random(7)
+    centres = []
+    for _ in range(args.queries):
+        lat, lon = rng.choice(CITIES)
+        centres.append((lat + rng.gauss(0, 0.1), lon + rng.gauss(0, 0.1)))
+
+    sql, params = indexed_query(*centres[0], args.radius)
+    plan = db.execute('EXPLAIN QUERY PLAN ' + sql, params).fetchall()
+    print('query plan: ' + '; '.join(row[-1] for row in plan))
+
+    timings, examined, found = [], [], []
+    for lat, lon in centres:
+        started = time.perf_counter()
+        matches, candidates = search_indexed(db, lat, lon, args.radius)
+        timings.append(time.perf_counter() - started)
+        examined.append(candidates)
+        found.append(len(matches))
+    print(f'\nindexed ({args.queries} queries, radius {args.radius:g} km)')
+    print(f'  p50 {percentile(timings, 50) * 1000:8.2f} ms   p95 {percentile(timings, 95) * 1000:8.2f} ms')
+    print(f'  distances computed per query: avg {sum(examined) / len(examined):,.0f} '
+          f'({sum(examined) / len(examined) / args.profiles:.3%} of profiles), '
+          f'matches avg {sum(found) / len(found):,.0f}')
+
+    if args.full_scans:
+        print(f'\nfull scan ({args.full_scans} queries)')
+        scan_timings = []
+        for lat, lon in centres[:args.full_scans]:
+            started = time.perf_counter()
+            expected, _ = search_full_scan(db, lat, lon, args.radius)
+            scan_timings.append(time.perf_counter() - started)
+            assert expected == search_indexed(db, lat, lon, args.radius)[0], 'indexed search missed profiles'
+        scan = sum(scan_timings) / len(scan_timings)
+        print(f'  avg {scan * 1000:8.2f} ms   (indexed p50 is {scan / percentile(timings, 50):,.0f}x faster)')
+
+
+if __name__ == '__main__':
+    main()
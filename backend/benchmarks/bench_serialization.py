@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+"""Micro-benchmark for JSON response serialization
+
+Compares the old JsonResponse path (stdlib json + DjangoJSONEncoder with an
+isoformat() call per datetime) against FastJsonResponse with orjson and with
+its stdlib fallback, on payloads shaped like the real endpoints.
+
+Run from the backend/ folder:
+    python -m benchmarks.bench_serialization [--teachers 5000] [--repeat 20]
+"""
+import argparse
+import os
+import random
+import timeit
+from datetime import datetime, timedelta, timezone
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'skillswap_project.settings')
+django.setup()
+
+from django.http import JsonResponse
+from skillswap_app import responses
+from skillswap_app.responses import FastJsonResponse
+
+
+def browse_payload(teachers, teachers_per_skill=25):
+    """Shape of browse_skills: skills with nested teacher lists"""
+    rng = random.Random(42)
+    skills = []
+    for skill_id in range(max(1, teachers // teachers_per_skill)):
+        skills.append({
+            'id': skill_id,
+            'name': f'Skill {skill_id}',
+            'category': f'Category {skill_id % 12}',
+            'description': 'Learn the fundamentals and practice with real projects',
+            'teachers': [{
+                'id': skill_id * teachers_per_skill + i,
+                'username': f'teacher_{skill_id}_{i}',
+                'location': rng.choice(['Mumbai', 'Delhi', 'Bangalore', 'Pune', 'Chennai']),
+                'experience_level': rng.choice(['Beginner', 'Intermediate', 'Advanced']),
+                'avg_rating': round(rng.uniform(1, 5), 1),
+            } for i in range(teachers_per_skill)],
+        })
+    return {'skills': skills}
+
+
+def requests_payload(count, as_strings):
+    """Shape of get_swap_requests: flat rows with a datetime each"""
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    rows = []
+    for i in range(count):
+        created_at = start + timedelta(minutes=i, microseconds=i)
+        rows.append({
+            'id': i,
+            'to_user': f'user{i}',
+            'requested_skill': 'Python',
+            'offered_skill': None if i % 3 else 'Guitar',
+            'message': 'Would love to swap lessons this weekend!',
+            'status': 'pending',
+            'created_at': created_at.isoformat() if as_strings else created_at,
+        })
+    return {'sent_requests': rows, 'received_requests': rows}
+
+
+def bench(label, func, repeat, number):
+    best = min(timeit.repeat(func, repeat=repeat, number=number)) / number
+    print(f'  {label:<32} {best * 1000:9.3f} ms')
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--teachers', type=int, default=5000)
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--number', type=int, default=5)
+    args = parser.parse_args()
+
+    browse = browse_payload(args.teachers)
+
+    # Request rows are rebuilt on every run so the old path pays for its
+    # per-row isoformat() calls, like the view used to
+    cases = [
+        ('browse_skills', lambda: browse, lambda: browse),
+        ('get_swap_requests', lambda: requests_payload(args.requests, as_strings=True),
+         lambda: requests_payload(args.requests, as_strings=False)),
+    ]
+
+    orjson_module = responses.orjson
+    print(f'orjson available: {orjson_module is not None}')
+    for name, old_payload, new_payload in cases:
+        size = len(FastJsonResponse(new_payload()).content)
+        print(f'\n{name} ({size / 1024:.0f} KiB)')
+        baseline = bench('JsonResponse (DjangoJSONEncoder)',
+                         lambda: JsonResponse(old_payload()), args.repeat, args.number)
+        if orjson_module is not None:
+            fast = bench('FastJsonResponse (orjson)',
+                         lambda: FastJsonResponse(new_payload()), args.repeat, args.number)
+            print(f'  speedup: {baseline / fast:.1f}x')
+        responses.orjson = None
+        try:
+            bench('FastJsonResponse (stdlib)',
+                  lambda: FastJsonResponse(new_payload()), args.repeat, args.number)
+        finally:
+            responses.orjson = orjson_module
+
+
+if __name__ == '__main__':
+    main()
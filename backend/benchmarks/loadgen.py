@@ -0,0 +1,502 @@
+#!/usr/bin/env python
+"""HTTP load generator that replays user journeys against a running server
+
+Each journey is one visitor: a fresh connection and cookie jar, a login
+(except for anonymous browsers), then the requests that user would make.
+The accounts are the ones generate_load_data creates (<prefix><id>, shared
+password), so seed a database first and start a server on it:
+
+    python manage.py generate_load_data --users 10000
+    gunicorn skillswap_project.wsgi -w 4    (or python manage.py runserver)
+
+Run from the backend/ folder:
+    python -m benchmarks.loadgen --url http://127.0.0.1:8000/api --first-id 1 --accounts 10000 \\
+        [--concurrency 20] [--rate 10] [--duration 60] [--mix learner=4,teacher=2,reviewer=1,browser=8]
+
+Without --rate, --concurrency visitors run back to back (closed model).
+With --rate, journeys start as a Poisson process at that many per second
+and at most --concurrency run at once; arrivals beyond that are counted as
+dropped rather than queued, so overload shows up instead of being hidden.
+Only the standard library is used.
+"""
+import argparse
+import asyncio
+import bisect
+import gzip
+import itertools
+import json
+import random
+import sys
+import time
+from collections import defaultdict
+from urllib.parse import urlencode, urlsplit
+
+# Upper bounds (ms) of the latency histogram buckets; the last one is open
+BUCKETS_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000]
+
+JOURNEYS = {}
+
+
+def journey(name):
+    def register(func):
+        JOURNEYS[name] = func
+        return func
+    return register
+
+
+class HttpError(Exception):
+    """Connection-level failure (refused, reset, timeout, bad response)"""
+
+
+class Session:
+    """One keep-alive HTTP/1.1 connection and cookie jar, i.e. one browser"""
+
+    def __init__(self, url, stats, timeout):
+        parts = urlsplit(url)
+        self.host = parts.hostname
+        self.port = parts.port or (443 if parts.scheme == 'https' else 80)
+        self.ssl = parts.scheme == 'https'
+        self.base = parts.path.rstrip('/')
+        self.host_header = parts.netloc
+        self.stats = stats
+        self.timeout = timeout
+        self.cookies = {}
+        self.reader = self.writer = None
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except OSError:
+                pass
+            self.reader = self.writer = None
+
+    async def get(self, step, path, params=None):
+        if params:
+            path += '?' + urlencode(params)
+        return await self.request(step, 'GET', path)
+
+    async def post(self, step, path, body):
+        return await self.request(step, 'POST', path, body)
+
+    async def request(self, step, method, path, body=None):
+        """Send one request; returns (status, parsed JSON or None) and records it under step"""
+        payload = json.dumps(body).encode() if body is not None else b''
+        headers = [
+            f'{method} {self.base}{path} HTTP/1.1',
+            f'Host: {self.host_header}',
+            'Accept: application/json',
+            'Accept-Encoding: gzip',
+            f'Content-Length: {len(payload)}',
+        ]
+        if body is not None:
+            headers.append('Content-Type: application/json')
+        if self.cookies:
+            headers.append('Cookie: ' + '; '.join(f'{k}={v}' for k, v in self.cookies.items()))
+        raw = ('\r\n'.join(headers) + '\r\n\r\n').encode('latin-1') + payload
+
+        started = time.perf_counter()
+        try:
+            status, content = await asyncio.wait_for(self._exchange(raw), self.timeout)
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError) as e:
+            await self.close()
+            self.stats.record(step, None, time.perf_counter() - started, 0)
+            raise HttpError(f'{method} {path}: {e!r}') from e
+        self.stats.record(step, status, time.perf_counter() - started, len(content))
+        try:
+            return status, json.loads(content) if content else None
+        except ValueError:
+            return status, None
+
+    async def _exchange(self, raw):
+        # A kept-alive connection the server has since closed fails on first
+        # use; retry once on a new connection before giving up
+        for attempt in (1, 2):
+            if self.writer is None:
+                self.reader, self.writer = await asyncio.open_connection(self.host, self.port, ssl=self.ssl)
+                fresh = True
+            else:
+                fresh = False
+            try:
+                self.writer.write(raw)
+                await self.writer.drain()
+                return await self._read_response()
+            except (ConnectionError, asyncio.IncompleteReadError):
+                await self.close()
+                if fresh or attempt == 2:
+                    raise
+
+    async def _read_response(self):
+        line = await self.reader.readline()
+        if not line:
+            raise ConnectionResetError('connection closed before the response')
+        status = int(line.split(None, 2)[1])
+        headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            name, value = name.strip().lower(), value.strip()
+            if name == 'set-cookie':
+                cookie = value.split(';', 1)[0]
+                key, _, cookie_value = cookie.partition('=')
+                if cookie_value:
+                    self.cookies[key.strip()] = cookie_value.strip()
+                else:
+                    self.cookies.pop(key.strip(), None)
+            headers[name] = value
+
+        if 'content-length' in headers:
+            content = await self.reader.readexactly(int(headers['content-length']))
+        elif headers.get('transfer-encoding', '').lower() == 'chunked':
+            chunks = []
+            while True:
+                size = int((await self.reader.readline()).split(b';')[0], 16)
+                if size == 0:
+                    while (await self.reader.readline()) not in (b'\r\n', b'\n', b''):
+                        pass
+                    break
+                chunks.append(await self.reader.readexactly(size))
+                await self.reader.readline()
+            content = b''.join(chunks)
+        else:
+            content = await self.reader.read()
+            headers['connection'] = 'close'
+        if headers.get('connection', '').lower() == 'close':
+            await self.close()
+        if headers.get('content-encoding') == 'gzip':
+            content = gzip.decompress(content)
+        return status, content
+
+
+class Stats:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+        self.bytes = defaultdict(int)
+        self.journeys = defaultdict(lambda: defaultdict(int))
+        self.dropped = 0
+
+    def record(self, step, status, elapsed, size):
+        self.latencies[step].append(elapsed * 1000)
+        self.statuses[step][status if status is not None else 'conn'] += 1
+        self.bytes[step] += size
+
+    def finish_journey(self, name, ok):
+        self.journeys[name]['ok' if ok else 'failed'] += 1
+
+
+def percentile(samples, q):
+    """Nearest-rank percentile of a list of numbers"""
+    ordered = sorted(samples)
+    rank = max(1, -(-len(ordered) * q // 100))
+    return ordered[int(rank) - 1]
+
+
+def histogram(samples):
+    counts = [0] * (len(BUCKETS_MS) + 1)
+    for value in samples:
+        counts[bisect.bisect_left(BUCKETS_MS, value)] += 1
+    return counts
+
+
+def _errors(statuses):
+    """(server errors incl. connection failures, client errors)"""
+    server = sum(n for status, n in statuses.items() if status == 'conn' or status >= 500)
+    client = sum(n for status, n in statuses.items() if status != 'conn' and 400 <= status < 500)
+    return server, client
+
+
+class Accounts:
+    """Generated accounts <prefix><id> for ids first_id .. first_id + count - 1"""
+
+    def __init__(self, prefix, first_id, count, password):
+        self.prefix, self.first_id, self.count, self.password = prefix, first_id, count, password
+
+    def pick(self, rng):
+        return f'{self.prefix}{self.first_id + rng.randrange(self.count)}'
+
+
+async def login(session, ctx):
+    status, data = await session.post('login', '/auth/login/', {
+        'username': ctx.accounts.pick(ctx.rng), 'password': ctx.accounts.password,
+    })
+    if status != 200:
+        return None
+    return data['user']
+
+
+async def dashboard(session):
+    """What the dashboard page loads"""
+    await session.get('dashboard:profile', '/profile/')
+    _, data = await session.get('dashboard:requests', '/requests/')
+    return data or {'sent_requests': [], 'received_requests': []}
+
+
+async def browse(session, ctx, step='browse'):
+    """One of the browse page's filter combinations; returns the skills listed"""
+    choice = ctx.rng.random()
+    if choice < 0.4:
+        params = {}
+    elif choice < 0.6:
+        params = {'category_id': ctx.rng.choice(ctx.category_ids)} if ctx.category_ids else {}
+    elif choice < 0.8:
+        params = {'search': ctx.rng.choice(['a', 'in', 'Skill 1', 'py'])}
+    else:
+        lat, lon = ctx.rng.choice(ctx.places)
+        params = {'lat': lat, 'lon': lon, 'radius_km': ctx.rng.choice([5, 10, 25])}
+    _, data = await session.get(step, '/skills/browse/', params)
+    return (data or {}).get('skills', [])
+
+
+@journey('browser')
+async def anonymous_browser(session, ctx):
+    """Anonymous visitor: catalog, a few browse pages, the trending lists"""
+    await session.get('categories', '/categories/')
+    for _ in range(ctx.rng.randint(1, 3)):
+        await browse(session, ctx)
+        await ctx.think()
+    await session.get('trending', '/skills/trending/')
+    await session.get('top-teachers', '/users/top-teachers/')
+    return True
+
+
+@journey('learner')
+async def learner(session, ctx):
+    """Log in, look at the dashboard, browse and ask a teacher for a lesson"""
+    user = await login(session, ctx)
+    if user is None:
+        return False
+    await dashboard(session)
+    await ctx.think()
+    skills = [skill for skill in await browse(session, ctx) if skill['teachers']]
+    await ctx.think()
+    if not skills:
+        return True
+    skill = ctx.rng.choice(skills)
+    teachers = [teacher for teacher in skill['teachers'] if teacher['id'] != user['id']]
+    if teachers:
+        status, _ = await session.post('send-request', '/requests/send/', {
+            'to_user_id': ctx.rng.choice(teachers)['id'],
+            'requested_skill_id': skill['id'],
+            'message': 'Generated by the load test',
+        })
+        return status == 200
+    return True
+
+
+@journey('teacher')
+async def teacher(session, ctx):
+    """Log in, check pending requests, accept one and complete an accepted one"""
+    if await login(session, ctx) is None:
+        return False
+    await dashboard(session)
+    await ctx.think()
+    _, data = await session.get('pending', '/requests/', {'status': 'pending'})
+    pending = (data or {}).get('received_requests', [])
+    ok = True
+    if pending:
+        request_id = ctx.rng.choice(pending)['id']
+        status, _ = await session.post('accept', f'/requests/{request_id}/update/', {'status': 'accepted'})
+        ok = status == 200
+    _, data = await session.get('accepted', '/requests/', {'status': 'accepted'})
+    accepted = (data or {}).get('received_requests', [])
+    if accepted and ctx.rng.random() < 0.5:
+        request_id = ctx.rng.choice(accepted)['id']
+        status, _ = await session.post('complete', f'/requests/{request_id}/update/', {'status': 'completed'})
+        ok = ok and status == 200
+    return ok
+
+
+@journey('reviewer')
+async def reviewer(session, ctx):
+    """Log in and review a completed swap (a 400 for an existing review is expected)"""
+    if await login(session, ctx) is None:
+        return False
+    data = await dashboard(session)
+    await ctx.think()
+    completed = [req for req in data['sent_requests'] if req['status'] == 'completed']
+    if not completed:
+        return True
+    status, _ = await session.post('review', '/reviews/create/', {
+        'swap_request_id': ctx.rng.choice(completed)['id'],
+        'rating': ctx.rng.choice([3, 4, 4, 5, 5, 5]),
+        'comment': 'Generated by the load test',
+    })
+    return status in (200, 400)
+
+
+class Context:
+    """Shared, read-only-ish state handed to every journey"""
+
+    def __init__(self, args, stats):
+        self.args = args
+        self.stats = stats
+        self.rng = random.Random(args.seed)
+        self.accounts = Accounts(args.prefix, args.first_id, args.accounts, args.password)
+        self.category_ids = []
+        # Centres of the densest generate_load_data cities
+        self.places = [(19.076, 72.878), (28.614, 77.209), (12.972, 77.595), (17.385, 78.487)]
+        names, weights = zip(*args.mix)
+        self.mix = names
+        self.mix_weights = list(itertools.accumulate(weights))
+
+    def pick_journey(self):
+        return self.mix[bisect.bisect(self.mix_weights, self.rng.random() * self.mix_weights[-1])]
+
+    async def think(self):
+        if self.args.think_time:
+            await asyncio.sleep(self.rng.expovariate(1 / self.args.think_time))
+
+    async def discover(self):
+        """Category ids for the browse filters"""
+        session = Session(self.args.url, Stats(), self.args.timeout)
+        try:
+            _, data = await session.get('setup', '/categories/')
+            self.category_ids = [row['id'] for row in (data or {}).get('categories', [])]
+        finally:
+            await session.close()
+
+
+async def run_journey(ctx):
+    name = ctx.pick_journey()
+    session = Session(ctx.args.url, ctx.stats, ctx.args.timeout)
+    try:
+        ok = await JOURNEYS[name](session, ctx)
+    except HttpError:
+        ok = False
+    finally:
+        await session.close()
+    ctx.stats.finish_journey(name, ok)
+
+
+async def closed_model(ctx, deadline):
+    async def visitor():
+        while time.monotonic() < deadline:
+            await run_journey(ctx)
+    await asyncio.gather(*(visitor() for _ in range(ctx.args.concurrency)))
+
+
+async def open_model(ctx, deadline):
+    running = set()
+    next_arrival = time.monotonic()
+    while True:
+        next_arrival += ctx.rng.expovariate(ctx.args.rate)
+        if next_arrival >= deadline:
+            break
+        await asyncio.sleep(max(0.0, next_arrival - time.monotonic()))
+        if len(running) >= ctx.args.concurrency:
+            ctx.stats.dropped += 1
+            continue
+        task = asyncio.ensure_future(run_journey(ctx))
+        running.add(task)
+        task.add_done_callback(running.discard)
+    if running:
+        await asyncio.gather(*running)
+
+
+def report(stats, elapsed):
+    """Print the summary and return it as a dict"""
+    total = sum(len(samples) for samples in stats.latencies.values())
+    print(f'\n{total:,} requests in {elapsed:.1f}s ({total / elapsed:,.1f} req/s)')
+    for name, counts in sorted(stats.journeys.items()):
+        done = counts['ok'] + counts['failed']
+        print(f'journey {name:<10} {done:>6} done ({done / elapsed:,.2f}/s), {counts["failed"]} failed')
+    if stats.dropped:
+        print(f'{stats.dropped} arrivals dropped at the concurrency limit')
+
+    print(f'\n{"step":<20} {"count":>7} {"5xx%":>6} {"4xx%":>6} {"p50":>8} {"p95":>8} {"p99":>8} {"max":>8}')
+    steps = {}
+    for step, samples in sorted(stats.latencies.items()):
+        server, client = _errors(stats.statuses[step])
+        steps[step] = {
+            'count': len(samples),
+            'server_errors': server,
+            'client_errors': client,
+            'statuses': {str(status): n for status, n in stats.statuses[step].items()},
+            'bytes': stats.bytes[step],
+            'p50_ms': round(percentile(samples, 50), 2),
+            'p95_ms': round(percentile(samples, 95), 2),
+            'p99_ms': round(percentile(samples, 99), 2),
+            'max_ms': round(max(samples), 2),
+            'histogram': histogram(samples),
+        }
+        row = steps[step]
+        print(f'{step:<20} {row["count"]:>7} {server * 100 / len(samples):>5.1f}% {client * 100 / len(samples):>5.1f}% '
+              f'{row["p50_ms"]:>6.1f}ms {row["p95_ms"]:>6.1f}ms {row["p99_ms"]:>6.1f}ms {row["max_ms"]:>6.1f}ms')
+
+    all_samples = [value for samples in stats.latencies.values() for value in samples]
+    counts = histogram(all_samples)
+    if all_samples:
+        print('\nlatency histogram (all requests)')
+        widest = max(counts)
+        bounds = [f'<= {bound}ms' for bound in BUCKETS_MS] + [f'> {BUCKETS_MS[-1]}ms']
+        for label, count in zip(bounds, counts):
+            print(f'{label:>10} {count:>7} {"#" * round(40 * count / widest)}')
+    return {
+        'elapsed_s': round(elapsed, 2),
+        'requests': total,
+        'throughput_rps': round(total / elapsed, 2),
+        'dropped': stats.dropped,
+        'journeys': {name: dict(counts) for name, counts in stats.journeys.items()},
+        'buckets_ms': BUCKETS_MS,
+        'histogram': counts,
+        'steps': steps,
+    }
+
+
+def parse_mix(value):
+    mix = []
+    for part in value.split(','):
+        name, _, weight = part.partition('=')
+        if name not in JOURNEYS:
+            raise argparse.ArgumentTypeError(f'unknown journey {name!r} (have {", ".join(JOURNEYS)})')
+        mix.append((name, float(weight or 1)))
+    return mix
+
+
+async def main_async(args):
+    stats = Stats()
+    ctx = Context(args, stats)
+    try:
+        await ctx.discover()
+    except (HttpError, OSError) as e:
+        sys.exit(f'Cannot reach {args.url}: {e}')
+    started = time.monotonic()
+    deadline = started + args.duration
+    if args.rate:
+        await open_model(ctx, deadline)
+    else:
+        await closed_model(ctx, deadline)
+    return report(stats, time.monotonic() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--url', default='http://127.0.0.1:8000/api', help='API root of the running server')
+    parser.add_argument('--concurrency', type=int, default=10, help='Journeys in flight at once')
+    parser.add_argument('--rate', type=float, help='Journey arrivals per second (open model)')
+    parser.add_argument('--duration', type=float, default=30, help='Seconds to generate load for')
+    parser.add_argument('--mix', type=parse_mix, default=parse_mix('learner=4,teacher=2,reviewer=1,browser=8'),
+                        help='Journey weights, e.g. learner=4,teacher=2,reviewer=1,browser=8')
+    parser.add_argument('--think-time', type=float, default=0, help='Mean pause between page views (s)')
+    parser.add_argument('--timeout', type=float, default=30, help='Per-request timeout (s)')
+    parser.add_argument('--prefix', default='load', help='Username prefix used by generate_load_data')
+    parser.add_argument('--first-id', type=int, default=1, help='Id of the first generated user')
+    parser.add_argument('--accounts', type=int, default=1000, help='How many generated users to log in as')
+    parser.add_argument('--password', default='loadtest')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='Write the summary as JSON')
+    args = parser.parse_args()
+
+    summary = asyncio.run(main_async(args))
+    if args.output:
+        with open(args.output, 'w') as handle:
+            json.dump(summary, handle, indent=2)
+        print(f'summary written to {args.output}')
+
+
+if __name__ == '__main__':
+    main()
@@ -11,3 +11,6 @@ python manage.py collectstatic --no-input
 
 # Run database migrations
 python manage.py migrate
+
+# Table for CACHE_BACKEND=django.core.cache.backends.db.DatabaseCache
+python manage.py createcachetable
@@ -0,0 +1,63 @@
+# backend/gunicorn.conf.py
+"""
+Gunicorn settings (picked up automatically from the working directory).
+
+preload_app imports Django, every app and the URLconf once in the master,
+so forked workers start warm and share those pages copy-on-write instead
+of each paying the full boot. Turn it off (GUNICORN_PRELOAD=False) when
+you want code reloads on SIGHUP.
+"""
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = int(os.environ.get('WEB_CONCURRENCY', '2'))
+threads = int(os.environ.get('GUNICORN_THREADS', '1'))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', '30'))
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'True').lower() in ('true', '1', 'yes')
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'skillswap_project.settings')
+
+
+# Cache backends shared between processes whose add() is atomic, so one
+# worker at a time holds a single-flight lease (skillswap_app/cache.py).
+# LocMemCache is per process; FileBasedCache.add is has_key() then set().
+SHARED_CACHE_BACKENDS = (
+    'django.core.cache.backends.db.DatabaseCache',  # INSERT under the key's primary key
+    'django.core.cache.backends.redis.RedisCache',  # SET NX
+    'django.core.cache.backends.memcached.PyMemcacheCache',
+    'django.core.cache.backends.memcached.PyLibMCCache',
+)
+
+
+def on_starting(server):
+    from django.conf import settings
+
+    # Cache invalidations, single-flight leases and hit counters live in the
+    # cache, so every worker must see the same one
+    backend = settings.CACHES['default']['BACKEND']
+    if server.cfg.workers > 1 and backend not in SHARED_CACHE_BACKENDS:
+        raise RuntimeError(f'{server.cfg.workers} workers need a shared cache with atomic add, not {backend}: '
+                           'set CACHE_BACKEND to one of ' + ', '.join(SHARED_CACHE_BACKENDS))
+
+    # Counters from the previous run's workers would be summed in forever
+    from skillswap_app import metrics
+    metrics.clear()
+
+
+def when_ready(server):
+    if not preload_app:
+        return
+    from django.db import connections
+    from django.urls import get_resolver
+
+    # Imports the views before forking (a no-op when middleware already did)
+    get_resolver().url_patterns
+    # A connection opened while booting must not be shared by the workers
+    connections.close_all()
+
+
+def post_worker_init(worker):
+    # Gunicorn resets the worker's signal handlers, so profiling on
+    # SIGUSR2 has to be installed again in each worker
+    from skillswap_app import profiler
+    profiler.install_signal_handler()
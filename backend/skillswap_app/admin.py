@@ -1,6 +1,13 @@
 # backend/skillswap_app/admin.py
+from django.conf import settings
 from django.contrib import admin
-from .models import Category, Skill, Profile, UserSkill, SwapRequest, Review
+from django.template.response import TemplateResponse
+
+from . import jobs, slowlog
+from .models import (
+    Category, Skill, Profile, UserSkill, SwapRequest, Review, Location, LocationAlias,
+    SkillPopularity, UserSummary, Job,
+)
 
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
@@ -13,9 +20,20 @@ class SkillAdmin(admin.ModelAdmin):
     list_filter = ('category',)
     search_fields = ('name', 'description')
 
+class LocationAliasInline(admin.TabularInline):
+    model = LocationAlias
+    extra = 1
+
+@admin.register(Location)
+class LocationAdmin(admin.ModelAdmin):
+    list_display = ('name', 'latitude', 'longitude', 'created_at')
+    search_fields = ('name', 'aliases__alias')
+    inlines = [LocationAliasInline]
+
 @admin.register(Profile)
 class ProfileAdmin(admin.ModelAdmin):
-    list_display = ('user', 'location', 'created_at')
+    list_display = ('user', 'location', 'canonical_location', 'created_at')
+    raw_id_fields = ('canonical_location',)
     search_fields = ('user__username', 'location')
     list_filter = ('location', 'created_at')
 
@@ -35,4 +53,39 @@ class SwapRequestAdmin(admin.ModelAdmin):
 class ReviewAdmin(admin.ModelAdmin):
     list_display = ('from_user', 'to_user', 'rating', 'created_at')
     list_filter = ('rating', 'created_at')
-    search_fields = ('from_user__username', 'to_user__username')
\ No newline at end of file
+    search_fields = ('from_user__username', 'to_user__username')
+
+@admin.register(SkillPopularity)
+class SkillPopularityAdmin(admin.ModelAdmin):
+    list_display = ('skill', 'teacher_count', 'request_count', 'completed_count', 'avg_rating', 'updated_at')
+    search_fields = ('skill__name',)
+    # Maintained by summaries.py; edit the source rows instead
+    readonly_fields = [f.name for f in SkillPopularity._meta.fields]
+
+@admin.register(UserSummary)
+class UserSummaryAdmin(admin.ModelAdmin):
+    list_display = ('user', 'location', 'skills_count', 'reviews_received', 'avg_rating', 'updated_at')
+    search_fields = ('user__username', 'location')
+    readonly_fields = [f.name for f in UserSummary._meta.fields]
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('name', 'status', 'attempts', 'run_after', 'locked_by', 'created_at')
+    list_filter = ('status', 'name')
+    readonly_fields = [f.name for f in Job._meta.fields]
+    actions = ['retry']
+
+    @admin.action(description='Retry selected failed jobs')
+    def retry(self, request, queryset):
+        self.message_user(request, f'{jobs.retry_failed(queryset)} job(s) queued again')
+
+
+def slow_queries_view(request):
+    """Slow query log grouped by fingerprint (routed at admin/slow-queries/)"""
+    return TemplateResponse(request, 'admin/slow_queries.html', {
+        **admin.site.each_context(request),
+        'title': 'Slow queries',
+        'threshold_ms': settings.SLOW_QUERY_MS,
+        'enabled': settings.SLOW_QUERY_LOG_ENABLED,
+        'queries': slowlog.worst(slowlog.read_records()),
+    })
@@ -0,0 +1,305 @@
+# backend/skillswap_app/analytics.py
+"""
+The database/demo_queries.sql reports, served from pre-aggregated tables.
+
+Reports read skill_popularity / user_summary (refreshed on writes, see
+summaries.py) or the rollup_* tables, which rebuild() recomputes. Each
+report reads a bounded number of rows: a LIMIT over an index, or a table
+whose size follows the catalog or the number of months rather than the
+number of users and requests.
+
+rebuild() reads the source tables in keyset-paginated chunks with plain
+SELECTs, which take no locks, aggregates in memory and then replaces the
+rollup tables in one short transaction that only touches rollup tables.
+"""
+import time
+from collections import Counter, defaultdict
+from datetime import date
+
+from django.db import transaction
+from django.db.models import Avg, Count, F, Sum
+from django.utils import timezone
+
+from .models import (
+    Category, Skill, UserSkill, SwapRequest, Review, Location, DataVersion,
+    SkillPopularity, UserSummary, MonthlySwapStats, LocationSwapStats, CategoryStats,
+)
+from . import versions
+
+STATUSES = ('pending', 'accepted', 'rejected', 'completed')
+
+REPORTS = {}
+
+
+class ReportError(ValueError):
+    """Bad report parameters (returned to the client as a 400)"""
+
+
+def report(slug):
+    def register(func):
+        REPORTS[slug] = func
+        return func
+    return register
+
+
+def _month_param(params, name):
+    value = params.get(name)
+    if not value:
+        return None
+    try:
+        year, month = value.split('-')
+        return date(int(year), int(month), 1)
+    except ValueError:
+        raise ReportError(f'{name} must look like YYYY-MM')
+
+
+def _rating(value):
+    return round(value, 2) if value is not None else None
+
+
+@report('teachers')
+def teachers(params, limit):
+    """1. Teachers of a skill (?skill=), optionally in a ?location="""
+    skill = params.get('skill', '')
+    if not skill:
+        raise ReportError('skill is required')
+    rows = UserSkill.objects.filter(can_teach=True, skill__in=Skill.objects.filter(name=skill))
+    location = params.get('location', '')
+    if location:
+        location_id = Location.objects.resolve(location)
+        if location_id:
+            rows = rows.filter(user__profile__canonical_location_id=location_id)
+        else:
+            rows = rows.filter(user__profile__location=location)
+    # (can_teach, skill, user) index order, so the LIMIT stops the scan
+    rows = rows.order_by('user_id').values(
+        'user__username', 'user__profile__location', 'skill__name', 'experience_level'
+    )[:limit]
+    return [{
+        'username': row['user__username'],
+        'location': row['user__profile__location'],
+        'skill': row['skill__name'],
+        'experience_level': row['experience_level'],
+    } for row in rows]
+
+
+@report('popular-skills')
+def popular_skills(params, limit):
+    """2. Skills with the most teachers"""
+    rows = SkillPopularity.objects.select_related('skill__category').order_by('-teacher_count')[:limit]
+    return [{
+        'category': row.skill.category.name,
+        'skill': row.skill.name,
+        'teacher_count': row.teacher_count,
+        'avg_rating': _rating(row.avg_rating),
+    } for row in rows]
+
+
+@report('user-rankings')
+def user_rankings(params, limit):
+    """3. Reviewed teachers by average rating"""
+    rows = UserSummary.objects.select_related('user').filter(
+        skills_count__gt=0, avg_rating__isnull=False
+    ).order_by('-avg_rating', '-reviews_received')[:limit]
+    return [{
+        'username': row.user.username,
+        'location': row.location,
+        'skills_taught': row.skills_count,
+        'avg_rating': _rating(row.avg_rating),
+        'total_reviews': row.reviews_received,
+    } for row in rows]
+
+
+@report('location-activity')
+def location_activity(params, limit):
+    """4. Requests by participant location (?from=YYYY-MM&to=YYYY-MM)"""
+    rows = LocationSwapStats.objects.all()
+    start, end = _month_param(params, 'from'), _month_param(params, 'to')
+    if start:
+        rows = rows.filter(month__gte=start)
+    if end:
+        rows = rows.filter(month__lte=end)
+    rows = rows.values('location').annotate(
+        total_requests=Sum('total'), completed_swaps=Sum('completed'), pending_requests=Sum('pending'),
+    ).order_by('-total_requests')[:limit]
+    return [dict(row, completion_rate=round(row['completed_swaps'] * 100.0 / row['total_requests'], 2))
+            for row in rows]
+
+
+@report('demand')
+def demand(params, limit):
+    """5. Most requested skills against available teachers"""
+    rows = SkillPopularity.objects.select_related('skill__category').order_by(
+        '-request_count', '-teacher_count'
+    )[:limit]
+    result = []
+    for row in rows:
+        if row.teacher_count == 0:
+            status = 'High Demand - No Teachers'
+        elif row.request_count / row.teacher_count > 2:
+            status = 'High Demand'
+        else:
+            status = 'Normal Demand'
+        result.append({
+            'skill_name': row.skill.name,
+            'category': row.skill.category.name,
+            'times_requested': row.request_count,
+            'available_teachers': row.teacher_count,
+            'demand_status': status,
+        })
+    return result
+
+
+@report('matches')
+def matches(params, limit):
+    """6. Teacher/learner pairs for a ?skill_id=, or potential pairs per skill"""
+    skill_id = params.get('skill_id')
+    if not skill_id:
+        rows = SkillPopularity.objects.select_related('skill').filter(
+            teacher_count__gt=0, learner_count__gt=0
+        ).annotate(potential_pairs=F('teacher_count') * F('learner_count')).order_by('-potential_pairs')[:limit]
+        return [{
+            'skill': row.skill.name,
+            'teachers': row.teacher_count,
+            'learners': row.learner_count,
+            'potential_pairs': row.potential_pairs,
+        } for row in rows]
+
+    if not skill_id.isdigit():
+        raise ReportError('skill_id must be a number')
+    fields = ('user_id', 'user__username', 'user__profile__location', 'experience_level')
+    members = UserSkill.objects.filter(skill_id=skill_id).order_by('user_id')
+    teachers = list(members.filter(can_teach=True).values_list(*fields)[:limit])
+    learners = list(members.filter(can_teach=False).values_list(*fields)[:limit])
+    pairs = []
+    for teacher in teachers:
+        for learner in learners:
+            if teacher[0] != learner[0]:
+                pairs.append({
+                    'teacher': teacher[1],
+                    'learner': learner[1],
+                    'teacher_level': teacher[3],
+                    'teacher_location': teacher[2],
+                    'learner_location': learner[2],
+                })
+                if len(pairs) == limit:
+                    return pairs
+    return pairs
+
+
+@report('monthly-trends')
+def monthly_trends(params, limit):
+    """7. Requests per month by status, newest first"""
+    rows = MonthlySwapStats.objects.order_by('-month')[:limit]
+    return [{
+        'month': row.month.month,
+        'year': row.month.year,
+        'total_requests': row.total,
+        'completed': row.completed,
+        'accepted': row.accepted,
+        'pending': row.pending,
+    } for row in rows]
+
+
+@report('categories')
+def categories(params, limit):
+    """8. Category performance with ratings"""
+    rows = CategoryStats.objects.select_related('category').order_by(
+        F('avg_rating').desc(nulls_last=True)
+    )[:limit]
+    return [{
+        'category': row.category.name,
+        'total_skills': row.total_skills,
+        'total_teachers': row.total_teachers,
+        'total_requests': row.total_requests,
+        'avg_category_rating': _rating(row.avg_rating),
+        'total_reviews': row.total_reviews,
+    } for row in rows]
+
+
+def rollups_as_of():
+    """When the rollup tables were last rebuilt, or None"""
+    return DataVersion.objects.filter(name=versions.ROLLUPS).values_list('updated_at', flat=True).first()
+
+
+def _month(value):
+    if timezone.is_aware(value):
+        value = timezone.localtime(value)
+    return value.date().replace(day=1)
+
+
+def _chunks(queryset, fields, batch_size, pause):
+    """values_list rows ordered by id, one keyset-paginated batch at a time"""
+    last_id = 0
+    while True:
+        rows = list(queryset.filter(id__gt=last_id).order_by('id').values_list('id', *fields)[:batch_size])
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1][0]
+        if pause:
+            time.sleep(pause)
+
+
+def _swap_rollups(batch_size, pause):
+    monthly = defaultdict(Counter)
+    by_location = defaultdict(Counter)
+    fields = ['status', 'created_at',
+              'from_user__profile__canonical_location__name', 'from_user__profile__location',
+              'to_user__profile__canonical_location__name', 'to_user__profile__location']
+    for rows in _chunks(SwapRequest.objects.all(), fields, batch_size, pause):
+        for _, status, created_at, from_canonical, from_raw, to_canonical, to_raw in rows:
+            month = _month(created_at)
+            monthly[month]['total'] += 1
+            monthly[month][status] += 1
+            # A request counts once per distinct participant location
+            for location in {from_canonical or from_raw, to_canonical or to_raw} - {None, ''}:
+                by_location[month, location]['total'] += 1
+                by_location[month, location][status] += 1
+
+    monthly_rows = [MonthlySwapStats(month=month, total=counts['total'],
+                                     **{status: counts[status] for status in STATUSES})
+                    for month, counts in monthly.items()]
+    location_rows = [LocationSwapStats(month=month, location=location[:100], total=counts['total'],
+                                       pending=counts['pending'], completed=counts['completed'])
+                     for (month, location), counts in by_location.items()]
+    return monthly_rows, location_rows
+
+
+def _category_rollups(pause):
+    """One query per category and measure, each answered from indexes"""
+    rows = []
+    for category_id in Category.objects.order_by('id').values_list('id', flat=True):
+        reviews = Review.objects.filter(swap_request__requested_skill__category_id=category_id).aggregate(
+            n=Count('id'), avg=Avg('rating')
+        )
+        rows.append(CategoryStats(
+            category_id=category_id,
+            total_skills=Skill.objects.filter(category_id=category_id).count(),
+            total_teachers=UserSkill.objects.filter(can_teach=True, skill__category_id=category_id)
+            .aggregate(n=Count('user_id', distinct=True))['n'],
+            total_requests=SwapRequest.objects.filter(requested_skill__category_id=category_id).count(),
+            total_reviews=reviews['n'],
+            avg_rating=reviews['avg'],
+        ))
+        if pause:
+            time.sleep(pause)
+    return rows
+
+
+def rebuild(batch_size=5000, pause=0):
+    """Recompute every rollup table; returns {table: rows written}"""
+    monthly_rows, location_rows = _swap_rollups(batch_size, pause)
+    category_rows = _category_rollups(pause)
+
+    with transaction.atomic():
+        for model, rows in ((MonthlySwapStats, monthly_rows), (LocationSwapStats, location_rows),
+                            (CategoryStats, category_rows)):
+            model.objects.all().delete()
+            model.objects.bulk_create(rows, batch_size=1000)
+        versions.bump(versions.ROLLUPS)
+    return {
+        MonthlySwapStats._meta.db_table: len(monthly_rows),
+        LocationSwapStats._meta.db_table: len(location_rows),
+        CategoryStats._meta.db_table: len(category_rows),
+    }
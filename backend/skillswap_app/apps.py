@@ -5,4 +5,13 @@ from django.apps import AppConfig
 class SkillswapAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'skillswap_app'
-    verbose_name = 'Skill Swap Application'
\ No newline at end of file
+    verbose_name = 'Skill Swap Application'
+
+    def ready(self):
+        # Connect signal receivers (slowlog hooks connection_created) and
+        # register outbox subscribers defined outside outbox.py
+        from . import notifications, signals, slowlog  # noqa: F401
+        # Profile on SIGUSR2 under runserver; gunicorn resets worker signal
+        # handlers, so gunicorn.conf.py installs it again in post_worker_init
+        from . import profiler
+        profiler.install_signal_handler()
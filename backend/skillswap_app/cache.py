@@ -0,0 +1,284 @@
+# backend/skillswap_app/cache.py
+import hashlib
+import math
+import random
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+
+from . import metrics, versions
+from .middleware import compress, supported_encodings
+
+# Invalidation works with generation tags: every cached entry's key includes
+# the current generation of each tag it depends on, and invalidating a tag
+# gives it a new generation so old entries are never read again (and age out
+# through their timeout). A new generation is the current time in
+# nanoseconds, written with a single set rather than read-modify-write: two
+# workers invalidating at once both leave a generation no entry was stored
+# under, whichever write lands last, and an evicted tag restarts above any
+# generation handed out before, so it cannot resurrect entries.
+BROWSE = 'browse'
+CATALOG = 'catalog'
+ALL_CATEGORIES = '*'
+
+
+def browse_category_tag(category_id):
+    return f'{BROWSE}:category:{category_id}'
+
+
+def _tag_key(tag):
+    return f'tag:{tag}'
+
+
+def get_generations(tags):
+    """Current generation of each tag, in one cache round trip when all exist"""
+    keys = [_tag_key(tag) for tag in tags]
+    found = cache.get_many(keys)
+    for key in keys:
+        if key not in found:
+            cache.add(key, time.time_ns(), timeout=None)
+            found[key] = cache.get(key)
+    return [found[key] for key in keys]
+
+
+def invalidate_tags(tags):
+    generation = time.time_ns()
+    cache.set_many({_tag_key(tag): generation for tag in set(tags)}, timeout=None)
+
+
+def invalidate_browse(category_ids=None):
+    """Invalidate browse entries for some categories, or all of them when None
+
+    Entries without a category filter can contain any category, so they
+    are invalidated whenever any category is.
+    """
+    if category_ids is None:
+        invalidate_tags([BROWSE])
+    elif category_ids:
+        invalidate_tags([browse_category_tag(ALL_CATEGORIES)]
+                        + [browse_category_tag(category_id) for category_id in category_ids])
+
+
+def invalidate_catalog():
+    invalidate_tags([CATALOG])
+
+
+# Hit/miss counters. Best-effort outside Redis and Memcached: other
+# backends' incr is get-then-set, so concurrent increments can be lost.
+# The per-process metrics.CACHE_REQUESTS counters are exact.
+
+HIT = 'hits'
+MISS = 'misses'
+STALE = 'stale'
+
+
+def _stat_key(name, outcome):
+    return f'stats:{name}:{outcome}'
+
+
+def _incr(key):
+    if not cache.add(key, 1, timeout=None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, timeout=None)
+
+
+def record(name, outcome):
+    _incr(_stat_key(name, outcome))
+    metrics.CACHE_REQUESTS.inc(cache=name, outcome=outcome)
+
+
+def get_stats(names):
+    keys = [_stat_key(name, outcome) for name in names for outcome in (HIT, MISS, STALE)]
+    found = cache.get_many(keys)
+    stats = {}
+    for name in names:
+        hits = found.get(_stat_key(name, HIT), 0)
+        misses = found.get(_stat_key(name, MISS), 0)
+        stale = found.get(_stat_key(name, STALE), 0)
+        total = hits + misses + stale
+        stats[name] = {
+            'hits': hits,
+            'misses': misses,
+            'stale': stale,
+            'hit_ratio': round((hits + stale) / total, 4) if total else None,
+        }
+    return stats
+
+
+# Single-flight read-through cache
+
+def _should_refresh(entry, beta):
+    """Probabilistic early expiry (XFetch)
+
+    Each reader recomputes a little before the soft expiry with a
+    probability that grows as expiry approaches and with how long the value
+    took to compute, so refreshes are spread out instead of all readers
+    noticing the expiry at the same instant.
+    """
+    jitter = -entry['delta'] * beta * math.log(1.0 - random.random())
+    return time.time() + jitter >= entry['expires']
+
+
+def _refresh(key, compute, timeout, stale_timeout):
+    started = time.monotonic()
+    value = compute()
+    if value is not None:
+        entry = {'value': value, 'expires': time.time() + timeout,
+                 'delta': time.monotonic() - started}
+        # Kept past its soft expiry so it can be served stale while one
+        # worker recomputes
+        cache.set(key, entry, timeout + stale_timeout)
+    return value
+
+
+def get_or_compute(key, compute, timeout):
+    """Read through the cache with one recompute per expiry across all workers
+
+    ``compute()`` returns the value to store, or None for a value that must
+    not be cached. Returns ``(value, outcome)`` where outcome is HIT, MISS
+    (this caller computed) or STALE (an expired value served while another
+    caller holds the recompute lease).
+
+    Settings:
+        CACHE_STALE_TIMEOUT      seconds an expired value may still be served
+        CACHE_LOCK_TIMEOUT       lease length, and how long a cold miss waits
+        CACHE_EARLY_EXPIRY_BETA  > 1 refreshes earlier, 0 disables early expiry
+    """
+    stale_timeout = getattr(settings, 'CACHE_STALE_TIMEOUT', 30)
+    lock_timeout = getattr(settings, 'CACHE_LOCK_TIMEOUT', 10)
+    beta = getattr(settings, 'CACHE_EARLY_EXPIRY_BETA', 1.0)
+    lock_key = f'lock:{key}'
+
+    entry = cache.get(key)
+    if entry is not None and not _should_refresh(entry, beta):
+        return entry['value'], HIT
+
+    deadline = time.monotonic() + lock_timeout
+    while True:
+        # One caller gets the lease: cache.add is atomic in-process, and
+        # across workers only on the backends gunicorn.conf.py accepts for
+        # several workers (not FileBasedCache, whose add is has_key + set)
+        if cache.add(lock_key, 1, lock_timeout):
+            try:
+                return _refresh(key, compute, timeout, stale_timeout), MISS
+            finally:
+                cache.delete(lock_key)
+        if entry is not None:
+            return entry['value'], STALE
+        # Cold miss while someone else computes: wait for their result
+        if time.monotonic() >= deadline:
+            return _refresh(key, compute, timeout, stale_timeout), MISS
+        time.sleep(0.01)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry['value'], HIT
+
+
+# Response cache
+
+def _entry_from_response(response):
+    content = response.content
+    variants = {}
+    # Store compressed bytes alongside the body so hot responses are
+    # compressed once per fill instead of once per request
+    if (getattr(settings, 'COMPRESSION_ENABLED', True)
+            and len(content) >= getattr(settings, 'COMPRESSION_MIN_SIZE', 1024)):
+        variants = {encoding: compress(content, encoding) for encoding in supported_encodings()}
+    return {'content': content, 'content_type': response['Content-Type'], 'variants': variants}
+
+
+def _response_from_entry(entry):
+    response = HttpResponse(entry['content'], content_type=entry['content_type'])
+    response.compressed_variants = dict(entry['variants'])
+    return response
+
+
+def cached_response(name, params_func, tags_func, version_groups=(), anonymous_only=True):
+    """Cache a GET view's response, with single-flight recomputation
+
+    ``params_func(request)`` returns the normalized parameters that select
+    the response (the cache key), and ``tags_func(params)`` the generation
+    tags those parameters depend on. ``version_groups`` are the groups the
+    view's ETag is built from: each entry records their versions when it
+    was filled, and a cached body is served under that entry's ETag, never
+    under a newer one it does not match. Only 200 responses are stored.
+    With ``anonymous_only`` logged-in users always get a fresh response.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if not getattr(settings, 'RESPONSE_CACHE_ENABLED', True):
+                return view(request, *args, **kwargs)
+            if anonymous_only and request.user.is_authenticated:
+                return view(request, *args, **kwargs)
+
+            params = params_func(request)
+            generations = get_generations(tags_func(params))
+            digest = hashlib.sha1(repr((params, generations)).encode()).hexdigest()
+            key = f'response:{name}:{digest}'
+
+            computed = []
+
+            def compute():
+                response = view(request, *args, **kwargs)
+                computed.append(response)
+                if response.status_code == 200 and not response.streaming:
+                    entry = _entry_from_response(response)
+                    if version_groups:
+                        # Read before the view ran, so never newer than the body
+                        entry['versions'] = versions.request_versions(request, tuple(version_groups))
+                    return entry
+                return None
+
+            entry, outcome = get_or_compute(key, compute, getattr(settings, 'RESPONSE_CACHE_TIMEOUT', 60))
+            record(name, outcome)
+            if computed:
+                response = computed[0]
+                if entry is not None:
+                    response.compressed_variants = dict(entry['variants'])
+                return response
+            response = _response_from_entry(entry)
+            if 'versions' in entry:
+                # The data may have changed since (possibly in another
+                # process); @condition keeps an ETag the view already set
+                response['ETag'] = versions.make_etag(request, entry['versions'])
+            return response
+        return wrapper
+    return decorator
+
+
+def browse_params(request):
+    """The filters browse_skills reads. Text filters are case-insensitive (icontains)"""
+    return (
+        ('location', request.GET.get('location', '').lower()),
+        ('category_id', request.GET.get('category_id', '')),
+        ('search', request.GET.get('search', '').lower()),
+        ('lat', request.GET.get('lat', '')),
+        ('lon', request.GET.get('lon', '')),
+        ('radius_km', request.GET.get('radius_km', '')),
+    )
+
+
+def browse_tags(params):
+    category_id = dict(params)['category_id'] or ALL_CATEGORIES
+    return [BROWSE, browse_category_tag(category_id)]
+
+
+def skills_params(request):
+    return (
+        ('category_id', request.GET.get('category_id', '')),
+        ('search', request.GET.get('search', '').lower()),
+    )
+
+
+def no_params(request):
+    return ()
+
+
+def catalog_tags(params):
+    return [CATALOG]
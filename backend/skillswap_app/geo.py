@@ -0,0 +1,124 @@
+# backend/skillswap_app/geo.py
+"""
+Integer geohashes for proximity search without database extensions.
+
+A geohash interleaves longitude and latitude bits so that every prefix is
+a grid cell and nearby points share long prefixes. Stored as an integer
+(the 45 bits of a 9-character geohash, cells of roughly 5 m) a prefix is
+simply a contiguous integer range, so "which profiles are in these cells"
+is a handful of B-tree range scans on any backend, with no LIKE or
+collation rules involved.
+"""
+import math
+
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+MAX_PRECISION = 9  # characters
+BITS = 5 * MAX_PRECISION
+LON_BITS = (BITS + 1) // 2
+LAT_BITS = BITS // 2
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = 111.32
+DEFAULT_RADIUS_KM = 10.0
+MAX_RADIUS_KM = 500.0  # beyond this the cell ranges cover most of a continent
+
+
+def _spread(x):
+    """Move bit k of a 32-bit integer to bit 2k"""
+    x = (x | (x << 16)) & 0x0000FFFF0000FFFF
+    x = (x | (x << 8)) & 0x00FF00FF00FF00FF
+    x = (x | (x << 4)) & 0x0F0F0F0F0F0F0F0F
+    x = (x | (x << 2)) & 0x3333333333333333
+    x = (x | (x << 1)) & 0x5555555555555555
+    return x
+
+
+def _quantize(value, low, high, bits):
+    cells = 1 << bits
+    index = int((value - low) / (high - low) * cells)
+    return min(max(index, 0), cells - 1)
+
+
+def encode(lat, lon, precision=MAX_PRECISION):
+    """Integer geohash of a point at the given precision (in characters)"""
+    lon_q = _quantize(lon, -180.0, 180.0, LON_BITS)
+    lat_q = _quantize(lat, -90.0, 90.0, LAT_BITS)
+    # BITS is odd, so the most significant bit is a longitude bit: longitude
+    # bit k lands on bit 2k and latitude bit k on bit 2k + 1
+    code = _spread(lon_q) | (_spread(lat_q) << 1)
+    return code >> (BITS - 5 * precision)
+
+
+def to_string(code, precision=MAX_PRECISION):
+    """Standard base32 geohash text for an integer geohash (for debugging)"""
+    return ''.join(BASE32[(code >> (5 * (precision - 1 - i))) & 31] for i in range(precision))
+
+
+def cell_span(precision):
+    """(lat_degrees, lon_degrees) covered by one cell at this precision"""
+    bits = 5 * precision
+    return 180.0 / (1 << (bits // 2)), 360.0 / (1 << ((bits + 1) // 2))
+
+
+def cell_range(code, precision):
+    """Half-open range of full-precision integers that share this prefix"""
+    shift = BITS - 5 * precision
+    return code << shift, (code + 1) << shift
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def bounding_box(lat, lon, radius_km):
+    """(min_lat, max_lat, min_lon, max_lon), or None for the longitude part
+    when the box wraps the antimeridian or reaches a pole"""
+    d_lat = radius_km / KM_PER_DEGREE
+    min_lat, max_lat = lat - d_lat, lat + d_lat
+    if min_lat <= -90 or max_lat >= 90:
+        return max(min_lat, -90.0), min(max_lat, 90.0), None, None
+    d_lon = radius_km / (KM_PER_DEGREE * math.cos(math.radians(max(abs(min_lat), abs(max_lat)))))
+    if lon - d_lon < -180 or lon + d_lon > 180:
+        return min_lat, max_lat, None, None
+    return min_lat, max_lat, lon - d_lon, lon + d_lon
+
+
+def precision_for_radius(lat, radius_km):
+    """Finest precision whose cells are at least radius_km tall and wide
+
+    With cells that large, a circle centred anywhere in a cell can only
+    reach into the eight cells around it.
+    """
+    farthest_lat = min(89.9, abs(lat) + radius_km / KM_PER_DEGREE)
+    shrink = math.cos(math.radians(farthest_lat))
+    for precision in range(MAX_PRECISION, 0, -1):
+        lat_span, lon_span = cell_span(precision)
+        if (lat_span * KM_PER_DEGREE >= radius_km
+                and lon_span * KM_PER_DEGREE * shrink >= radius_km):
+            return precision
+    return None
+
+
+def covering_ranges(lat, lon, radius_km):
+    """Sorted, merged integer ranges whose cells cover the circle"""
+    precision = precision_for_radius(lat, radius_km)
+    if precision is None:
+        return [(0, 1 << BITS)]
+    lat_span, lon_span = cell_span(precision)
+    codes = set()
+    for d_lat in (-lat_span, 0.0, lat_span):
+        neighbour_lat = min(max(lat + d_lat, -90.0), 90.0)
+        for d_lon in (-lon_span, 0.0, lon_span):
+            neighbour_lon = (lon + d_lon + 180.0) % 360.0 - 180.0
+            codes.add(encode(neighbour_lat, neighbour_lon, precision))
+
+    ranges = []
+    for low, high in sorted(cell_range(code, precision) for code in codes):
+        if ranges and low <= ranges[-1][1]:
+            ranges[-1] = (ranges[-1][0], max(ranges[-1][1], high))
+        else:
+            ranges.append((low, high))
+    return ranges
@@ -0,0 +1,114 @@
+# backend/skillswap_app/health.py
+"""
+Readiness checks for the load balancer / orchestrator.
+
+Liveness only says the process can answer, so it checks nothing. Readiness
+checks that the database answers, that every migration on disk has been
+applied and that the cache round-trips a value. The checks run on a
+background thread with their own connection. A probe waits at most
+HEALTH_CHECK_TIMEOUT seconds for them, and the result is reused for
+HEALTH_CHECK_CACHE_SECONDS. At most one run is in flight per process, so a
+slow database gets one probe query at a time, however often it is polled.
+"""
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+
+_migrations_applied = False
+
+
+def check_database():
+    with connections[DEFAULT_DB_ALIAS].cursor() as cursor:
+        cursor.execute('SELECT 1')
+        cursor.fetchone()
+
+
+def check_migrations():
+    # Loading the graph reads every migration file; once a process has seen
+    # them all applied it has nothing new to find, so skip it from then on
+    global _migrations_applied
+    if _migrations_applied:
+        return
+    from django.db.migrations.executor import MigrationExecutor  # only needed here, keeps worker boot lean
+
+    executor = MigrationExecutor(connections[DEFAULT_DB_ALIAS])
+    pending = executor.migration_plan(executor.loader.graph.leaf_nodes())
+    if pending:
+        raise RuntimeError(f'{len(pending)} unapplied migration(s), first {pending[0][0]}')
+    _migrations_applied = True
+
+
+def check_cache():
+    token = uuid.uuid4().hex
+    cache.set('health:readiness', token, 10)
+    if cache.get('health:readiness') != token:
+        raise RuntimeError('cache did not return the value just written')
+
+
+CHECKS = {
+    'database': check_database,
+    'migrations': check_migrations,
+    'cache': check_cache,
+}
+
+
+def run_checks():
+    """{'status': 'ready' | 'unavailable', 'checks': {name: {'ok', 'ms', 'error'?}}}"""
+    results = {}
+    for name, check in CHECKS.items():
+        start = time.perf_counter()
+        try:
+            check()
+        except Exception as e:
+            results[name] = {'ok': False, 'error': str(e) or e.__class__.__name__}
+        else:
+            results[name] = {'ok': True}
+        results[name]['ms'] = round((time.perf_counter() - start) * 1000, 2)
+    ready = all(result['ok'] for result in results.values())
+    return {'status': 'ready' if ready else 'unavailable', 'checks': results}
+
+
+class Readiness:
+    """Runs the checks off the request thread, one run at a time, and caches the result"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.result = None
+        self.checked_at = 0.0
+        self.running = None  # Event set when the run in flight finishes
+
+    def check(self):
+        with self.lock:
+            if self.result is not None and time.monotonic() - self.checked_at < settings.HEALTH_CHECK_CACHE_SECONDS:
+                return self.result
+            if self.running is None:
+                self.running = threading.Event()
+                threading.Thread(target=self._run, args=(self.running,), name='readiness-check',
+                                 daemon=True).start()
+            running = self.running
+        if not running.wait(settings.HEALTH_CHECK_TIMEOUT):
+            return {'status': 'unavailable',
+                    'error': f'checks did not finish within {settings.HEALTH_CHECK_TIMEOUT}s'}
+        return self.result
+
+    def _run(self, running):
+        try:
+            result = run_checks()
+        finally:
+            connections.close_all()
+        with self.lock:
+            self.result = result
+            self.checked_at = time.monotonic()
+            self.running = None
+        running.set()
+
+    def reset(self):
+        with self.lock:
+            self.result = None
+
+
+readiness = Readiness()
@@ -0,0 +1,137 @@
+# backend/skillswap_app/jobs.py
+"""
+Database-backed job queue for side effects of writes.
+
+enqueue() inserts a Job row in the caller's transaction, so a job exists if
+and only if the write that caused it committed, and the request returns
+without running it. `manage.py run_jobs` claims due jobs in batches and
+hands all claimed jobs of one name to its handler in a single call, so a
+burst of writes to the same rows costs one refresh instead of one per write.
+
+Delivery is at least once. A claim is a lease (JOBS_LEASE_SECONDS), and a
+job whose worker died before finishing becomes claimable again when the
+lease runs out, so handlers must be idempotent. A handler that raises puts
+its jobs back with exponential backoff. After JOBS_MAX_ATTEMPTS they are
+left as 'failed' for the admin to inspect and retry. Finished jobs are
+deleted.
+
+With JOBS_EAGER (used by the test run) enqueue() runs the handler after
+commit instead, in the same process.
+"""
+import os
+import socket
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from . import metrics
+from .models import Job
+
+HANDLERS = {}
+
+
+def handler(name):
+    """Register func(payloads) as the handler for jobs called name"""
+    def register(func):
+        HANDLERS[name] = func
+        return func
+    return register
+
+
+def enqueue(name, **payload):
+    """Queue a job in the current transaction; payload must be JSON serializable"""
+    if name not in HANDLERS:
+        raise KeyError(f'No handler registered for job {name!r}')
+    if getattr(settings, 'JOBS_EAGER', False):
+        transaction.on_commit(lambda: HANDLERS[name]([payload]))
+        return None
+    return Job.objects.create(name=name, payload=payload)
+
+
+def backoff(attempts):
+    """Delay before retry number attempts: JOBS_RETRY_DELAY doubled per attempt, capped"""
+    delay = settings.JOBS_RETRY_DELAY * 2 ** (attempts - 1)
+    return timedelta(seconds=min(delay, settings.JOBS_RETRY_MAX_DELAY))
+
+
+def worker_id():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def claim(limit, lease=None):
+    """Lease up to limit due jobs to this call and return them
+
+    The claim is a conditional UPDATE tagged with a fresh token, so two
+    workers can never both win the same row, on any database backend.
+    """
+    now = timezone.now()
+    claimable = Q(status='queued', run_after__lte=now) | Q(status='running', locked_until__lt=now)
+    ids = list(Job.objects.filter(claimable).order_by('run_after', 'id').values_list('id', flat=True)[:limit])
+    if not ids:
+        return []
+    token = f'{worker_id()}:{uuid.uuid4().hex[:8]}'
+    lease = lease if lease is not None else settings.JOBS_LEASE_SECONDS
+    Job.objects.filter(claimable, id__in=ids).update(
+        status='running', locked_by=token, locked_until=now + timedelta(seconds=lease),
+    )
+    return list(Job.objects.filter(locked_by=token, status='running').order_by('id'))
+
+
+def _finish(jobs, error=None):
+    if error is None:
+        Job.objects.filter(id__in=[job.id for job in jobs], locked_by=jobs[0].locked_by).delete()
+        return
+    now = timezone.now()
+    for job in jobs:
+        attempts = job.attempts + 1
+        if attempts >= settings.JOBS_MAX_ATTEMPTS:
+            status, run_after = 'failed', job.run_after
+        else:
+            status, run_after = 'queued', now + backoff(attempts)
+        # Only while this claim still holds the lease: once it has expired
+        # another worker may have claimed the job again
+        Job.objects.filter(id=job.id, locked_by=job.locked_by).update(
+            attempts=attempts, last_error=error[:5000], locked_by='', locked_until=None,
+            status=status, run_after=run_after,
+        )
+
+
+def run_batch(limit=None, lease=None):
+    """Claim and run one batch; returns {name: (jobs, error or None)}"""
+    jobs = claim(limit or settings.JOBS_BATCH_SIZE, lease)
+    groups = {}
+    for job in jobs:
+        groups.setdefault(job.name, []).append(job)
+    results = {}
+    for name, group in groups.items():
+        func = HANDLERS.get(name)
+        error = None
+        try:
+            if func is None:
+                raise KeyError(f'No handler registered for job {name!r}')
+            with transaction.atomic():
+                func([job.payload for job in group])
+        except Exception as e:
+            error = f'{e.__class__.__name__}: {e}'
+        _finish(group, error)
+        results[name] = (len(group), error)
+    return results
+
+
+@metrics.sampled('skillswap_jobs', 'Jobs in the queue by name and status (queued, running, failed)',
+                 ('name', 'status'))
+def queue_depth():
+    rows = Job.objects.values_list('name', 'status').annotate(count=Count('id')).order_by()
+    return {(name, status): count for name, status, count in rows}
+
+
+def retry_failed(queryset=None):
+    """Put failed jobs back in the queue with a fresh set of attempts"""
+    queryset = Job.objects.all() if queryset is None else queryset
+    return queryset.filter(status='failed').update(
+        status='queued', attempts=0, run_after=timezone.now(), locked_by='', locked_until=None,
+    )
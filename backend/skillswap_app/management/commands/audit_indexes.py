@@ -0,0 +1,232 @@
+import itertools
+import json
+import re
+from collections import OrderedDict
+from urllib.parse import quote
+
+from django.contrib.auth.models import User
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, connection, reset_queries, transaction
+from django.db.models import Count
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from skillswap_app import analytics
+from skillswap_app.models import Skill, UserSkill, SwapRequest
+
+EXPLAINABLE = re.compile(r'^\s*(SELECT|UPDATE|DELETE)\b', re.IGNORECASE)
+
+
+def sqlite_full_scans(rows):
+    """Tables read without an index, from EXPLAIN QUERY PLAN rows"""
+    scans = []
+    for row in rows:
+        detail = row[-1]
+        match = re.match(r'SCAN (?:TABLE )?(\w+)', detail)
+        if match and 'INDEX' not in detail and match.group(1) != 'CONSTANT':
+            scans.append(match.group(1))
+    return scans
+
+
+def mysql_full_scans(columns, rows):
+    """Tables with access type ALL, from EXPLAIN rows"""
+    scans = []
+    for row in rows:
+        row = dict(zip(columns, row))
+        if row.get('type') == 'ALL' and row.get('table'):
+            scans.append(row['table'])
+    return scans
+
+
+def postgresql_full_scans(plan):
+    """Relations read by a Seq Scan node, from EXPLAIN (FORMAT JSON)"""
+    scans = []
+    nodes = [node['Plan'] for node in plan]
+    while nodes:
+        node = nodes.pop()
+        if node.get('Node Type') == 'Seq Scan':
+            scans.append(node['Relation Name'])
+        nodes.extend(node.get('Plans', []))
+    return scans
+
+
+def explain(sql):
+    """Full-scan tables for one captured statement on the configured backend"""
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql)
+            return sqlite_full_scans(cursor.fetchall())
+        if connection.vendor == 'mysql':
+            cursor.execute('EXPLAIN ' + sql)
+            return mysql_full_scans([col[0] for col in cursor.description], cursor.fetchall())
+        if connection.vendor == 'postgresql':
+            cursor.execute('EXPLAIN (FORMAT JSON) ' + sql)
+            plan = cursor.fetchone()[0]
+            return postgresql_full_scans(json.loads(plan) if isinstance(plan, str) else plan)
+    raise CommandError(f'EXPLAIN is not supported for {connection.vendor}')
+
+
+def request_scenarios(user):
+    """(method, path, json body) for every non-staff API view, with ids taken from the data
+
+    Shared with benchmarks/bench_endpoints.py.
+    """
+    skill = UserSkill.objects.filter(can_teach=True).select_related('skill').first()
+    skill = skill.skill if skill else Skill.objects.first()
+    yield 'GET', reverse('health_check'), None
+    yield 'GET', reverse('liveness'), None
+    yield 'GET', reverse('readiness'), None
+    yield 'GET', reverse('cache_stats'), None
+    yield 'GET', reverse('get_categories'), None
+    yield 'GET', reverse('get_skills'), None
+    yield 'GET', reverse('get_skills') + '?search=a', None
+    yield 'GET', reverse('browse_skills'), None
+    if skill is not None:
+        yield 'GET', reverse('browse_skills') + f'?category_id={skill.category_id}', None
+    yield 'GET', reverse('browse_skills') + '?location=a&search=a', None
+    yield 'GET', reverse('browse_skills') + '?lat=19.07&lon=72.87&radius_km=25', None
+    yield 'GET', reverse('trending_skills'), None
+    yield 'GET', reverse('in_demand_skills'), None
+    yield 'GET', reverse('top_teachers'), None
+    if user is None:
+        return
+
+    yield 'GET', reverse('get_reviews', args=[user.id]), None
+    yield 'GET', reverse('get_profile'), None
+    yield 'GET', reverse('get_swap_requests'), None
+    yield 'GET', reverse('get_swap_requests') + '?status=pending', None
+    yield 'POST', reverse('update_profile'), {'bio': user.profile.bio if hasattr(user, 'profile') else ''}
+    if skill is not None:
+        yield 'POST', reverse('add_user_skill'), {'skill_id': skill.id}
+        # One of the user's own skills, so the request also works when the add was rolled back
+        owned = UserSkill.objects.filter(user=user).values_list('skill_id', flat=True).first()
+        yield 'POST', reverse('remove_user_skill'), {'skill_id': owned or skill.id}
+        teacher = UserSkill.objects.filter(skill=skill, can_teach=True).exclude(user=user).first()
+        if teacher is not None:
+            yield 'POST', reverse('send_swap_request'), {'to_user_id': teacher.user_id,
+                                                          'requested_skill_id': skill.id}
+    current = [{'skill_id': us.skill_id, 'can_teach': us.can_teach, 'experience_level': us.experience_level}
+               for us in UserSkill.objects.filter(user=user)]
+    yield 'PUT', reverse('replace_user_skills'), {'skills': current}
+    received = SwapRequest.objects.filter(to_user=user).first()
+    if received is not None:
+        yield 'POST', reverse('update_swap_request', args=[received.id]), {'status': received.status}
+    completed = SwapRequest.objects.filter(from_user=user, status='completed').first()
+    if completed is not None:
+        yield 'POST', reverse('create_review'), {'swap_request_id': completed.id, 'rating': 5}
+
+
+def staff_scenarios():
+    """(method, path, json body) for the staff-only analytics views"""
+    skill = UserSkill.objects.filter(can_teach=True).values_list('skill__name', 'skill_id').first()
+    yield 'GET', reverse('analytics_reports'), None
+    for report in analytics.REPORTS:
+        path = reverse('analytics_report', args=[report])
+        if report == 'teachers' and skill:
+            path += f'?skill={quote(skill[0])}'
+        elif report == 'matches' and skill:
+            yield 'GET', path + f'?skill_id={skill[1]}', None
+        yield 'GET', path, None
+
+
+class Command(BaseCommand):
+    help = 'Request every API view, EXPLAIN the queries it runs and report full table scans'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='Username to make authenticated requests as (default: busiest user)')
+        parser.add_argument('--min-rows', type=int, default=0,
+                            help='Ignore scans of tables with fewer rows than this')
+        parser.add_argument('--fail-on-scan', action='store_true',
+                            help='Exit with an error if any full scan is reported (for CI)')
+
+    def handle(self, *args, **options):
+        user = self._pick_user(options['user'])
+        if user is None:
+            self.stdout.write(self.style.WARNING('⏭️  No users found, auditing anonymous endpoints only'))
+
+        self.stdout.write(f'🔎 Auditing queries on {connection.vendor} '
+                          f'as {user.username if user else "anonymous"}')
+        self._row_counts = {}
+        self._tables = set(connection.introspection.table_names())
+        findings = OrderedDict()
+        # Writes are rolled back and the response cache is bypassed so every
+        # request really reaches the database
+        with override_settings(RESPONSE_CACHE_ENABLED=False,
+                               ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']), transaction.atomic():
+            client = Client()
+            if user is not None:
+                client.force_login(user)
+            scenarios = request_scenarios(user)
+            if user is not None and user.is_staff:
+                scenarios = itertools.chain(scenarios, staff_scenarios())
+            for method, path, body in scenarios:
+                findings[f'{method} {path}'] = self._audit(client, method, path, body, options['min_rows'])
+            transaction.set_rollback(True)
+
+        total = sum(len(scans) for scans in findings.values())
+        if total:
+            self.stdout.write(self.style.WARNING(f'\n⚠️  {total} queries with full table scans'))
+        else:
+            self.stdout.write(self.style.SUCCESS('\n✅ No full table scans'))
+        if total and options['fail_on_scan']:
+            raise CommandError(f'{total} queries use full table scans')
+
+    def _pick_user(self, username):
+        if username:
+            try:
+                return User.objects.get(username=username)
+            except User.DoesNotExist:
+                raise CommandError(f'User {username} not found')
+        busiest = (SwapRequest.objects.values('to_user').annotate(n=Count('id'))
+                   .order_by('-n').values_list('to_user', flat=True).first())
+        return User.objects.filter(id=busiest).first() or User.objects.order_by('id').first()
+
+    def _audit(self, client, method, path, body, min_rows):
+        scans = []
+        # A savepoint per request, so a failed statement (which aborts the
+        # transaction on PostgreSQL) only loses this request's plans
+        with transaction.atomic():
+            # The request_started signal clears connection.queries, which
+            # would throw off the capture's starting offset under DEBUG
+            reset_queries()
+            with CaptureQueriesContext(connection) as captured:
+                if method == 'GET':
+                    response = client.get(path)
+                else:
+                    response = client.generic(method, path, json.dumps(body), content_type='application/json')
+
+            seen = set()
+            for query in captured.captured_queries:
+                sql = query['sql']
+                if sql in seen or not EXPLAINABLE.match(sql):
+                    continue
+                seen.add(sql)
+                try:
+                    tables = explain(sql)
+                except DatabaseError as e:
+                    self.stdout.write(self.style.WARNING(f'   could not EXPLAIN ({e}): {sql[:160]}'))
+                    continue
+                tables = [t for t in tables if (self._row_count(t) or 0) >= min_rows or t not in self._tables]
+                if tables:
+                    scans.append((tables, sql))
+
+        status = self.style.SUCCESS('✅') if not scans else self.style.WARNING('⚠️ ')
+        self.stdout.write(f'\n{status} {method} {path} -> {response.status_code}, '
+                          f'{len(captured.captured_queries)} queries, {len(scans)} with full scans')
+        for tables, sql in scans:
+            counts = ', '.join(t if t not in self._tables else f'{t} ({self._row_count(t)} rows)'
+                               for t in tables)
+            self.stdout.write(f'   SCAN {counts}: {sql[:160]}')
+        return scans
+
+    def _row_count(self, table):
+        """Rows in a table, or None for subquery aliases and the like"""
+        if table not in self._tables:
+            return None
+        if table not in self._row_counts:
+            with connection.cursor() as cursor:
+                cursor.execute(f'SELECT COUNT(*) FROM {connection.ops.quote_name(table)}')
+                self._row_counts[table] = cursor.fetchone()[0]
+        return self._row_counts[table]
@@ -0,0 +1,100 @@
+from collections import Counter, defaultdict
+from difflib import SequenceMatcher
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+
+from skillswap_app import cache, versions
+from skillswap_app.models import Profile, Location, LocationAlias, normalize_location
+
+
+class Command(BaseCommand):
+    help = 'Cluster free-text profile locations into canonical Location rows and link profiles to them'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threshold', type=float, default=0.88,
+                            help='Similarity (0-1) above which two spellings are treated as the same place')
+        parser.add_argument('--min-length', type=int, default=5,
+                            help='Shorter names are only merged on exact normalized match')
+        parser.add_argument('--dry-run', action='store_true', help='Print the clusters without writing')
+
+    def handle(self, *args, **options):
+        # raw spelling -> number of profiles using it
+        raw_counts = dict(
+            Profile.objects.exclude(location='')
+            .values_list('location')
+            .annotate(n=Count('id'))
+            .values_list('location', 'n')
+        )
+        if not raw_counts:
+            self.stdout.write(self.style.WARNING('⏭️  No profile locations to backfill'))
+            return
+
+        # normalized key -> Counter of raw spellings
+        spellings = defaultdict(Counter)
+        for raw, n in raw_counts.items():
+            key = normalize_location(raw)
+            if key:
+                spellings[key][raw] += n
+
+        clusters = self._cluster(spellings, options['threshold'], options['min_length'])
+        known = dict(LocationAlias.objects.filter(alias__in=spellings).values_list('alias', 'location_id'))
+
+        self.stdout.write(f'📍 {len(raw_counts)} spellings -> {len(clusters)} locations')
+        for keys in clusters:
+            name = self._canonical_name(keys, spellings)
+            variants = sorted(raw for key in keys for raw in spellings[key])
+            self.stdout.write(f'   {name}: {", ".join(repr(v) for v in variants)}')
+
+        if options['dry_run']:
+            return
+
+        linked = 0
+        with transaction.atomic():
+            for keys in clusters:
+                existing = next((known[key] for key in keys if key in known), None)
+                if existing is not None:
+                    location = Location.objects.get(pk=existing)
+                else:
+                    location, _ = Location.objects.get_or_create(name=self._canonical_name(keys, spellings))
+                LocationAlias.objects.bulk_create(
+                    [LocationAlias(alias=key, location=location) for key in keys if key not in known],
+                    ignore_conflicts=True,
+                )
+                # Spellings merged in from other locations resolve here from now on
+                LocationAlias.objects.filter(alias__in=keys).exclude(location=location).update(location=location)
+                raws = [raw for key in keys for raw in spellings[key]]
+                linked += (Profile.objects.filter(location__in=raws)
+                           .exclude(canonical_location=location)
+                           .update(canonical_location=location))
+                merged = {known[key] for key in keys if key in known} - {location.id}
+                Location.objects.filter(id__in=merged, aliases=None, profiles=None).delete()
+            # Queryset updates bypass the model signals
+            versions.bump(versions.TEACHERS)
+            transaction.on_commit(cache.invalidate_browse)
+
+        self.stdout.write(self.style.SUCCESS(f'✅ Linked {linked} profiles to {len(clusters)} locations'))
+
+    def _cluster(self, spellings, threshold, min_length):
+        """Greedy clustering: most used keys first, each joins the first similar cluster"""
+        ordered = sorted(spellings, key=lambda key: (-sum(spellings[key].values()), key))
+        clusters = []
+        for key in ordered:
+            for keys in clusters:
+                head = keys[0]
+                if (min(len(key), len(head)) >= min_length
+                        and SequenceMatcher(None, key, head).ratio() >= threshold):
+                    keys.append(key)
+                    break
+            else:
+                clusters.append([key])
+        return clusters
+
+    def _canonical_name(self, keys, spellings):
+        """Most used raw spelling in the cluster, tidied"""
+        combined = Counter()
+        for key in keys:
+            combined.update(spellings[key])
+        raw = max(combined, key=lambda spelling: (combined[spelling], spelling))
+        return ' '.join(raw.split())[:100]
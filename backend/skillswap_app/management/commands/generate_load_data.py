@@ -0,0 +1,265 @@
+import bisect
+import itertools
+import random
+import time
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from skillswap_app import cache, geo, versions
+from skillswap_app.models import Profile, Category, Skill, UserSkill, SwapRequest, Review, Location
+
+CATEGORIES = ['Programming', 'Languages', 'Music', 'Arts & Crafts', 'Sports', 'Cooking']
+
+# (name, latitude, longitude); earlier cities get more users (Zipf)
+CITIES = [
+    ('Mumbai', 19.076, 72.878), ('Delhi', 28.614, 77.209), ('Bangalore', 12.972, 77.595),
+    ('Hyderabad', 17.385, 78.487), ('Chennai', 13.083, 80.271), ('Kolkata', 22.573, 88.364),
+    ('Pune', 18.520, 73.857), ('Ahmedabad', 23.023, 72.571), ('Jaipur', 26.912, 75.787),
+    ('Lucknow', 26.847, 80.946), ('Kochi', 9.931, 76.267), ('Indore', 22.720, 75.858),
+    ('Chandigarh', 30.733, 76.779), ('Goa', 15.299, 74.124), ('Bhopal', 23.260, 77.413),
+]
+
+# Share of requests in each status, and of completed requests that get reviewed
+STATUS_WEIGHTS = [('pending', 40), ('accepted', 20), ('rejected', 15), ('completed', 25)]
+REVIEW_RATE = 0.7
+RATING_WEIGHTS = [1, 2, 5, 12, 20]  # 1..5 stars
+PARETO_ALPHA = 1.5  # mean activity = alpha / (alpha - 1) = 3
+
+
+def zipf_cum_weights(n, s):
+    return list(itertools.accumulate(1.0 / (rank ** s) for rank in range(1, n + 1)))
+
+
+def pick(rng, items, cum_weights):
+    """random.choices(k=1) without the per-call setup cost"""
+    return items[bisect.bisect(cum_weights, rng.random() * cum_weights[-1])]
+
+
+class Command(BaseCommand):
+    help = 'Generate a large synthetic dataset (users, profiles, skills, requests, reviews) for load testing'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10000)
+        parser.add_argument('--skills', type=int, default=300, help='Catalog size (existing skills are reused)')
+        parser.add_argument('--skills-per-user', type=float, default=3.0, help='Average skills per user')
+        parser.add_argument('--requests-per-user', type=float, default=2.0, help='Average requests sent per user')
+        parser.add_argument('--zipf', type=float, default=1.1, help='Zipf exponent for skill and city popularity')
+        parser.add_argument('--days', type=int, default=365, help='Spread timestamps over this many past days')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--password', default='loadtest', help='Shared password (hashed once)')
+        parser.add_argument('--prefix', default='load', help='Username prefix')
+        parser.add_argument('--no-summaries', action='store_true',
+                            help='Skip rebuilding the summary and rollup tables afterwards')
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.now = timezone.now()
+        self.days = options['days']
+        started = time.perf_counter()
+
+        skill_ids = self._catalog(options['skills'])
+        self.rng.shuffle(skill_ids)
+        self.skill_ids = skill_ids
+        self.skill_weights = zipf_cum_weights(len(skill_ids), options['zipf'])
+
+        first_id = (User.objects.aggregate(m=Max('id'))['m'] or 0) + 1
+        user_ids = list(range(first_id, first_id + options['users']))
+        # Power-law activity: a few users do most of the teaching and requesting
+        activity = [self.rng.paretovariate(PARETO_ALPHA) for _ in user_ids]
+
+        joined = self._users(user_ids, options['prefix'], options['password'])
+        self._profiles(user_ids, joined, options['zipf'])
+        teachers = self._user_skills(user_ids, activity, joined, options['skills_per_user'])
+        completed = self._requests(user_ids, activity, joined, teachers, options['requests_per_user'])
+        self._reviews(completed)
+        self._reset_sequences()
+
+        # Raw inserts skip the model signals
+        versions.bump(versions.CATALOG, versions.TEACHERS)
+        cache.invalidate_browse()
+        cache.invalidate_catalog()
+        if not options['no_summaries']:
+            call_command('rebuild_summaries', stdout=self.stdout)
+            call_command('rebuild_rollups', stdout=self.stdout)
+        self.stdout.write(self.style.SUCCESS(f'🎉 Done in {time.perf_counter() - started:.1f}s'))
+
+    def _report(self, label, rows, started):
+        elapsed = max(time.perf_counter() - started, 1e-9)
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ {rows:,} {label} in {elapsed:.1f}s ({rows / elapsed:,.0f} rows/s)'
+        ))
+
+    def _insert(self, model, fields, rows):
+        """INSERT tuples of field values in batches, one transaction per batch
+
+        A plain executemany: bulk_create spends most of its time compiling
+        every value through the ORM, and would also overwrite the backdated
+        auto_now/auto_now_add timestamps.
+        """
+        meta = model._meta
+        qn = connection.ops.quote_name
+        columns = [meta.get_field(name).column for name in fields]
+        sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+            qn(meta.db_table), ', '.join(qn(column) for column in columns), ', '.join(['%s'] * len(columns))
+        )
+        datetimes = [i for i, name in enumerate(fields)
+                     if meta.get_field(name).get_internal_type() == 'DateTimeField']
+        adapt = connection.ops.adapt_datetimefield_value
+        total = 0
+        while True:
+            batch = list(itertools.islice(rows, self.batch_size))
+            if not batch:
+                return total
+            if datetimes:
+                batch = [list(row) for row in batch]
+                for row in batch:
+                    for i in datetimes:
+                        row[i] = adapt(row[i])
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.executemany(sql, batch)
+            total += len(batch)
+
+    def _timestamp(self, after=None):
+        """Random past moment, denser towards now (a growing site)"""
+        start = after or self.now - timedelta(days=self.days)
+        span = (self.now - start).total_seconds()
+        return start + timedelta(seconds=span * self.rng.random() ** 0.5)
+
+    def _catalog(self, size):
+        categories = [Category.objects.get_or_create(name=name)[0] for name in CATEGORIES]
+        existing = list(Skill.objects.order_by('id').values_list('id', flat=True)[:size])
+        missing = size - len(existing)
+        if missing > 0:
+            first = Skill.objects.count()
+            Skill.objects.bulk_create([
+                Skill(name=f'Skill {first + i}', category=categories[i % len(categories)],
+                      description=f'Synthetic skill {first + i}')
+                for i in range(missing)
+            ], batch_size=self.batch_size)
+            existing = list(Skill.objects.order_by('id').values_list('id', flat=True)[:size])
+        self.stdout.write(f'📚 Catalog: {len(existing)} skills in {len(categories)} categories')
+        return existing
+
+    def _users(self, user_ids, prefix, password):
+        started = time.perf_counter()
+        # One hash for everyone: hashing per user would dominate the run
+        password_hash = make_password(password)
+        joined = [self._timestamp() for _ in user_ids]
+        fields = ['id', 'username', 'email', 'password', 'first_name', 'last_name',
+                  'is_staff', 'is_superuser', 'is_active', 'date_joined']
+        rows = self._insert(User, fields, (
+            (user_id, f'{prefix}{user_id}', f'{prefix}{user_id}@example.com', password_hash, '', '',
+             False, False, True, joined_at)
+            for user_id, joined_at in zip(user_ids, joined)
+        ))
+        self._report('users', rows, started)
+        return joined
+
+    def _profiles(self, user_ids, joined, zipf):
+        started = time.perf_counter()
+        cities = [(name, lat, lon, Location.objects.for_text(name).id) for name, lat, lon in CITIES]
+        city_weights = zipf_cum_weights(len(cities), zipf)
+
+        def profiles():
+            for user_id, joined_at in zip(user_ids, joined):
+                name, lat, lon, location_id = pick(self.rng, cities, city_weights)
+                lat += self.rng.gauss(0, 0.08)
+                lon += self.rng.gauss(0, 0.08)
+                yield (user_id, 'Synthetic load test user', name, location_id, lat, lon, geo.encode(lat, lon),
+                       '', '', joined_at, joined_at)
+        fields = ['user', 'bio', 'location', 'canonical_location', 'latitude', 'longitude', 'geohash',
+                  'phone', 'avatar_url', 'created_at', 'updated_at']
+        self._report('profiles', self._insert(Profile, fields, profiles()), started)
+
+    def _user_skills(self, user_ids, activity, joined, per_user):
+        started = time.perf_counter()
+        mean_activity = PARETO_ALPHA / (PARETO_ALPHA - 1)
+        limit = min(len(self.skill_ids), 50)
+        levels = [level for level, _ in UserSkill.EXPERIENCE_CHOICES]
+        teachers = {}
+
+        def user_skills():
+            for user_id, weight, joined_at in zip(user_ids, activity, joined):
+                count = max(1, min(limit, round(per_user * weight / mean_activity)))
+                chosen = set()
+                while len(chosen) < count:
+                    chosen.add(pick(self.rng, self.skill_ids, self.skill_weights))
+                for skill_id in chosen:
+                    can_teach = self.rng.random() < 0.5
+                    if can_teach:
+                        teachers.setdefault(skill_id, []).append(user_id)
+                    yield (user_id, skill_id, can_teach, self.rng.choice(levels), self._timestamp(joined_at))
+        fields = ['user', 'skill', 'can_teach', 'experience_level', 'created_at']
+        self._report('user skills', self._insert(UserSkill, fields, user_skills()), started)
+        return teachers
+
+    def _requests(self, user_ids, activity, joined, teachers, per_user):
+        started = time.perf_counter()
+        joined_by_user = dict(zip(user_ids, joined))
+        activity_weights = list(itertools.accumulate(activity))
+        statuses = [status for status, _ in STATUS_WEIGHTS]
+        status_weights = list(itertools.accumulate(weight for _, weight in STATUS_WEIGHTS))
+        next_id = (SwapRequest.objects.aggregate(m=Max('id'))['m'] or 0) + 1
+        total = round(len(user_ids) * per_user)
+        completed = []
+        if total and (not teachers or len(user_ids) < 2):
+            self.stdout.write(self.style.WARNING('⏭️  No teacher anyone else could ask: skipping swap requests'))
+            total = 0
+
+        def swap_requests():
+            nonlocal next_id
+            made = 0
+            # Backstop for pathological weights where valid pairs are almost never drawn
+            attempts = total * 100
+            while made < total and attempts:
+                attempts -= 1
+                skill_id = pick(self.rng, self.skill_ids, self.skill_weights)
+                if skill_id not in teachers:
+                    continue
+                from_user = pick(self.rng, user_ids, activity_weights)
+                to_user = self.rng.choice(teachers[skill_id])
+                if to_user == from_user:
+                    continue
+                status = pick(self.rng, statuses, status_weights)
+                created_at = self._timestamp(max(joined_by_user[from_user], joined_by_user[to_user]))
+                offered = pick(self.rng, self.skill_ids, self.skill_weights) if self.rng.random() < 0.5 else None
+                if status == 'completed':
+                    completed.append((next_id, from_user, to_user, created_at))
+                yield (next_id, from_user, to_user, skill_id, offered, 'Synthetic request', status,
+                       created_at, created_at)
+                next_id += 1
+                made += 1
+        fields = ['id', 'from_user', 'to_user', 'requested_skill', 'offered_skill', 'message', 'status',
+                  'created_at', 'updated_at']
+        self._report('swap requests', self._insert(SwapRequest, fields, swap_requests()), started)
+        return completed
+
+    def _reviews(self, completed):
+        started = time.perf_counter()
+        ratings = list(range(1, 6))
+        rating_weights = list(itertools.accumulate(RATING_WEIGHTS))
+
+        def reviews():
+            for request_id, from_user, to_user, created_at in completed:
+                if self.rng.random() < REVIEW_RATE:
+                    yield (from_user, to_user, request_id, pick(self.rng, ratings, rating_weights),
+                           'Synthetic review', self._timestamp(created_at))
+        fields = ['from_user', 'to_user', 'swap_request', 'rating', 'comment', 'created_at']
+        self._report('reviews', self._insert(Review, fields, reviews()), started)
+
+    def _reset_sequences(self):
+        """Explicit ids leave PostgreSQL sequences behind (no-op elsewhere)"""
+        statements = connection.ops.sequence_reset_sql(no_style(), [User, SwapRequest])
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
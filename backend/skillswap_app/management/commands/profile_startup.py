@@ -0,0 +1,111 @@
+import json
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand, CommandError
+
+# Runs in a fresh interpreter under -X importtime, so nothing is imported yet.
+# Boots the app the way a worker does and prints the phase timings as JSON.
+CHILD = '''
+import json, os, time
+started = time.perf_counter()
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'skillswap_project.settings')
+import django
+from django.apps.config import AppConfig
+
+phases, ready = {}, {}
+create = AppConfig.create.__func__
+
+def timed_create(cls, entry):
+    config = create(cls, entry)
+    original = config.ready
+
+    def timed_ready():
+        start = time.perf_counter()
+        original()
+        ready[config.label] = (time.perf_counter() - start) * 1000
+    config.ready = timed_ready
+    return config
+
+AppConfig.create = classmethod(timed_create)
+
+def phase(name, func):
+    start = time.perf_counter()
+    func()
+    phases[name] = (time.perf_counter() - start) * 1000
+
+from django.conf import settings
+phase('settings', lambda: settings.INSTALLED_APPS)
+phase('apps', django.setup)
+from django.core.wsgi import get_wsgi_application
+phase('wsgi', get_wsgi_application)
+from django.urls import get_resolver
+phase('urls', lambda: get_resolver().url_patterns)
+phases['total'] = (time.perf_counter() - started) * 1000
+print(json.dumps({'phases': phases, 'ready': ready}))
+'''
+
+
+def parse_importtime(lines):
+    """[(module, self_us, cumulative_us, depth)] from -X importtime output"""
+    modules = []
+    for line in lines:
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        modules.append((name.strip(), int(self_us), int(cumulative), depth))
+    return modules
+
+
+class Command(BaseCommand):
+    help = 'Time a cold worker boot: settings, app loading, ready() hooks, middleware, URLconf and imports'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=25,
+                            help='Slowest top-level imports to list')
+        parser.add_argument('--min-ms', type=float, default=1.0,
+                            help='Hide imports faster than this (cumulative)')
+        parser.add_argument('--json', dest='output',
+                            help='Also write the full report to this JSON file')
+
+    def handle(self, *args, **options):
+        # A child process, because this one has already imported everything
+        result = subprocess.run([sys.executable, '-X', 'importtime', '-c', CHILD],
+                                capture_output=True, text=True)
+        if result.returncode != 0:
+            raise CommandError(f'Boot failed:\n{result.stderr[-2000:]}')
+        timings = json.loads(result.stdout.strip().splitlines()[-1])
+        modules = parse_importtime(result.stderr.splitlines())
+
+        self.stdout.write(self.style.SUCCESS(f'🚀 Cold boot: {timings["phases"]["total"]:.1f} ms'))
+        for name in ('settings', 'apps', 'wsgi', 'urls'):
+            self.stdout.write(f'   {name:<10} {timings["phases"][name]:8.1f} ms')
+
+        self.stdout.write('\n⚙️  AppConfig.ready()')
+        for label, ms in sorted(timings['ready'].items(), key=lambda item: -item[1]):
+            self.stdout.write(f'   {label:<24} {ms:8.1f} ms')
+
+        packages = defaultdict(int)
+        for name, self_us, _, _ in modules:
+            packages[name.split('.')[0]] += self_us
+        self.stdout.write('\n📦 Import time by package (self)')
+        for package, us in sorted(packages.items(), key=lambda item: -item[1])[:options['top']]:
+            if us / 1000 >= options['min_ms']:
+                self.stdout.write(f'   {package:<24} {us / 1000:8.1f} ms')
+
+        top_level = sorted((m for m in modules if m[3] == 0), key=lambda m: -m[2])
+        self.stdout.write('\n🐢 Slowest top-level imports (cumulative)')
+        for name, _, cumulative, _ in top_level[:options['top']]:
+            if cumulative / 1000 >= options['min_ms']:
+                self.stdout.write(f'   {name:<40} {cumulative / 1000:8.1f} ms')
+
+        if options['output']:
+            with open(options['output'], 'w') as out:
+                json.dump({
+                    **timings,
+                    'imports': [{'module': name, 'self_ms': s / 1000, 'cumulative_ms': c / 1000, 'depth': d}
+                                for name, s, c, d in modules],
+                }, out, indent=2)
+            self.stdout.write(self.style.SUCCESS(f'\n✅ Wrote {options["output"]}'))
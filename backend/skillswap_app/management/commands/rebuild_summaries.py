@@ -0,0 +1,39 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+
+from skillswap_app import summaries
+from skillswap_app.models import Skill
+
+
+class Command(BaseCommand):
+    help = 'Recompute every row of the skill_popularity and user_summary tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--only', choices=['skills', 'users'], help='Rebuild just one table')
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help='Keys recomputed per batch (each batch is its own short transaction)')
+
+    def handle(self, *args, **options):
+        tables = [
+            ('skills', Skill.objects, summaries.refresh_skills),
+            ('users', User.objects, summaries.refresh_users),
+        ]
+        for name, manager, refresh in tables:
+            if options['only'] and options['only'] != name:
+                continue
+            started = time.perf_counter()
+            done = 0
+            last_id = 0
+            # Keyset pagination, so each batch is an index range read
+            while True:
+                ids = list(manager.filter(id__gt=last_id).order_by('id')
+                           .values_list('id', flat=True)[:options['batch_size']])
+                if not ids:
+                    break
+                done += refresh(ids)
+                last_id = ids[-1]
+            self.stdout.write(self.style.SUCCESS(
+                f'✅ Rebuilt {done} {name} rows in {time.perf_counter() - started:.1f}s'
+            ))
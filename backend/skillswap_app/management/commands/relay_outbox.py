@@ -0,0 +1,70 @@
+import signal
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from skillswap_app import outbox
+
+PURGE_EVERY = 60  # seconds between purges of fully read events while idle
+
+
+class Command(BaseCommand):
+    help = 'Relay outbox events to their in-process subscribers until stopped'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None,
+                            help='Events read per round (default OUTBOX_BATCH_SIZE)')
+        parser.add_argument('--poll', type=float, default=None,
+                            help='Seconds to wait when there is nothing new (default OUTBOX_POLL_INTERVAL)')
+        parser.add_argument('--once', action='store_true',
+                            help='Exit once every subscriber has caught up instead of polling')
+        parser.add_argument('--status', action='store_true',
+                            help='Print each subscriber\'s backlog and exit')
+
+    def handle(self, *args, **options):
+        if options['status']:
+            for name, (unread, age) in outbox.lag().items():
+                self.stdout.write(f'   {name:<24} {unread:>8} unread, oldest {age}s')
+            return
+
+        poll = options['poll'] if options['poll'] is not None else settings.OUTBOX_POLL_INTERVAL
+        self.stopping = False
+        previous = {signum: signal.signal(signum, self._stop) for signum in (signal.SIGTERM, signal.SIGINT)}
+        try:
+            relayed, failed = self._relay(options, poll)
+        finally:
+            for signum, handler in previous.items():
+                signal.signal(signum, handler)
+        self.stdout.write(self.style.SUCCESS(f'✅ Outbox relay stopped: {relayed} delivered, {failed} failed'))
+
+    def _relay(self, options, poll):
+        self.stdout.write(self.style.SUCCESS(f'🚀 Outbox relay started for {", ".join(outbox.SUBSCRIBERS)}'))
+        relayed = failed = 0
+        purged_at = 0.0
+        while not self.stopping:
+            results = outbox.relay(options['batch_size'])
+            for name, (count, error) in results.items():
+                if error is None:
+                    relayed += count
+                    if count:
+                        self.stdout.write(f'   ✅ {name}: {count} event(s)')
+                else:
+                    failed += count
+                    self.stdout.write(self.style.WARNING(f'   ⚠️  {name}: {count} event(s) failed: {error}'))
+            progressed = any(error is None for _, error in results.values())
+            if progressed:
+                continue
+            if options['once']:
+                break
+            if time.monotonic() - purged_at > PURGE_EVERY:
+                outbox.purge()
+                purged_at = time.monotonic()
+            # Like the end of a request: drop a connection that broke or outlived CONN_MAX_AGE
+            close_old_connections()
+            time.sleep(poll)
+        return relayed, failed
+
+    def _stop(self, signum, frame):
+        self.stopping = True
@@ -0,0 +1,58 @@
+import signal
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from skillswap_app import jobs
+
+
+class Command(BaseCommand):
+    help = 'Run queued jobs (post-write side effects) until stopped'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None,
+                            help='Jobs claimed per round (default JOBS_BATCH_SIZE)')
+        parser.add_argument('--lease', type=int, default=None,
+                            help='Seconds before an unfinished claimed job can be claimed again '
+                                 '(default JOBS_LEASE_SECONDS)')
+        parser.add_argument('--poll', type=float, default=None,
+                            help='Seconds to wait when the queue is empty (default JOBS_POLL_INTERVAL)')
+        parser.add_argument('--once', action='store_true',
+                            help='Exit once no job is due instead of polling')
+
+    def handle(self, *args, **options):
+        poll = options['poll'] if options['poll'] is not None else settings.JOBS_POLL_INTERVAL
+        self.stopping = False
+        previous = {signum: signal.signal(signum, self._stop) for signum in (signal.SIGTERM, signal.SIGINT)}
+        try:
+            done, failed = self._work(options, poll)
+        finally:
+            for signum, handler in previous.items():
+                signal.signal(signum, handler)
+        self.stdout.write(self.style.SUCCESS(f'✅ Job worker stopped: {done} done, {failed} failed'))
+
+    def _work(self, options, poll):
+        self.stdout.write(self.style.SUCCESS(f'🚀 Job worker {jobs.worker_id()} started'))
+        done = failed = 0
+        while not self.stopping:
+            results = jobs.run_batch(options['batch_size'], options['lease'])
+            for name, (count, error) in results.items():
+                if error is None:
+                    done += count
+                    self.stdout.write(f'   ✅ {name}: {count} job(s)')
+                else:
+                    failed += count
+                    self.stdout.write(self.style.WARNING(f'   ⚠️  {name}: {count} job(s) failed: {error}'))
+            if not results:
+                if options['once']:
+                    break
+                # Like the end of a request: drop a connection that broke or outlived CONN_MAX_AGE
+                close_old_connections()
+                time.sleep(poll)
+        return done, failed
+
+    def _stop(self, signum, frame):
+        # Finish the batch in hand; its leases would otherwise have to expire
+        self.stopping = True
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from skillswap_app import notifications
+
+
+class Command(BaseCommand):
+    help = 'Send one digest per user whose pending notifications have waited NOTIFICATION_DIGEST_WINDOW (run from cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None,
+                            help='Users per batch (default NOTIFICATION_BATCH_SIZE)')
+        parser.add_argument('--transport', default=None,
+                            help='Dotted path of the transport class (default NOTIFICATION_TRANSPORT)')
+
+    def handle(self, *args, **options):
+        transport = notifications.get_transport(options['transport'])
+        digests, covered, failed = notifications.send_digests(transport, options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'📬 Sent {digests} digest(s) covering {covered} notification(s) via {transport.__class__.__name__}'))
+        if failed:
+            self.stdout.write(self.style.WARNING(f'⚠️  {failed} digest(s) failed and will be retried'))
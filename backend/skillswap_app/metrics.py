@@ -0,0 +1,266 @@
+# backend/skillswap_app/metrics.py
+"""
+Process-local metrics, aggregated across workers through files.
+
+Each process keeps its counters, gauges and histograms in memory. At most
+every METRICS_FLUSH_INTERVAL seconds, and at exit, it writes them to
+METRICS_DIR/metrics-<pid>.json with an atomic rename. /metrics sums the
+files of every process in the Prometheus text format. Counters and
+histograms of workers that have exited keep counting, so restarts do not
+make rates go backwards. Gauges are only summed over live processes.
+clear() empties the directory and is meant for server start-up.
+
+Other services (the job worker, the outbox relay) run on hosts of their
+own, so their in-memory counters never reach these files. What they do is
+reported from the database instead, by sampled gauges that the process
+serving /metrics reads at scrape time.
+"""
+import atexit
+import json
+import math
+import os
+import tempfile
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+REGISTRY = {}
+
+_lock = threading.Lock()
+_values = {}  # (name, labels) -> float, or [bucket counts..., sum, count] for histograms
+_last_flush = 0.0
+
+
+class Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        REGISTRY[name] = self
+
+    def _key(self, labels):
+        return self.name, tuple(str(labels[label]) for label in self.labels)
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with _lock:
+            _values[key] = _values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    """Summed over live processes only"""
+    kind = 'gauge'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with _lock:
+            _values[key] = _values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Sampled(Metric):
+    """Gauge read at scrape time: func() returns {label values tuple: value}"""
+    kind = 'gauge'
+
+    def __init__(self, name, documentation, labels=(), func=None):
+        super().__init__(name, documentation, labels)
+        self.func = func
+
+
+def sampled(name, documentation, labels=()):
+    """Register the decorated function as a Sampled gauge"""
+    def register(func):
+        Sampled(name, documentation, labels, func)
+        return func
+    return register
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with _lock:
+            counts = _values.get(key)
+            if counts is None:
+                counts = _values[key] = [0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            counts[-2] += value
+            counts[-1] += 1
+
+
+REQUESTS = Counter('skillswap_http_requests_total', 'Requests by view, method and status',
+                   ('view', 'method', 'status'))
+LATENCY = Histogram('skillswap_http_request_duration_seconds', 'Request latency by view', ('view',))
+QUERIES = Histogram('skillswap_db_queries_per_request', 'Database queries per request by view', ('view',),
+                    buckets=QUERY_BUCKETS)
+DB_TIME = Histogram('skillswap_db_time_per_request_seconds', 'Database time per request by view', ('view',))
+CACHE_REQUESTS = Counter('skillswap_response_cache_requests_total', 'Response cache lookups by outcome',
+                         ('cache', 'outcome'))
+SESSION_WRITES = Counter('skillswap_session_writes_total', 'Responses that saved the session')
+IN_FLIGHT = Gauge('skillswap_http_requests_in_flight', 'Requests being handled')
+STREAMING = Gauge('skillswap_streaming_responses_active', 'Open streaming (SSE / long-poll) responses')
+
+
+def metrics_dir():
+    return getattr(settings, 'METRICS_DIR', None) or os.path.join(tempfile.gettempdir(), 'skillswap-metrics')
+
+
+def flush(force=False):
+    """Write this process's values to its file (at most once per flush interval unless forced)"""
+    global _last_flush
+    if not getattr(settings, 'METRICS_ENABLED', True):
+        return
+    now = time.monotonic()
+    if not force and now - _last_flush < getattr(settings, 'METRICS_FLUSH_INTERVAL', 1.0):
+        return
+    _last_flush = now
+    with _lock:
+        snapshot = [[name, list(labels), value] for (name, labels), value in _values.items()]
+    directory = metrics_dir()
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f'metrics-{os.getpid()}.json')
+    handle, temp = tempfile.mkstemp(dir=directory, prefix='.metrics-')
+    with os.fdopen(handle, 'w') as out:
+        json.dump({'pid': os.getpid(), 'values': snapshot}, out)
+    os.replace(temp, path)
+
+
+def _flush_at_exit():
+    if _values:
+        try:
+            flush(force=True)
+        except OSError:
+            pass
+
+
+atexit.register(_flush_at_exit)
+
+
+def clear():
+    """Remove every process file (call once when the server starts)"""
+    directory = metrics_dir()
+    if os.path.isdir(directory):
+        for name in os.listdir(directory):
+            if name.startswith('metrics-') and name.endswith('.json'):
+                os.unlink(os.path.join(directory, name))
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def collect():
+    """{(name, labels): value} summed over every process file, plus the sampled gauges"""
+    flush(force=True)
+    totals = {}
+    for metric in REGISTRY.values():
+        if isinstance(metric, Sampled):
+            for labels, value in metric.func().items():
+                totals[(metric.name, tuple(str(label) for label in labels))] = value
+    directory = metrics_dir()
+    if not os.path.isdir(directory):
+        return totals
+    for name in os.listdir(directory):
+        if not (name.startswith('metrics-') and name.endswith('.json')):
+            continue
+        try:
+            with open(os.path.join(directory, name)) as handle:
+                data = json.load(handle)
+        except (OSError, ValueError):
+            continue
+        alive = None
+        for metric_name, labels, value in data['values']:
+            metric = REGISTRY.get(metric_name)
+            if metric is None:
+                continue
+            if metric.kind == 'gauge':
+                if alive is None:
+                    alive = _alive(data['pid'])
+                if not alive:
+                    continue
+            key = (metric_name, tuple(labels))
+            if isinstance(value, list):
+                current = totals.setdefault(key, [0] * len(value))
+                totals[key] = [a + b for a, b in zip(current, value)]
+            else:
+                totals[key] = totals.get(key, 0) + value
+    return totals
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(str(value))}"' for name, value in pairs) + '}'
+
+
+def _number(value):
+    if isinstance(value, float) and math.isinf(value):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render(totals):
+    """Prometheus text exposition format (0.0.4)"""
+    by_metric = defaultdict(list)
+    for (name, labels), value in totals.items():
+        by_metric[name].append((labels, value))
+    lines = []
+    for name, metric in REGISTRY.items():
+        lines.append(f'# HELP {name} {metric.documentation}')
+        lines.append(f'# TYPE {name} {metric.kind}')
+        for labels, value in sorted(by_metric.get(name, [])):
+            if metric.kind != 'histogram':
+                lines.append(f'{name}{_labels(metric.labels, labels)} {_number(value)}')
+                continue
+            cumulative = 0
+            for bound, count in zip(metric.buckets + (float('inf'),), value[:-2] + [value[-1] - sum(value[:-2])]):
+                cumulative += count
+                le = _number(float(bound)) if not math.isinf(bound) else '+Inf'
+                lines.append(f'{name}_bucket{_labels(metric.labels, labels, [("le", le)])} {cumulative}')
+            lines.append(f'{name}_sum{_labels(metric.labels, labels)} {_number(float(value[-2]))}')
+            lines.append(f'{name}_count{_labels(metric.labels, labels)} {value[-1]}')
+
+    # Derived for convenience; rate(hits) / rate(all) is the better query over time
+    outcomes = defaultdict(lambda: defaultdict(float))
+    for (name, labels), value in totals.items():
+        if name == CACHE_REQUESTS.name:
+            outcomes[labels[0]][labels[1]] += value
+    lines.append('# HELP skillswap_response_cache_hit_ratio Cache hits (fresh or stale) over lookups since start')
+    lines.append('# TYPE skillswap_response_cache_hit_ratio gauge')
+    for cache_name, counts in sorted(outcomes.items()):
+        total = sum(counts.values())
+        ratio = (counts['hits'] + counts['stale']) / total if total else 0.0
+        lines.append(f'skillswap_response_cache_hit_ratio{_labels(["cache"], [cache_name])} {round(ratio, 4)}')
+    return '\n'.join(lines) + '\n'
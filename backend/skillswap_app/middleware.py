@@ -0,0 +1,461 @@
+# backend/skillswap_app/middleware.py
+import gzip
+import json
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+import zlib
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.urls import reverse
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+from . import metrics, profiler
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip is always available
+    brotli = None
+
+request_logger = logging.getLogger('skillswap_app.requests')
+nplusone_logger = logging.getLogger('skillswap_app.nplusone')
+
+COMPRESSIBLE_TYPES = (
+    'text/',
+    'application/json',
+    'application/javascript',
+    'application/xml',
+    'image/svg+xml',
+)
+
+
+def supported_encodings():
+    """Configured encodings, in preference order, that can be produced here"""
+    encodings = getattr(settings, 'COMPRESSION_ENCODINGS', ['br', 'gzip'])
+    return [enc for enc in encodings if enc == 'gzip' or (enc == 'br' and brotli is not None)]
+
+
+def compress(content, encoding):
+    """Compress a whole body. gzip output is deterministic (mtime=0) so it can be cached"""
+    if encoding == 'br':
+        return brotli.compress(content, quality=getattr(settings, 'COMPRESSION_BROTLI_QUALITY', 5))
+    return gzip.compress(content, compresslevel=getattr(settings, 'COMPRESSION_GZIP_LEVEL', 6), mtime=0)
+
+
+def compress_stream(chunks, encoding):
+    """Compress an iterator of chunks, flushing after each so events are not held back"""
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=getattr(settings, 'COMPRESSION_BROTLI_QUALITY', 5))
+        for chunk in chunks:
+            data = compressor.process(chunk) + compressor.flush()
+            if data:
+                yield data
+        yield compressor.finish()
+    else:
+        # wbits=31 writes a gzip header/trailer instead of a raw zlib stream
+        compressor = zlib.compressobj(getattr(settings, 'COMPRESSION_GZIP_LEVEL', 6), zlib.DEFLATED, 31)
+        for chunk in chunks:
+            data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+            if data:
+                yield data
+        yield compressor.flush()
+
+
+def choose_encoding(request):
+    """Pick the first supported encoding the client accepts (q > 0)"""
+    accepted = {}
+    for part in request.META.get('HTTP_ACCEPT_ENCODING', '').split(','):
+        name, _, params = part.strip().partition(';')
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            accepted[name.strip().lower()] = quality
+    for encoding in supported_encodings():
+        if accepted.get(encoding, accepted.get('*', 0)) > 0:
+            return encoding
+    return None
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    gzip/brotli response compression with a minimum-size threshold.
+
+    Settings:
+        COMPRESSION_ENABLED         turn the middleware off entirely
+        COMPRESSION_MIN_SIZE        bodies smaller than this (bytes) are sent as-is
+        COMPRESSION_ENCODINGS       preference order, e.g. ['br', 'gzip']
+        COMPRESSION_GZIP_LEVEL      zlib level 1-9
+        COMPRESSION_BROTLI_QUALITY  brotli quality 0-11
+        COMPRESSION_STREAMING       also compress streaming responses
+
+    Responses may carry a ``compressed_variants`` dict (encoding -> bytes),
+    typically shared with a cache entry. Variants found there are served
+    without recompressing, and new ones are written back into it so the
+    owner of the dict can keep them alongside the cached body.
+    """
+
+    def process_response(self, request, response):
+        if not getattr(settings, 'COMPRESSION_ENABLED', True):
+            return response
+
+        # Already encoded (e.g. WhiteNoise pre-compressed static files)
+        if response.has_header('Content-Encoding') or response.status_code in (204, 304):
+            return response
+
+        content_type = response.get('Content-Type', '')
+        if not content_type.startswith(COMPRESSIBLE_TYPES):
+            return response
+
+        if response.streaming:
+            if not getattr(settings, 'COMPRESSION_STREAMING', True) or response.is_async:
+                return response
+        elif len(response.content) < getattr(settings, 'COMPRESSION_MIN_SIZE', 1024):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+
+        encoding = choose_encoding(request)
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            response.streaming_content = compress_stream(response.streaming_content, encoding)
+            # The compressed size is unknown until the stream is consumed
+            del response.headers['Content-Length']
+        else:
+            variants = getattr(response, 'compressed_variants', None)
+            compressed = variants.get(encoding) if variants is not None else None
+            if compressed is None:
+                compressed = compress(response.content, encoding)
+                if variants is not None:
+                    variants[encoding] = compressed
+            # Only worth sending if it actually got smaller
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers['Content-Length'] = str(len(compressed))
+
+        # A strong ETag must not be shared between representations, so
+        # weaken it like django.middleware.gzip does (If-None-Match uses
+        # weak comparison, so conditional GETs keep working)
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = encoding
+
+        return response
+
+
+class RequestMetrics:
+    """Query count and time for one request, fed by a connection execute_wrapper"""
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - started
+            self.queries += 1
+
+
+class InstrumentationMiddleware:
+    """
+    Per-request DB query count and time, view and serialization time and
+    response size, as a Server-Timing header and sampled log lines.
+
+    Settings:
+        INSTRUMENTATION_ENABLED          off: the middleware is dropped at startup (MiddlewareNotUsed)
+        INSTRUMENTATION_SERVER_TIMING    add the Server-Timing header
+        INSTRUMENTATION_LOG_SAMPLE_RATE  share of requests logged (0.0 - 1.0)
+        INSTRUMENTATION_LOG_SLOW_MS      requests slower than this are always logged (0 = never)
+
+    Goes last in MIDDLEWARE, so "total" is the view plus the other
+    middlewares' process_view hooks and the size is before compression.
+    Log lines go to the skillswap_app.requests logger as one JSON object.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'INSTRUMENTATION_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.server_timing = getattr(settings, 'INSTRUMENTATION_SERVER_TIMING', True)
+        self.sample_rate = getattr(settings, 'INSTRUMENTATION_LOG_SAMPLE_RATE', 0.01)
+        self.slow_ms = getattr(settings, 'INSTRUMENTATION_LOG_SLOW_MS', 500)
+
+    def __call__(self, request):
+        metrics = RequestMetrics()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(metrics))
+            response = self.get_response(request)
+        total = time.perf_counter() - started
+
+        serialize = getattr(response, 'serialization_time', 0.0)
+        timings = {
+            'total': total * 1000,
+            'db': metrics.db_time * 1000,
+            'serialize': serialize * 1000,
+            # Python time in the view itself: what is left after the queries and JSON encoding
+            'view': max(total - metrics.db_time - serialize, 0.0) * 1000,
+        }
+        if self.server_timing:
+            response.headers['Server-Timing'] = ', '.join(
+                f'{name};dur={ms:.1f}' + (f';desc="{metrics.queries} queries"' if name == 'db' else '')
+                for name, ms in timings.items()
+            )
+
+        slow = self.slow_ms and timings['total'] >= self.slow_ms
+        if slow or (self.sample_rate and random.random() < self.sample_rate):
+            match = request.resolver_match
+            request_logger.info(json.dumps({
+                'method': request.method,
+                'path': request.path,
+                'view': match.view_name if match else None,
+                'status': response.status_code,
+                'queries': metrics.queries,
+                'bytes': None if response.streaming else len(response.content),
+                'slow': bool(slow),
+                **{f'{name}_ms': round(ms, 2) for name, ms in timings.items()},
+            }))
+        return response
+
+
+class _TrackedStream:
+    """Iterator over streaming content that keeps the STREAMING gauge while open"""
+
+    def __init__(self, content):
+        self.content = iter(content)
+        self.open = True
+        metrics.STREAMING.inc()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            return next(self.content)
+        except StopIteration:
+            self.close()
+            raise
+
+    def close(self):
+        if self.open:
+            self.open = False
+            metrics.STREAMING.dec()
+            if hasattr(self.content, 'close'):
+                self.content.close()
+
+
+class HealthCheckMiddleware:
+    """Answers the liveness and readiness probes before any other middleware runs
+
+    Probes skip sessions, auth, CSRF, compression and metrics, and they skip
+    ALLOWED_HOSTS validation too, because orchestrators probe by IP address.
+    The views are still routed in urls.py so the paths come from reverse().
+    """
+
+    def __init__(self, get_response):
+        from . import views
+
+        self.get_response = get_response
+        self.probes = {reverse('liveness'): views.liveness, reverse('readiness'): views.readiness}
+
+    def __call__(self, request):
+        probe = self.probes.get(request.path_info)
+        if probe is not None:
+            return probe(request)
+        return self.get_response(request)
+
+
+class MetricsMiddleware:
+    """
+    Request counts, latency, DB queries/time per view, session writes and
+    open streaming responses for /metrics (see metrics.py).
+
+    Goes near the top of MIDDLEWARE, outside SessionMiddleware (a session
+    cookie on the response means the session was saved) and outside
+    compression, so the latency covers them.
+
+    Settings:
+        METRICS_ENABLED         off: the middleware is dropped at startup (MiddlewareNotUsed)
+        METRICS_DIR             where each process writes its values
+        METRICS_FLUSH_INTERVAL  seconds between writes of a process's file
+    """
+
+    METHODS = {'GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'}
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'METRICS_ENABLED', True):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        db = RequestMetrics()
+        metrics.IN_FLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(db))
+                response = self.get_response(request)
+        finally:
+            metrics.IN_FLIGHT.dec()
+        elapsed = time.perf_counter() - started
+
+        match = request.resolver_match
+        # Unmatched paths share one label so scanners cannot blow up the series count
+        view = match.view_name if match else 'unmatched'
+        method = request.method if request.method in self.METHODS else 'other'
+        metrics.REQUESTS.inc(view=view, method=method, status=response.status_code)
+        metrics.LATENCY.observe(elapsed, view=view)
+        metrics.QUERIES.observe(db.queries, view=view)
+        metrics.DB_TIME.observe(db.db_time, view=view)
+        session_cookie = response.cookies.get(settings.SESSION_COOKIE_NAME)
+        if session_cookie is not None and session_cookie.value:
+            metrics.SESSION_WRITES.inc()
+        if response.streaming and not response.is_async:
+            response.streaming_content = _TrackedStream(response.streaming_content)
+        metrics.flush()
+        return response
+
+
+class ProfilerMiddleware:
+    """Samples one request's thread when ?_profile= carries a valid token for its path
+
+    The collapsed stacks go to PROFILER_DIR and the file name comes back in
+    an X-Profile header. Invalid or expired tokens are ignored.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if profiler.QUERY_PARAM not in request.META.get('QUERY_STRING', ''):
+            return self.get_response(request)
+        token = request.GET.get(profiler.QUERY_PARAM)
+        if not token or not profiler.check_token(request.path, token):
+            return self.get_response(request)
+
+        sampler = profiler.Sampler(settings.PROFILER_REQUEST_INTERVAL, thread_ids={threading.get_ident()})
+        sampler.start(settings.PROFILER_MAX_SECONDS)
+        try:
+            response = self.get_response(request)
+        finally:
+            sampler.stop()
+        path = sampler.write(profiler.profile_path('request'))
+        response.headers['X-Profile'] = f'{os.path.basename(path)}; samples={sampler.samples}'
+        return response
+
+
+class NPlusOneError(Exception):
+    """Raised by NPlusOneMiddleware when NPLUSONE_ACTION is 'raise'"""
+
+
+_IN_LIST = re.compile(r'\bIN\s*\((?:\s*(?:%s|\?|\$\d+)\s*,?)+\)', re.IGNORECASE)
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'(?<![\w".])-?\d+(?:\.\d+)?\b')
+_SPACE = re.compile(r'\s+')
+_COUNTED = ('SELECT', 'INSERT', 'UPDATE', 'DELETE')
+_APP_DIR = os.path.dirname(os.path.abspath(__file__))
+# Query hooks themselves, and the tests, are never the caller worth reporting
+_SKIP_FILES = (os.path.abspath(__file__), os.path.join(_APP_DIR, 'slowlog.py'), os.path.join(_APP_DIR, 'tests') + os.sep)
+
+
+def fingerprint(sql):
+    """SQL with parameters and literals stripped, so repeats of one statement compare equal"""
+    sql = _IN_LIST.sub('IN (...)', sql)
+    sql = _STRING.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    return _SPACE.sub(' ', sql).strip()
+
+
+def caller():
+    """file:line (function) of the innermost app frame outside this module and the tests"""
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(_APP_DIR) and not filename.startswith(_SKIP_FILES):
+            return f'{os.path.relpath(filename, os.path.dirname(_APP_DIR))}:{frame.f_lineno} ({frame.f_code.co_name})'
+        frame = frame.f_back
+    return 'outside skillswap_app'
+
+
+class QueryRepeats:
+    """execute_wrapper that counts statements per fingerprint and where each came from"""
+
+    def __init__(self):
+        self.counts = Counter()
+        self.callers = {}
+        self.samples = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        if sql.lstrip()[:6].upper() in _COUNTED:
+            key = fingerprint(sql)
+            self.counts[key] += 1
+            self.callers.setdefault(key, Counter())[caller()] += 1
+            self.samples.setdefault(key, sql)
+        return execute(sql, params, many, context)
+
+    def repeated(self, threshold):
+        """[(fingerprint, count, {caller: count})] for statements run more than threshold times"""
+        return [(key, count, dict(self.callers[key]))
+                for key, count in self.counts.most_common() if count > threshold]
+
+
+class NPlusOneMiddleware:
+    """
+    Flags requests that run the same statement (parameters stripped) more
+    than NPLUSONE_THRESHOLD times, with the app lines that issued them.
+
+    Settings:
+        NPLUSONE_ENABLED    off: the middleware is dropped at startup (MiddlewareNotUsed)
+        NPLUSONE_THRESHOLD  repeats of one fingerprint allowed per request
+        NPLUSONE_ACTION     'log' (warning on skillswap_app.nplusone) or 'raise' (NPlusOneError, for tests)
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'NPLUSONE_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.threshold = getattr(settings, 'NPLUSONE_THRESHOLD', 5)
+        self.action = getattr(settings, 'NPLUSONE_ACTION', 'log')
+
+    def __call__(self, request):
+        repeats = QueryRepeats()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(repeats))
+            response = self.get_response(request)
+
+        found = repeats.repeated(self.threshold)
+        if not found:
+            return response
+        lines = [f'{request.method} {request.path}: {len(found)} statements repeated more than '
+                 f'{self.threshold} times']
+        for key, count, callers in found:
+            lines.append(f'  {count}x {key[:300]}')
+            lines.extend(f'      {n}x from {where}' for where, n in sorted(callers.items(), key=lambda c: -c[1]))
+        message = '\n'.join(lines)
+        if self.action == 'raise':
+            raise NPlusOneError(message)
+        nplusone_logger.warning(message)
+        return response
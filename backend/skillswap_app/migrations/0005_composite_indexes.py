@@ -0,0 +1,34 @@
+# Generated by Django 4.2.7 on 2026-10-19 00:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('skillswap_app', '0004_profile_coordinates'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['to_user', 'created_at'], name='reviews_to_user_eb8764_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='swaprequest',
+            index=models.Index(fields=['to_user', 'status', 'created_at'], name='swap_reques_to_user_8f05f5_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='swaprequest',
+            index=models.Index(fields=['from_user', 'created_at'], name='swap_reques_from_us_64feff_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userskill',
+            index=models.Index(fields=['can_teach', 'skill', 'user'], name='user_skills_can_tea_33cd23_idx'),
+        ),
+        # Dropped after its replacement exists; can_teach is the new index's prefix
+        migrations.RemoveIndex(
+            model_name='userskill',
+            name='user_skills_can_tea_2d2448_idx',
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 4.2.7 on 2026-10-19 00:20
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('skillswap_app', '0005_composite_indexes'),
+    ]
+
+    operations = [
+        # database/schema.sql used to create these names as views
+        migrations.RunSQL('DROP VIEW IF EXISTS skill_popularity', migrations.RunSQL.noop),
+        migrations.RunSQL('DROP VIEW IF EXISTS user_summary', migrations.RunSQL.noop),
+        migrations.CreateModel(
+            name='UserSummary',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='summary', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('location', models.CharField(blank=True, max_length=100)),
+                ('skills_count', models.IntegerField(default=0)),
+                ('reviews_received', models.IntegerField(default=0)),
+                ('avg_rating', models.FloatField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'User summaries',
+                'db_table': 'user_summary',
+                'indexes': [models.Index(fields=['-avg_rating', '-reviews_received'], name='user_summar_avg_rat_601159_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='SkillPopularity',
+            fields=[
+                ('skill', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='popularity', serialize=False, to='skillswap_app.skill')),
+                ('teacher_count', models.IntegerField(default=0)),
+                ('learner_count', models.IntegerField(default=0)),
+                ('request_count', models.IntegerField(default=0)),
+                ('completed_count', models.IntegerField(default=0)),
+                ('review_count', models.IntegerField(default=0)),
+                ('avg_rating', models.FloatField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Skill popularity',
+                'db_table': 'skill_popularity',
+                'indexes': [models.Index(fields=['-request_count', '-teacher_count'], name='skill_popul_request_5de840_idx')],
+            },
+        ),
+    ]
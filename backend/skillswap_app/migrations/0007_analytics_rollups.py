@@ -0,0 +1,68 @@
+# Generated by Django 4.2.7 on 2026-10-19 00:22
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('skillswap_app', '0006_summary_tables'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CategoryStats',
+            fields=[
+                ('category', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='skillswap_app.category')),
+                ('total_skills', models.IntegerField(default=0)),
+                ('total_teachers', models.IntegerField(default=0)),
+                ('total_requests', models.IntegerField(default=0)),
+                ('total_reviews', models.IntegerField(default=0)),
+                ('avg_rating', models.FloatField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Category stats',
+                'db_table': 'rollup_categories',
+            },
+        ),
+        migrations.CreateModel(
+            name='LocationSwapStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField()),
+                ('location', models.CharField(max_length=100)),
+                ('total', models.IntegerField(default=0)),
+                ('pending', models.IntegerField(default=0)),
+                ('completed', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name_plural': 'Location swap stats',
+                'db_table': 'rollup_location_swaps',
+            },
+        ),
+        migrations.CreateModel(
+            name='MonthlySwapStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(unique=True)),
+                ('total', models.IntegerField(default=0)),
+                ('pending', models.IntegerField(default=0)),
+                ('accepted', models.IntegerField(default=0)),
+                ('rejected', models.IntegerField(default=0)),
+                ('completed', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name_plural': 'Monthly swap stats',
+                'db_table': 'rollup_monthly_swaps',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='skillpopularity',
+            index=models.Index(fields=['-teacher_count'], name='skill_popul_teacher_b354b4_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='locationswapstats',
+            unique_together={('month', 'location')},
+        ),
+    ]
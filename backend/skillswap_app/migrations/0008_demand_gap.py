@@ -0,0 +1,53 @@
+# Generated by Django 4.2.7 on 2026-10-19 00:24
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def fill_demand_counters(apps, schema_editor):
+    SkillPopularity = apps.get_model('skillswap_app', 'SkillPopularity')
+    SwapRequest = apps.get_model('skillswap_app', 'SwapRequest')
+    counts = {}
+    open_requests = (SwapRequest.objects.filter(status__in=['pending', 'accepted'])
+                     .values_list('requested_skill_id', 'status').annotate(n=Count('id')).order_by())
+    for skill_id, status, n in open_requests:
+        counts[skill_id, status] = n
+    for row in SkillPopularity.objects.all().iterator():
+        row.pending_count = counts.get((row.skill_id, 'pending'), 0)
+        row.accepted_count = counts.get((row.skill_id, 'accepted'), 0)
+        row.demand_gap = row.pending_count + row.accepted_count - row.teacher_count
+        row.save(update_fields=['pending_count', 'accepted_count', 'demand_gap'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('skillswap_app', '0007_analytics_rollups'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='skillpopularity',
+            name='accepted_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='skillpopularity',
+            name='demand_gap',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='skillpopularity',
+            name='pending_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='skillpopularity',
+            index=models.Index(fields=['-demand_gap', '-pending_count'], name='skill_popul_demand__c74589_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='swaprequest',
+            index=models.Index(fields=['requested_skill', 'status'], name='swap_reques_request_2bba3c_idx'),
+        ),
+        migrations.RunPython(fill_demand_counters, migrations.RunPython.noop),
+    ]
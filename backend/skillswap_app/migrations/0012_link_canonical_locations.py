@@ -0,0 +1,46 @@
+from django.db import migrations
+from django.db.models import F
+
+from skillswap_app.models import normalize_location
+
+
+def link_canonical_locations(apps, schema_editor):
+    """Link profiles saved before 0003 to a Location, as Profile.save does
+
+    Exact normalized matches only; `manage.py backfill_locations` merges
+    misspellings afterwards. Without this, the first alias for a place hides
+    every older profile there from location filters.
+    """
+    Profile = apps.get_model('skillswap_app', 'Profile')
+    Location = apps.get_model('skillswap_app', 'Location')
+    LocationAlias = apps.get_model('skillswap_app', 'LocationAlias')
+    DataVersion = apps.get_model('skillswap_app', 'DataVersion')
+
+    unlinked = Profile.objects.filter(canonical_location__isnull=True).exclude(location='')
+    raws = list(unlinked.values_list('location', flat=True).distinct().order_by())
+    if not raws:
+        return
+    known = dict(LocationAlias.objects.values_list('alias', 'location_id'))
+    for raw in raws:
+        key = normalize_location(raw)
+        if not key:
+            continue
+        if key not in known:
+            location, _ = Location.objects.get_or_create(name=' '.join(raw.split())[:100])
+            LocationAlias.objects.create(alias=key, location=location)
+            known[key] = location.id
+        unlinked.filter(location=raw).update(canonical_location_id=known[key])
+    # Browse ETags depend on which profiles a location filter matches
+    if not DataVersion.objects.filter(name='teachers').update(version=F('version') + 1):
+        DataVersion.objects.create(name='teachers', version=1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('skillswap_app', '0011_notifications'),
+    ]
+
+    operations = [
+        migrations.RunPython(link_canonical_locations, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-19 02:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('skillswap_app', '0012_link_canonical_locations'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notification',
+            name='attempts',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='retry_after',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -1,6 +1,18 @@
 # backend\skillswap_app\models.py
-from django.db import models
+import re
+import unicodedata
+
+from django.db import models, transaction
 from django.contrib.auth.models import User
+from django.utils import timezone
+
+from . import geo
+
+def normalize_location(text):
+    """Alias key for a free-text place name: case, accents, punctuation and spacing folded"""
+    text = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch)).casefold()
+    return ' '.join(re.sub(r'[^\w]+', ' ', text).split())
 
 class Category(models.Model):
     """Skill categories like Programming, Languages, etc."""
@@ -32,16 +44,98 @@ class Skill(models.Model):
     def __str__(self):
         return f"{self.name} ({self.category.name})"
 
+class LocationManager(models.Manager):
+    def resolve(self, text):
+        """Id of the Location a free-text place name maps to, or None"""
+        key = normalize_location(text)
+        if not key:
+            return None
+        return LocationAlias.objects.filter(alias=key).values_list('location_id', flat=True).first()
+
+    def for_text(self, text):
+        """Location for a free-text place name, creating it and its alias if unknown"""
+        key = normalize_location(text)
+        if not key:
+            return None
+        alias = LocationAlias.objects.filter(alias=key).select_related('location').first()
+        if alias:
+            return alias.location
+        with transaction.atomic():
+            location, _ = self.get_or_create(name=' '.join(text.split())[:100])
+            alias, _ = LocationAlias.objects.get_or_create(alias=key, defaults={'location': location})
+        return alias.location
+
+class Location(models.Model):
+    """Canonical place that profiles point at"""
+    name = models.CharField(max_length=100, unique=True)
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = LocationManager()
+
+    class Meta:
+        db_table = 'locations'
+
+    def __str__(self):
+        return self.name
+
+class LocationAlias(models.Model):
+    """Normalized spelling (see normalize_location) that resolves to a Location"""
+    alias = models.CharField(max_length=100, unique=True)
+    location = models.ForeignKey(Location, on_delete=models.CASCADE, related_name='aliases')
+
+    class Meta:
+        db_table = 'location_aliases'
+        verbose_name_plural = 'Location aliases'
+
+    def __str__(self):
+        return f"{self.alias} -> {self.location.name}"
+
+class ProfileManager(models.Manager):
+    def near(self, lat, lon, radius_km):
+        """Profiles that may be within radius_km of a point (a superset)
+
+        Geohash range scans over the cells around the point, narrowed by a
+        lat/lon box, all in SQL so it can be used as a subquery; callers
+        check the exact distance of the rows they keep.
+        """
+        cells = models.Q()
+        for low, high in geo.covering_ranges(lat, lon, radius_km):
+            cells |= models.Q(geohash__gte=low, geohash__lt=high)
+        min_lat, max_lat, min_lon, max_lon = geo.bounding_box(lat, lon, radius_km)
+        candidates = self.filter(cells, latitude__gte=min_lat, latitude__lte=max_lat)
+        if min_lon is not None:
+            candidates = candidates.filter(longitude__gte=min_lon, longitude__lte=max_lon)
+        return candidates
+
+    def within_radius(self, lat, lon, radius_km):
+        """{user_id: distance_km} for profiles within radius_km of a point"""
+        distances = {}
+        candidates = self.near(lat, lon, radius_km)
+        for user_id, p_lat, p_lon in candidates.values_list('user_id', 'latitude', 'longitude'):
+            distance = geo.haversine_km(lat, lon, p_lat, p_lon)
+            if distance <= radius_km:
+                distances[user_id] = distance
+        return distances
+
 class Profile(models.Model):
     """Extended user profile with location and bio"""
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     bio = models.TextField(blank=True)
     location = models.CharField(max_length=100, blank=True)
+    canonical_location = models.ForeignKey(Location, on_delete=models.SET_NULL, null=True, blank=True, related_name='profiles')
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
+    # Integer geohash of (latitude, longitude), see geo.py; kept in step by save()
+    geohash = models.BigIntegerField(null=True, blank=True, db_index=True, editable=False)
     phone = models.CharField(max_length=20, blank=True)
     avatar_url = models.URLField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = ProfileManager()
+
     class Meta:
         db_table = 'profiles'
         indexes = [
@@ -51,6 +145,29 @@ class Profile(models.Model):
     def __str__(self):
         return f"{self.user.username}'s Profile"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored location so receivers can tell whether a save moved it
+        instance._loaded_location = instance.__dict__.get('location')
+        instance._loaded_coordinates = (instance.__dict__.get('latitude'), instance.__dict__.get('longitude'))
+        return instance
+
+    @property
+    def coordinates(self):
+        return self.latitude, self.longitude
+
+    def save(self, *args, **kwargs):
+        # Keep the canonical location in step with the free-text one
+        if (self.location != getattr(self, '_loaded_location', None)
+                or (self.location and self.canonical_location_id is None)):
+            self.canonical_location = Location.objects.for_text(self.location)
+        if self.latitude is None or self.longitude is None:
+            self.geohash = None
+        else:
+            self.geohash = geo.encode(self.latitude, self.longitude)
+        super().save(*args, **kwargs)
+
 class UserSkill(models.Model):
     """Many-to-many relationship: Users and Skills they can teach/want to learn"""
     EXPERIENCE_CHOICES = [
@@ -71,7 +188,9 @@ class UserSkill(models.Model):
         indexes = [
             models.Index(fields=['user']),
             models.Index(fields=['skill']),
-            models.Index(fields=['can_teach']),
+            # browse_skills: teachers of a skill; user_id makes it covering
+            # for the join to users/profiles (replaces the can_teach index)
+            models.Index(fields=['can_teach', 'skill', 'user']),
         ]
 
     def __str__(self):
@@ -103,6 +222,11 @@ class SwapRequest(models.Model):
             models.Index(fields=['to_user']),
             models.Index(fields=['status']),
             models.Index(fields=['requested_skill']),
+            # Per-skill status counts for skill_popularity (index-only)
+            models.Index(fields=['requested_skill', 'status']),
+            # Inbox (received, optionally by status) and outbox, newest first
+            models.Index(fields=['to_user', 'status', 'created_at']),
+            models.Index(fields=['from_user', 'created_at']),
         ]
 
     def __str__(self):
@@ -124,7 +248,193 @@ class Review(models.Model):
             models.Index(fields=['to_user']),
             models.Index(fields=['rating']),
             models.Index(fields=['swap_request']),
+            models.Index(fields=['to_user', 'created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.from_user.username} â†’ {self.to_user.username}: {self.rating}/5"
+
+class SkillPopularity(models.Model):
+    """Per-skill aggregates (replaces the skill_popularity SQL view), kept fresh by summaries.py"""
+    skill = models.OneToOneField(Skill, on_delete=models.CASCADE, primary_key=True, related_name='popularity')
+    teacher_count = models.IntegerField(default=0)
+    learner_count = models.IntegerField(default=0)
+    request_count = models.IntegerField(default=0)
+    pending_count = models.IntegerField(default=0)
+    accepted_count = models.IntegerField(default=0)
+    completed_count = models.IntegerField(default=0)
+    review_count = models.IntegerField(default=0)
+    avg_rating = models.FloatField(null=True, blank=True)
+    # Open demand (pending + accepted requests) minus teachers; see summaries.py
+    demand_gap = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'skill_popularity'
+        verbose_name_plural = 'Skill popularity'
+        indexes = [
+            models.Index(fields=['-request_count', '-teacher_count']),
+            models.Index(fields=['-teacher_count']),
+            models.Index(fields=['-demand_gap', '-pending_count']),
+        ]
+
+    def __str__(self):
+        return f"{self.skill.name}: {self.teacher_count} teachers, {self.request_count} requests"
+
+class UserSummary(models.Model):
+    """Per-user aggregates (replaces the user_summary SQL view), kept fresh by summaries.py"""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='summary')
+    location = models.CharField(max_length=100, blank=True)
+    skills_count = models.IntegerField(default=0)
+    reviews_received = models.IntegerField(default=0)
+    avg_rating = models.FloatField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'user_summary'
+        verbose_name_plural = 'User summaries'
+        indexes = [
+            models.Index(fields=['-avg_rating', '-reviews_received']),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username}: {self.skills_count} skills, {self.avg_rating or 0:.1f}/5"
+
+class MonthlySwapStats(models.Model):
+    """Swap requests per calendar month by status (analytics rollup, see analytics.py)"""
+    month = models.DateField(unique=True)  # first day of the month
+    total = models.IntegerField(default=0)
+    pending = models.IntegerField(default=0)
+    accepted = models.IntegerField(default=0)
+    rejected = models.IntegerField(default=0)
+    completed = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = 'rollup_monthly_swaps'
+        verbose_name_plural = 'Monthly swap stats'
+
+    def __str__(self):
+        return f"{self.month:%Y-%m}: {self.total} requests"
+
+class LocationSwapStats(models.Model):
+    """Swap requests per month and participant location (analytics rollup)"""
+    month = models.DateField()
+    location = models.CharField(max_length=100)
+    total = models.IntegerField(default=0)
+    pending = models.IntegerField(default=0)
+    completed = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = 'rollup_location_swaps'
+        verbose_name_plural = 'Location swap stats'
+        unique_together = ['month', 'location']
+
+    def __str__(self):
+        return f"{self.location} {self.month:%Y-%m}: {self.total} requests"
+
+class CategoryStats(models.Model):
+    """Per-category skills, teachers, requests and ratings (analytics rollup)"""
+    category = models.OneToOneField(Category, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    total_skills = models.IntegerField(default=0)
+    total_teachers = models.IntegerField(default=0)
+    total_requests = models.IntegerField(default=0)
+    total_reviews = models.IntegerField(default=0)
+    avg_rating = models.FloatField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'rollup_categories'
+        verbose_name_plural = 'Category stats'
+
+    def __str__(self):
+        return f"{self.category.name}: {self.total_skills} skills"
+
+class DataVersion(models.Model):
+    """Version counters bumped whenever a group of tables changes (used for ETags)"""
+    name = models.CharField(max_length=50, unique=True)
+    version = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'data_versions'
+
+    def __str__(self):
+        return f"{self.name} v{self.version}"
+
+class Job(models.Model):
+    """A queued side effect of a write, run by the run_jobs worker (see jobs.py)"""
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('failed', 'Failed'),
+    ]
+
+    name = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+    attempts = models.IntegerField(default=0)
+    run_after = models.DateTimeField(default=timezone.now)
+    # Lease: a running job whose locked_until has passed is claimable again
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_until = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'jobs'
+        indexes = [
+            models.Index(fields=['status', 'run_after']),
+            models.Index(fields=['status', 'locked_until']),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.id} ({self.status})"
+
+class OutboxEvent(models.Model):
+    """A domain event, written in the same transaction as the change it describes (see outbox.py)"""
+    topic = models.CharField(max_length=100)
+    aggregate_id = models.BigIntegerField()
+    payload = models.JSONField(default=dict)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'outbox'
+
+    def __str__(self):
+        return f"#{self.id} {self.topic} {self.aggregate_id}"
+
+class OutboxCursor(models.Model):
+    """Last outbox event id each subscriber has processed"""
+    name = models.CharField(max_length=100, unique=True)
+    position = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'outbox_cursors'
+
+    def __str__(self):
+        return f"{self.name} @ {self.position}"
+
+class Notification(models.Model):
+    """Something a user should hear about, waiting for their next digest (see notifications.py)"""
+    KIND_CHOICES = [
+        ('swap_request', 'Swap request received'),
+        ('review', 'Review received'),
+    ]
+
+    recipient = models.ForeignKey(User, on_delete=models.CASCADE, related_name='notifications')
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    payload = models.JSONField(default=dict)
+    created_at = models.DateTimeField(auto_now_add=True)
+    # Failed sends of the digest this notification was in
+    attempts = models.PositiveIntegerField(default=0)
+    retry_after = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'notifications'
+        indexes = [
+            # Due recipients: oldest pending notification per user
+            models.Index(fields=['recipient', 'created_at']),
         ]
 
     def __str__(self):
-        return f"{self.from_user.username} â†’ {self.to_user.username}: {self.rating}/5"
\ No newline at end of file
+        return f"{self.kind} for {self.recipient_id}"
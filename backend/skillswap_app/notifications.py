@@ -0,0 +1,238 @@
+# backend/skillswap_app/notifications.py
+"""
+Notification digests.
+
+The 'notifications' outbox subscriber turns new swap requests and reviews
+into Notification rows for their recipient, in the transaction that moves
+its cursor. Nothing is sent per event. `manage.py send_digests` finds users
+whose oldest pending notification is at least NOTIFICATION_DIGEST_WINDOW
+seconds old, NOTIFICATION_BATCH_SIZE users at a time. It renders one digest
+per user from everything they have pending and hands the batch to the
+transport. Loading a batch costs the same few queries however many
+notifications it covers, and each recipient then costs a lock, a send and
+a delete, so the work grows with recipients, not events.
+
+Transports (NOTIFICATION_TRANSPORT) take a list of digests:
+    ConsoleTransport   prints them (development)
+    FileTransport      appends JSON lines to NOTIFICATION_FILE (testing, inspection)
+    EmailTransport     one email per digest over Django's EMAIL_BACKEND
+
+Each recipient's digest is sent in its own transaction, with their rows
+locked (SELECT ... FOR UPDATE SKIP LOCKED where supported): overlapping runs
+skip recipients another run is sending to, and rows are deleted only after
+the transport returns. A failed send puts only that recipient back, after a
+backoff; after NOTIFICATION_MAX_ATTEMPTS their notifications are dropped.
+"""
+import json
+import logging
+import os
+import sys
+from collections import OrderedDict
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.mail import EmailMessage, get_connection
+from django.db import connection, transaction
+from django.db.models import F, Max, Min, Q
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from . import outbox
+from .models import Notification, Skill
+
+logger = logging.getLogger('skillswap_app.notifications')
+
+NAMES_PER_SKILL = 3
+MAX_RETRY_DELAY = 86400
+
+
+class Digest:
+    """One user's rendered digest"""
+
+    def __init__(self, recipient, subject, body, count):
+        self.recipient = recipient
+        self.subject = subject
+        self.body = body
+        self.count = count
+
+
+class ConsoleTransport:
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+
+    def send(self, digests):
+        for digest in digests:
+            self.stream.write(f'To: {digest.recipient.username}\nSubject: {digest.subject}\n\n{digest.body}\n{"-" * 70}\n')
+        return len(digests)
+
+
+class FileTransport:
+    def __init__(self, path=None):
+        self.path = path or settings.NOTIFICATION_FILE
+
+    def send(self, digests):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        sent_at = timezone.now().isoformat()
+        with open(self.path, 'a', encoding='utf-8') as out:
+            for digest in digests:
+                out.write(json.dumps({
+                    'at': sent_at, 'user_id': digest.recipient.id, 'to': digest.recipient.email,
+                    'subject': digest.subject, 'body': digest.body, 'count': digest.count,
+                }) + '\n')
+        return len(digests)
+
+
+class EmailTransport:
+    """Users without an email address are skipped"""
+
+    def __init__(self):
+        self.connection = get_connection()
+
+    def send(self, digests):
+        messages = [EmailMessage(digest.subject, digest.body, settings.DEFAULT_FROM_EMAIL, [digest.recipient.email],
+                                 connection=self.connection)
+                    for digest in digests if digest.recipient.email]
+        if not messages:
+            return 0
+        return self.connection.send_messages(messages)
+
+
+def get_transport(path=None):
+    return import_string(path or settings.NOTIFICATION_TRANSPORT)()
+
+
+@outbox.subscriber('notifications', 'swaprequest.created', 'review.created')
+def queue_notifications(events):
+    rows = []
+    for event in events:
+        payload = event.payload
+        if event.topic == 'swaprequest.created':
+            rows.append(Notification(recipient_id=payload['to_user_id'], kind='swap_request', payload={
+                'request_id': event.aggregate_id, 'from_user_id': payload['from_user_id'],
+                'skill_id': payload['requested_skill_id'],
+            }))
+        else:
+            rows.append(Notification(recipient_id=payload['to_user_id'], kind='review', payload={
+                'review_id': event.aggregate_id, 'from_user_id': payload['from_user_id'],
+                'rating': payload['rating'],
+            }))
+    Notification.objects.bulk_create(rows)
+
+
+def due_recipients(limit, now=None, exclude=()):
+    """Users whose oldest pending notification has waited a whole window, oldest first
+
+    Users backing off after a failed send are left out until retry_after.
+    """
+    now = now or timezone.now()
+    cutoff = now - timedelta(seconds=settings.NOTIFICATION_DIGEST_WINDOW)
+    pending = Notification.objects.exclude(recipient_id__in=exclude)
+    return list(pending.values('recipient_id').annotate(oldest=Min('created_at'), retry=Max('retry_after'))
+                .filter(Q(retry__isnull=True) | Q(retry__lte=now), oldest__lte=cutoff)
+                .order_by('oldest', 'recipient_id')
+                .values_list('recipient_id', flat=True)[:limit])
+
+
+def retry_delay(attempts):
+    return timedelta(seconds=min(settings.NOTIFICATION_DIGEST_WINDOW * 2 ** (attempts - 1), MAX_RETRY_DELAY))
+
+
+def render(recipient, notifications, users, skills):
+    """Digest of one user's pending notifications; users and skills are id -> object maps"""
+    requests = OrderedDict()
+    reviews = []
+    for notification in notifications:
+        sender = users.get(notification.payload['from_user_id'])
+        name = sender.username if sender else 'someone'
+        if notification.kind == 'swap_request':
+            skill = skills.get(notification.payload['skill_id'])
+            requests.setdefault(skill.name if skill else 'a skill', []).append(name)
+        else:
+            reviews.append((name, notification.payload['rating']))
+    request_count = sum(len(names) for names in requests.values())
+
+    parts = []
+    if request_count:
+        parts.append(f'{request_count} new swap request{"s" if request_count != 1 else ""}')
+    if reviews:
+        parts.append(f'{len(reviews)} new review{"s" if len(reviews) != 1 else ""}')
+    body = render_to_string('notifications/digest.txt', {
+        'recipient': recipient,
+        'request_count': request_count,
+        'requests': [(skill, names[:NAMES_PER_SKILL], len(names) - NAMES_PER_SKILL)
+                     for skill, names in requests.items()],
+        'reviews': reviews,
+    })
+    return Digest(recipient, f'SkillSwap: {" and ".join(parts)}', body, len(notifications))
+
+
+def _send_one(transport, recipient, notifications, users, skills, now):
+    """Lock, send and delete one recipient's notifications; returns 'sent', 'failed' or 'skipped'"""
+    ids = [n.id for n in notifications]
+    with transaction.atomic():
+        locked = Notification.objects.select_for_update(
+            skip_locked=connection.features.has_select_for_update_skip_locked,
+        ).filter(id__in=ids)
+        if len(locked.values_list('id', flat=True)) != len(ids):
+            # Another run is sending (or has sent) this digest
+            return 'skipped'
+        try:
+            transport.send([render(recipient, notifications, users, skills)])
+        except Exception:
+            attempts = max(n.attempts for n in notifications) + 1
+            if attempts >= settings.NOTIFICATION_MAX_ATTEMPTS:
+                logger.exception('Dropping digest for user %s after %s failed attempts', recipient.id, attempts)
+                Notification.objects.filter(id__in=ids).delete()
+            else:
+                logger.exception('Digest for user %s failed (attempt %s)', recipient.id, attempts)
+                Notification.objects.filter(id__in=ids).update(
+                    attempts=F('attempts') + 1, retry_after=now + retry_delay(attempts),
+                )
+            return 'failed'
+        Notification.objects.filter(id__in=ids).delete()
+    return 'sent'
+
+
+def send_batch(transport, limit, now=None, exclude=()):
+    """Send one batch of digests; returns {recipient id: 'sent' | 'failed' | 'skipped'} and notifications sent"""
+    now = now or timezone.now()
+    recipient_ids = due_recipients(limit, now, exclude)
+    if not recipient_ids:
+        return {}, 0
+    pending = list(Notification.objects.filter(recipient_id__in=recipient_ids).order_by('created_at', 'id'))
+    user_ids = set(recipient_ids) | {n.payload['from_user_id'] for n in pending}
+    users = User.objects.in_bulk(user_ids)
+    skills = Skill.objects.in_bulk({n.payload['skill_id'] for n in pending if n.kind == 'swap_request'})
+
+    by_recipient = OrderedDict((user_id, []) for user_id in recipient_ids)
+    for notification in pending:
+        by_recipient[notification.recipient_id].append(notification)
+    outcomes = {}
+    covered = 0
+    for user_id, notifications in by_recipient.items():
+        if not notifications or user_id not in users:
+            # Sent by another run, or the user deleted, between the queries
+            outcomes[user_id] = 'skipped'
+            continue
+        outcomes[user_id] = _send_one(transport, users[user_id], notifications, users, skills, now)
+        if outcomes[user_id] == 'sent':
+            covered += len(notifications)
+    return outcomes, covered
+
+
+def send_digests(transport=None, batch_size=None, now=None):
+    """Send every due digest, a batch of recipients at a time; returns (digests, notifications, failed)"""
+    transport = transport or get_transport()
+    limit = batch_size or settings.NOTIFICATION_BATCH_SIZE
+    digests = notifications = failed = 0
+    skipped = set()
+    while True:
+        outcomes, covered = send_batch(transport, limit, now, skipped)
+        if not outcomes:
+            return digests, notifications, failed
+        digests += sum(1 for outcome in outcomes.values() if outcome == 'sent')
+        failed += sum(1 for outcome in outcomes.values() if outcome == 'failed')
+        skipped.update(user_id for user_id, outcome in outcomes.items() if outcome == 'skipped')
+        notifications += covered
@@ -0,0 +1,149 @@
+# backend/skillswap_app/outbox.py
+"""
+Transactional outbox for domain events.
+
+Signal receivers publish() an OutboxEvent for every change to swap requests,
+reviews and user skills. The insert runs inside the transaction of the
+change, so an event exists if and only if the change committed: consumers
+need no second write that could fail on its own, and no rescans to catch
+up. The mutation views make their writes atomic for that reason.
+
+`manage.py relay_outbox` tails the table in id order and hands each
+registered subscriber the batch of new events matching its topic patterns.
+Every subscriber keeps its own cursor (OutboxCursor), advanced in the same
+transaction as the subscriber's own writes, and reads onwards from it. A
+failing subscriber retries the same batch on the next round and never holds
+the others back.
+
+Ids are assigned at insert but become visible at commit, so a later id can
+show up before an earlier one. The relay stops at a gap in the ids until
+the event after it is OUTBOX_GAP_TIMEOUT seconds old. By then the missing
+id is taken to be a rolled-back insert (sequences do not roll back).
+"""
+import fnmatch
+import logging
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max, Min
+from django.utils import timezone
+
+from . import metrics
+from .models import OutboxEvent, OutboxCursor
+
+logger = logging.getLogger('skillswap_app.outbox')
+
+SUBSCRIBERS = {}  # name -> (topic patterns, func(events))
+
+
+def publish(topic, aggregate_id, **payload):
+    """Record an event in the current transaction; payload must be JSON serializable"""
+    return OutboxEvent.objects.create(topic=topic, aggregate_id=aggregate_id, payload=payload)
+
+
+def publish_change(instance, action, fields):
+    """'<model>.<created|updated|deleted>' event with a snapshot of the given fields"""
+    topic = f'{instance._meta.model_name}.{action}'
+    return publish(topic, instance.pk, **{field: getattr(instance, field) for field in fields})
+
+
+def subscriber(name, *topics):
+    """Register func(events) to receive batches of events whose topic matches a pattern ('review.*')"""
+    def register(func):
+        SUBSCRIBERS[name] = (topics, func)
+        return func
+    return register
+
+
+def matches(topic, patterns):
+    return any(fnmatch.fnmatchcase(topic, pattern) for pattern in patterns)
+
+
+def cursors():
+    """{subscriber name: position}; new subscribers start at the current end of the outbox"""
+    found = dict(OutboxCursor.objects.filter(name__in=SUBSCRIBERS).values_list('name', 'position'))
+    missing = [name for name in SUBSCRIBERS if name not in found]
+    if missing:
+        end = OutboxEvent.objects.aggregate(end=Max('id'))['end'] or 0
+        OutboxCursor.objects.bulk_create([OutboxCursor(name=name, position=end) for name in missing],
+                                         ignore_conflicts=True)
+        found.update(OutboxCursor.objects.filter(name__in=missing).values_list('name', 'position'))
+    return found
+
+
+def pending(after, limit):
+    """Up to limit events after id after, stopping at a gap that may still be filled"""
+    horizon = timezone.now() - timedelta(seconds=settings.OUTBOX_GAP_TIMEOUT)
+    events = []
+    expected = after + 1
+    for event in OutboxEvent.objects.filter(id__gt=after).order_by('id')[:limit]:
+        if event.id != expected and event.created_at > horizon:
+            break
+        events.append(event)
+        expected = event.id + 1
+    return events
+
+
+def relay(limit=None):
+    """Dispatch one batch to every subscriber; returns {name: (events, error or None)}"""
+    positions = cursors()
+    limit = limit or settings.OUTBOX_BATCH_SIZE
+    # Each subscriber reads from its own cursor, so one stuck on a failing
+    # batch never pins the window of the others; subscribers at the same
+    # position (the usual case) share the read
+    reads = {}
+    results = {}
+    for name, (topics, func) in SUBSCRIBERS.items():
+        position = positions[name]
+        if position not in reads:
+            reads[position] = pending(position, limit)
+        unread = reads[position]
+        if not unread:
+            continue
+        batch = [event for event in unread if matches(event.topic, topics)]
+        try:
+            with transaction.atomic():
+                if batch:
+                    func(batch)
+                OutboxCursor.objects.filter(name=name).update(position=unread[-1].id)
+        except Exception as e:
+            logger.exception('Outbox subscriber %s failed on events %s-%s', name, unread[0].id, unread[-1].id)
+            results[name] = (len(batch), f'{e.__class__.__name__}: {e}')
+            continue
+        results[name] = (len(batch), None)
+    return results
+
+
+def purge():
+    """Delete events every subscriber has read that are older than OUTBOX_RETENTION_DAYS"""
+    read_by_all = OutboxCursor.objects.filter(name__in=SUBSCRIBERS).aggregate(low=Min('position'))['low']
+    if read_by_all is None:
+        return 0
+    cutoff = timezone.now() - timedelta(days=settings.OUTBOX_RETENTION_DAYS)
+    deleted, _ = OutboxEvent.objects.filter(id__lte=read_by_all, created_at__lt=cutoff).delete()
+    return deleted
+
+
+def lag():
+    """{subscriber name: (unread events, seconds since the oldest unread event)}"""
+    result = {}
+    now = time.time()
+    for name, position in cursors().items():
+        unread = OutboxEvent.objects.filter(id__gt=position)
+        oldest = unread.order_by('id').values_list('created_at', flat=True).first()
+        result[name] = (unread.count(), round(now - oldest.timestamp(), 1) if oldest else 0.0)
+    return result
+
+
+@metrics.sampled('skillswap_outbox_lag_events', 'Outbox events a subscriber has not consumed yet',
+                 ('subscriber',))
+def lag_events():
+    return {(name,): unread for name, (unread, age) in lag().items()}
+
+
+@metrics.sampled('skillswap_outbox_lag_seconds', 'Age of the oldest outbox event a subscriber has not consumed',
+                 ('subscriber',))
+def lag_seconds():
+    return {(name,): age for name, (unread, age) in lag().items()}
@@ -0,0 +1,153 @@
+# backend/skillswap_app/profiler.py
+"""
+Statistical sampling profiler for live workers.
+
+A Sampler thread wakes every few milliseconds and records the stack of every
+other thread from sys._current_frames(). Nothing is hooked into the code
+being profiled, so the cost is one stack walk per thread per sample and it
+stops entirely when the run ends. Stacks are written in the collapsed format
+("thread;outer (file:line);...;inner (file:line) count", one line per
+distinct stack) that flamegraph.pl, speedscope and inferno read directly.
+
+Three ways to start one:
+    POST /admin/profiler/          staff only: sample this worker for N seconds
+    kill -USR2 <worker pid>        sample that worker for PROFILER_SIGNAL_SECONDS
+    ?_profile=<token>              sample just this request's thread; the token
+                                   comes from GET /admin/profiler/token/?path=...
+"""
+import os
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+from django.conf import settings
+from django.core import signing
+
+TOKEN_SALT = 'skillswap_app.profiler'
+QUERY_PARAM = '_profile'
+
+_lock = threading.Lock()
+_active = None
+
+
+def _short(filename):
+    for marker in ('site-packages' + os.sep, 'lib' + os.sep + 'python'):
+        if marker in filename:
+            return filename.split(marker, 1)[1]
+    base = str(settings.BASE_DIR) + os.sep
+    return filename[len(base):] if filename.startswith(base) else filename
+
+
+def collapse(frame):
+    """Root-first 'function (file:line)' names joined by ';'"""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f'{code.co_name} ({_short(code.co_filename)}:{code.co_firstlineno})'.replace(';', ':'))
+        frame = frame.f_back
+    return ';'.join(reversed(names))
+
+
+class Sampler:
+    """Samples other threads' stacks every interval seconds until stopped or the deadline"""
+
+    def __init__(self, interval, thread_ids=None):
+        self.interval = interval
+        self.thread_ids = thread_ids
+        self.stacks = Counter()
+        self.samples = 0
+        self.started = None
+        self.elapsed = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self, seconds, on_finish=None):
+        self.started = time.monotonic()
+        self._thread = threading.Thread(target=self._run, args=(self.started + seconds, on_finish),
+                                        name='profiler-sampler', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+
+    def _run(self, deadline, on_finish):
+        own = threading.get_ident()
+        names = {}
+        while not self._stop.is_set() and time.monotonic() < deadline:
+            frames = sys._current_frames()
+            if len(names) != len(frames):
+                names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in frames.items():
+                if ident == own or (self.thread_ids is not None and ident not in self.thread_ids):
+                    continue
+                self.stacks[names.get(ident, str(ident)).replace(';', ':') + ';' + collapse(frame)] += 1
+            self.samples += 1
+            self._stop.wait(self.interval)
+        self.elapsed = time.monotonic() - self.started
+        if on_finish is not None:
+            on_finish(self)
+
+    def write(self, path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as out:
+            for stack, count in self.stacks.most_common():
+                out.write(f'{stack} {count}\n')
+        return path
+
+
+def profile_path(label):
+    stamp = datetime.now().strftime('%Y%m%d-%H%M%S-%f')
+    return os.path.join(str(settings.PROFILER_DIR), f'{label}-{os.getpid()}-{stamp}.collapsed')
+
+
+def start_worker_profile(seconds, interval=None):
+    """Sample every thread of this process for seconds; returns the file it will write, or None if busy"""
+    global _active
+    seconds = min(float(seconds), settings.PROFILER_MAX_SECONDS)
+    path = profile_path('worker')
+
+    def finish(sampler):
+        global _active
+        sampler.write(path)
+        with _lock:
+            _active = None
+
+    with _lock:
+        if _active is not None:
+            return None
+        _active = Sampler(interval or settings.PROFILER_INTERVAL)
+        _active.start(seconds, on_finish=finish)
+    return path
+
+
+def _on_signal(signum, frame):
+    # Not inline: the handler may interrupt a thread that holds _lock
+    threading.Thread(target=start_worker_profile, args=(settings.PROFILER_SIGNAL_SECONDS,), daemon=True).start()
+
+
+def install_signal_handler():
+    """Profile on PROFILER_SIGNAL; must run in the worker's main thread (e.g. gunicorn post_worker_init)"""
+    name = getattr(settings, 'PROFILER_SIGNAL', '')
+    if not name or threading.current_thread() is not threading.main_thread():
+        return False
+    signal.signal(getattr(signal, name), _on_signal)
+    return True
+
+
+def make_token(path):
+    """Signed permission to profile requests to path, valid for PROFILER_TOKEN_MAX_AGE seconds"""
+    return signing.TimestampSigner(salt=TOKEN_SALT).sign(path)[len(path) + 1:]
+
+
+def check_token(path, token):
+    try:
+        signing.TimestampSigner(salt=TOKEN_SALT).unsign(f'{path}:{token}', max_age=settings.PROFILER_TOKEN_MAX_AGE)
+    except signing.BadSignature:
+        return False
+    return True
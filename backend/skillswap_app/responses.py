@@ -0,0 +1,62 @@
+# backend/skillswap_app/responses.py
+import datetime
+import json
+import time
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse
+
+try:
+    import orjson
+except ImportError:  # orjson is optional, fall back to the stdlib encoder
+    orjson = None
+
+
+class IsoDateTimeEncoder(DjangoJSONEncoder):
+    """DjangoJSONEncoder that writes datetimes exactly like orjson/isoformat()
+
+    DjangoJSONEncoder trims microseconds and rewrites +00:00 as Z, which
+    would make the fallback path disagree with the orjson path.
+    """
+
+    def default(self, o):
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+def _orjson_default(o):
+    """Types orjson does not handle natively (Decimal, Promise, ...)"""
+    return DjangoJSONEncoder().default(o)
+
+
+def dumps(data):
+    """Serialize data to JSON bytes, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(data, default=_orjson_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, cls=IsoDateTimeEncoder, separators=(',', ':')).encode()
+
+
+class FastJsonResponse(HttpResponse):
+    """Drop-in replacement for JsonResponse with an orjson fast path
+
+    Datetimes are serialized natively, so views can put model datetimes
+    straight into the payload instead of calling isoformat() per row.
+    """
+
+    def __init__(self, data, encoder=None, safe=True, json_dumps_params=None, **kwargs):
+        if safe and not isinstance(data, dict):
+            raise TypeError(
+                'In order to allow non-dict objects to be serialized set the '
+                'safe parameter to False.'
+            )
+        kwargs.setdefault('content_type', 'application/json')
+        started = time.perf_counter()
+        if encoder is not None or json_dumps_params:
+            # Custom encoding requested: behave exactly like JsonResponse
+            content = json.dumps(data, cls=encoder or DjangoJSONEncoder, **(json_dumps_params or {}))
+        else:
+            content = dumps(data)
+        # Read by InstrumentationMiddleware for the Server-Timing header
+        self.serialization_time = time.perf_counter() - started
+        super().__init__(content=content, **kwargs)
@@ -0,0 +1,203 @@
+# backend/skillswap_app/signals.py
+import threading
+from contextlib import contextmanager
+
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import Signal, receiver
+
+from .models import Category, Skill, Profile, UserSkill, SwapRequest, Review, LocationAlias
+from . import cache, jobs, outbox, summaries, versions
+
+# Sent once after a bulk change to a user's skill set has committed.
+# Bulk deletes/inserts/updates bypass post_save, so anything keyed on a
+# user's skills (caches, match indexes) should listen here as well.
+# Arguments: user, skill_ids (set of skill ids whose rows changed)
+user_skills_changed = Signal()
+
+_state = threading.local()
+
+
+@contextmanager
+def skill_set_update():
+    """Silence per-row UserSkill receivers while a whole skill set is rewritten
+
+    The caller is expected to send user_skills_changed once afterwards, so
+    a bulk change costs one invalidation instead of one per row.
+    """
+    _state.skill_set_update = True
+    try:
+        yield
+    finally:
+        _state.skill_set_update = False
+
+
+def _in_skill_set_update():
+    return getattr(_state, 'skill_set_update', False)
+
+
+def _skill_categories(skill_ids):
+    return set(Skill.objects.filter(id__in=skill_ids).values_list('category_id', flat=True))
+
+
+def _teaching_categories(user_id):
+    return set(UserSkill.objects.filter(user_id=user_id, can_teach=True)
+               .values_list('skill__category_id', flat=True))
+
+
+def _invalidate_browse_on_commit(category_ids=None):
+    # Invalidate after commit so a concurrent request cannot refill the
+    # cache with pre-commit data under the new generation
+    transaction.on_commit(lambda: cache.invalidate_browse(category_ids))
+
+
+# ETag versions
+
+@receiver([post_save, post_delete], sender=Category)
+@receiver([post_save, post_delete], sender=Skill)
+def bump_catalog_version(sender, **kwargs):
+    """Categories and skills changed: catalog and browse ETags go stale"""
+    versions.bump_on_commit(versions.CATALOG)
+
+
+@receiver([post_save, post_delete], sender=UserSkill)
+@receiver([post_save, post_delete], sender=Profile)
+@receiver([post_save, post_delete], sender=Review)
+@receiver([post_save, post_delete], sender=LocationAlias)
+def bump_teachers_version(sender, **kwargs):
+    """Teacher data (or how location filters resolve) changed: browse ETags go stale"""
+    if sender is UserSkill and _in_skill_set_update():
+        return
+    versions.bump_on_commit(versions.TEACHERS)
+
+
+@receiver(user_skills_changed)
+def bump_teachers_version_for_skill_set(sender, **kwargs):
+    versions.bump_on_commit(versions.TEACHERS)
+
+
+# Response caches
+
+@receiver([post_save, post_delete], sender=Category)
+@receiver([post_save, post_delete], sender=Skill)
+def invalidate_caches_for_catalog(sender, **kwargs):
+    """Names, descriptions and category moves show up in every browse entry"""
+    _invalidate_browse_on_commit()
+    transaction.on_commit(cache.invalidate_catalog)
+
+
+@receiver([post_save, post_delete], sender=UserSkill)
+def invalidate_browse_for_user_skill(sender, instance, **kwargs):
+    if _in_skill_set_update():
+        return
+    _invalidate_browse_on_commit(_skill_categories([instance.skill_id]))
+
+
+@receiver(user_skills_changed)
+def invalidate_browse_for_skill_set(sender, user, skill_ids, **kwargs):
+    cache.invalidate_browse(_skill_categories(skill_ids))
+
+
+@receiver(post_save, sender=Profile)
+def invalidate_browse_for_location(sender, instance, created, **kwargs):
+    """Only location and coordinate changes are visible in browse results"""
+    if created or (getattr(instance, '_loaded_location', None) == instance.location
+                   and getattr(instance, '_loaded_coordinates', None) == instance.coordinates):
+        return
+    instance._loaded_location = instance.location
+    instance._loaded_coordinates = instance.coordinates
+    _invalidate_browse_on_commit(_teaching_categories(instance.user_id))
+
+
+@receiver(post_delete, sender=Profile)
+def invalidate_browse_for_profile_delete(sender, instance, **kwargs):
+    _invalidate_browse_on_commit(_teaching_categories(instance.user_id))
+
+
+@receiver([post_save, post_delete], sender=LocationAlias)
+def invalidate_browse_for_alias(sender, **kwargs):
+    """Alias edits change which profiles a location filter matches"""
+    _invalidate_browse_on_commit()
+
+
+@receiver([post_save, post_delete], sender=Review)
+def invalidate_browse_for_review(sender, instance, **kwargs):
+    """Ratings are shown next to every skill the reviewed user teaches"""
+    _invalidate_browse_on_commit(_teaching_categories(instance.to_user_id))
+
+
+# Summary tables (refreshed by the job worker, see jobs.py)
+
+@jobs.handler('refresh_summaries')
+def refresh_summaries(payloads):
+    """One refresh for the union of every queued job's skills and users"""
+    skill_ids = {skill_id for payload in payloads for skill_id in payload.get('skill_ids', ())}
+    user_ids = {user_id for payload in payloads for user_id in payload.get('user_ids', ())}
+    request_ids = {request_id for payload in payloads for request_id in payload.get('request_ids', ())}
+    if request_ids:
+        skill_ids |= summaries.skills_for_requests(request_ids)
+    if skill_ids:
+        summaries.refresh_skills(skill_ids)
+    if user_ids:
+        summaries.refresh_users(user_ids)
+
+
+def _refresh_summaries_later(skill_ids=(), user_ids=(), request_ids=()):
+    """request_ids: swap requests whose skills need refreshing, looked up by the worker"""
+    jobs.enqueue('refresh_summaries', skill_ids=sorted(set(skill_ids)), user_ids=sorted(set(user_ids)),
+                 request_ids=sorted(set(request_ids)))
+
+
+@receiver(post_save, sender=Skill)
+def refresh_summaries_for_new_skill(sender, instance, created, **kwargs):
+    if created:
+        _refresh_summaries_later(skill_ids=[instance.id])
+
+
+@receiver([post_save, post_delete], sender=UserSkill)
+def refresh_summaries_for_user_skill(sender, instance, **kwargs):
+    if _in_skill_set_update():
+        return
+    _refresh_summaries_later(skill_ids=[instance.skill_id], user_ids=[instance.user_id])
+
+
+@receiver(user_skills_changed)
+def refresh_summaries_for_skill_set(sender, user, skill_ids, **kwargs):
+    _refresh_summaries_later(skill_ids=skill_ids, user_ids=[user.id])
+
+
+@receiver(post_save, sender=Profile)
+def refresh_summary_for_profile(sender, instance, **kwargs):
+    """Keeps the location copy current"""
+    _refresh_summaries_later(user_ids=[instance.user_id])
+
+
+@receiver([post_save, post_delete], sender=SwapRequest)
+def refresh_summaries_for_swap_request(sender, instance, **kwargs):
+    """Request counts, and which reviews count towards a skill's rating"""
+    _refresh_summaries_later(skill_ids=[instance.requested_skill_id])
+
+
+@receiver([post_save, post_delete], sender=Review)
+def refresh_summaries_for_review(sender, instance, **kwargs):
+    _refresh_summaries_later(request_ids=[instance.swap_request_id], user_ids=[instance.to_user_id])
+
+
+# Outbox (domain events for relay_outbox subscribers, see outbox.py)
+
+EVENT_FIELDS = {
+    SwapRequest: ['from_user_id', 'to_user_id', 'requested_skill_id', 'offered_skill_id', 'status'],
+    Review: ['swap_request_id', 'from_user_id', 'to_user_id', 'rating'],
+    UserSkill: ['user_id', 'skill_id', 'can_teach', 'experience_level'],
+}
+
+
+@receiver([post_save, post_delete], sender=SwapRequest)
+@receiver([post_save, post_delete], sender=Review)
+@receiver([post_save, post_delete], sender=UserSkill)
+def publish_domain_event(sender, instance, signal, created=False, **kwargs):
+    """'swaprequest.updated', 'review.created', 'userskill.deleted', ..."""
+    if sender is UserSkill and _in_skill_set_update():
+        return  # the view publishes one userskill.replaced event instead
+    action = 'deleted' if signal is post_delete else 'created' if created else 'updated'
+    outbox.publish_change(instance, action, EVENT_FIELDS[sender])
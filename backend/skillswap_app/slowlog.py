@@ -0,0 +1,206 @@
+# backend/skillswap_app/slowlog.py
+"""
+Slow query log.
+
+Every new database connection gets an execute wrapper (connection_created)
+that times each statement. Statements slower than SLOW_QUERY_MS are written
+as JSON lines to the skillswap_app.slow_queries logger, which settings.LOGGING
+sends to a RotatingFileHandler on SLOW_QUERY_LOG_FILE. Each line records the
+parameters and the app line that ran the statement.
+
+The first time a SELECT fingerprint turns up slow in a process, and whenever
+it gets slower than when it was last explained, its EXPLAIN output is
+captured on a background thread. That thread uses its own connection, so
+the request never waits on it, and the plan is logged as an 'explain' record.
+/admin/slow-queries/ reads the file back and ranks fingerprints by total time.
+"""
+import json
+import logging
+import queue
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+from .middleware import caller, fingerprint
+
+logger = logging.getLogger('skillswap_app.slow_queries')
+
+MAX_PARAMS = 50
+MAX_PARAM_LENGTH = 200
+MAX_EXPLAINED = 1000
+
+_state = threading.local()
+
+
+def _params(params, many):
+    if params is None or many:
+        return None
+    if isinstance(params, dict):
+        params = list(params.values())
+    return [value[:MAX_PARAM_LENGTH] if isinstance(value, str)
+            else value if isinstance(value, (int, float, bool)) or value is None
+            else repr(value)[:MAX_PARAM_LENGTH]
+            for value in list(params)[:MAX_PARAMS]]
+
+
+def explain(alias, sql, params):
+    """The backend's plan for a SELECT, as text lines"""
+    connection = connections[alias]
+    prefix = {'sqlite': 'EXPLAIN QUERY PLAN ', 'postgresql': 'EXPLAIN '}.get(connection.vendor, 'EXPLAIN ')
+    with connection.cursor() as cursor:
+        cursor.execute(prefix + sql, params)
+        columns = [column[0] for column in cursor.description]
+        rows = cursor.fetchall()
+    if connection.vendor == 'postgresql':
+        return [row[0] for row in rows]
+    return [' | '.join(f'{name}={value}' for name, value in zip(columns, row)) for row in rows]
+
+
+def _log_explain(alias, key, sql, params):
+    _state.explaining = True
+    try:
+        plan = explain(alias, sql, params)
+    except Exception as e:  # a plan is best effort; never break the worker
+        plan = [f'EXPLAIN failed: {e}']
+    finally:
+        _state.explaining = False
+    logger.info(json.dumps({'type': 'explain', 'at': _now(), 'fingerprint': key, 'plan': plan}))
+
+
+class Explainer:
+    """Background thread that runs EXPLAIN for queued statements"""
+
+    def __init__(self):
+        self.queue = queue.Queue(maxsize=100)
+        self.explained = {}  # fingerprint -> duration of the run that was explained
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def wants(self, key, duration_ms):
+        with self.lock:
+            if self.explained.get(key, 0) >= duration_ms:
+                return False
+            if len(self.explained) >= MAX_EXPLAINED:
+                self.explained.clear()
+            self.explained[key] = duration_ms
+            return True
+
+    def submit(self, alias, key, sql, params):
+        if not getattr(settings, 'SLOW_QUERY_EXPLAIN_ASYNC', True):
+            _log_explain(alias, key, sql, params)
+            return
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self.run, name='slow-query-explain', daemon=True)
+                self.thread.start()
+        try:
+            self.queue.put_nowait((alias, key, sql, params))
+        except queue.Full:
+            pass
+
+    def run(self):
+        while True:
+            alias, key, sql, params = self.queue.get()
+            _log_explain(alias, key, sql, params)
+            connections[alias].close_if_unusable_or_obsolete()
+
+
+explainer = Explainer()
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat(timespec='milliseconds')
+
+
+class SlowQueryWrapper:
+    """execute_wrapper that logs statements slower than SLOW_QUERY_MS"""
+
+    def __init__(self, alias):
+        self.alias = alias
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration_ms = (time.perf_counter() - started) * 1000
+            if duration_ms >= getattr(settings, 'SLOW_QUERY_MS', 200) and not getattr(_state, 'explaining', False):
+                self.record(sql, params, many, duration_ms)
+
+    def record(self, sql, params, many, duration_ms):
+        key = fingerprint(sql)
+        logger.info(json.dumps({
+            'type': 'query',
+            'at': _now(),
+            'alias': self.alias,
+            'duration_ms': round(duration_ms, 2),
+            'fingerprint': key,
+            'sql': sql,
+            'params': _params(params, many),
+            'caller': caller(),
+        }, default=str))
+        if (getattr(settings, 'SLOW_QUERY_EXPLAIN', True) and not many
+                and sql.lstrip()[:6].upper() == 'SELECT' and explainer.wants(key, duration_ms)):
+            explainer.submit(self.alias, key, sql, params)
+
+
+def install(sender, connection, **kwargs):
+    """connection_created receiver: add the timing wrapper once per connection"""
+    if not getattr(settings, 'SLOW_QUERY_LOG_ENABLED', False):
+        return
+    if not any(isinstance(wrapper, SlowQueryWrapper) for wrapper in connection.execute_wrappers):
+        # First in the list, so it times the statement itself and not the other wrappers
+        connection.execute_wrappers.insert(0, SlowQueryWrapper(connection.alias))
+
+
+connection_created.connect(install, dispatch_uid='skillswap_app.slowlog.install')
+
+
+def read_records(path=None, backups=None):
+    """Parsed records from the log file and its rotated backups, oldest first"""
+    path = path or settings.SLOW_QUERY_LOG_FILE
+    backups = getattr(settings, 'SLOW_QUERY_LOG_BACKUPS', 3) if backups is None else backups
+    records = []
+    for name in [f'{path}.{n}' for n in range(backups, 0, -1)] + [str(path)]:
+        try:
+            with open(name, encoding='utf-8') as handle:
+                for line in handle:
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError:
+                        continue
+        except FileNotFoundError:
+            continue
+    return records
+
+
+def worst(records, limit=50):
+    """Slow statements grouped by fingerprint, most total time first"""
+    groups = {}
+    plans = {}
+    for record in records:
+        key = record.get('fingerprint')
+        if record.get('type') == 'explain':
+            plans[key] = record['plan']
+            continue
+        group = groups.setdefault(key, {
+            'fingerprint': key, 'count': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'callers': Counter(),
+        })
+        group['count'] += 1
+        group['total_ms'] += record['duration_ms']
+        group['last_seen'] = record['at']
+        group['callers'][record.get('caller')] += 1
+        if record['duration_ms'] >= group['max_ms']:
+            group.update(max_ms=record['duration_ms'], sql=record['sql'], params=record.get('params'))
+    ranked = sorted(groups.values(), key=lambda group: -group['total_ms'])[:limit]
+    for group in ranked:
+        group['mean_ms'] = round(group['total_ms'] / group['count'], 2)
+        group['total_ms'] = round(group['total_ms'], 2)
+        group['callers'] = group['callers'].most_common(5)
+        group['plan'] = plans.get(group['fingerprint'])
+    return ranked
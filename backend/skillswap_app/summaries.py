@@ -0,0 +1,105 @@
+# backend/skillswap_app/summaries.py
+"""
+Refresh of the skill_popularity and user_summary tables.
+
+Rows are recomputed from the source tables for just the keys that changed
+(a few grouped queries on indexed columns), rather than adjusted by
+deltas, so a missed or duplicated event can never leave a row drifting.
+The signal receivers queue a refresh_summaries job for the changed keys
+(run by the job worker, see jobs.py); rebuild_summaries runs the same
+functions over every key in chunks.
+"""
+from django.contrib.auth.models import User
+from django.db import connection
+from django.db.models import Avg, Count, Q
+
+from .models import Skill, Profile, UserSkill, SwapRequest, Review, SkillPopularity, UserSummary
+
+SKILL_FIELDS = ['teacher_count', 'learner_count', 'request_count', 'pending_count', 'accepted_count',
+                'completed_count', 'review_count', 'avg_rating', 'demand_gap']
+USER_FIELDS = ['location', 'skills_count', 'reviews_received', 'avg_rating']
+
+
+def _grouped(queryset, key, **aggregates):
+    return {row.pop(key): row for row in queryset.values(key).order_by().annotate(**aggregates)}
+
+
+def _upsert(model, rows, key, fields):
+    """Insert rows, updating fields of those whose key already exists"""
+    if connection.features.supports_update_conflicts_with_target:
+        model.objects.bulk_create(rows, update_conflicts=True, unique_fields=[key], update_fields=fields)
+    else:
+        # MySQL: ON DUPLICATE KEY UPDATE takes no conflict target; the key is
+        # the table's primary key and only unique index, so it is the conflict
+        model.objects.bulk_create(rows, update_conflicts=True, update_fields=fields)
+
+
+def refresh_skills(skill_ids):
+    """Recompute skill_popularity rows for the given skills"""
+    skill_ids = list(Skill.objects.filter(id__in=set(skill_ids)).values_list('id', flat=True))
+    if not skill_ids:
+        return 0
+    members = _grouped(
+        UserSkill.objects.filter(skill_id__in=skill_ids), 'skill_id',
+        teachers=Count('id', filter=Q(can_teach=True)),
+        learners=Count('id', filter=Q(can_teach=False)),
+    )
+    requests = _grouped(
+        SwapRequest.objects.filter(requested_skill_id__in=skill_ids), 'requested_skill_id',
+        total=Count('id'),
+        pending=Count('id', filter=Q(status='pending')),
+        accepted=Count('id', filter=Q(status='accepted')),
+        completed=Count('id', filter=Q(status='completed')),
+    )
+    ratings = _grouped(
+        Review.objects.filter(swap_request__requested_skill_id__in=skill_ids, swap_request__status='completed'),
+        'swap_request__requested_skill_id', n=Count('id'), avg=Avg('rating'),
+    )
+    rows = []
+    for skill_id in skill_ids:
+        member = members.get(skill_id, {})
+        request = requests.get(skill_id, {})
+        rating = ratings.get(skill_id, {})
+        teachers = member.get('teachers', 0)
+        pending, accepted = request.get('pending', 0), request.get('accepted', 0)
+        rows.append(SkillPopularity(
+            skill_id=skill_id,
+            teacher_count=teachers,
+            learner_count=member.get('learners', 0),
+            request_count=request.get('total', 0),
+            pending_count=pending,
+            accepted_count=accepted,
+            completed_count=request.get('completed', 0),
+            review_count=rating.get('n', 0),
+            avg_rating=rating.get('avg'),
+            demand_gap=pending + accepted - teachers,
+        ))
+    _upsert(SkillPopularity, rows, 'skill', SKILL_FIELDS + ['updated_at'])
+    return len(rows)
+
+
+def refresh_users(user_ids):
+    """Recompute user_summary rows for the given users"""
+    user_ids = list(User.objects.filter(id__in=set(user_ids)).values_list('id', flat=True))
+    if not user_ids:
+        return 0
+    locations = dict(Profile.objects.filter(user_id__in=user_ids).values_list('user_id', 'location'))
+    skills = _grouped(
+        UserSkill.objects.filter(user_id__in=user_ids, can_teach=True), 'user_id', n=Count('id'),
+    )
+    reviews = _grouped(
+        Review.objects.filter(to_user_id__in=user_ids), 'to_user_id', n=Count('id'), avg=Avg('rating'),
+    )
+    rows = [UserSummary(
+        user_id=user_id,
+        location=locations.get(user_id, ''),
+        skills_count=skills.get(user_id, {}).get('n', 0),
+        reviews_received=reviews.get(user_id, {}).get('n', 0),
+        avg_rating=reviews.get(user_id, {}).get('avg'),
+    ) for user_id in user_ids]
+    _upsert(UserSummary, rows, 'user', USER_FIELDS + ['updated_at'])
+    return len(rows)
+
+
+def skills_for_requests(request_ids):
+    return set(SwapRequest.objects.filter(id__in=request_ids).values_list('requested_skill_id', flat=True))
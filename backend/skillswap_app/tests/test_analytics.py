@@ -0,0 +1,101 @@
+"""
+Analytics tests
+Tests the staff-only report endpoints and the rollup rebuild
+"""
+from datetime import datetime
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, Client
+from django.contrib.auth.models import User
+from django.utils import timezone
+from skillswap_app.models import (
+    Profile, Category, Skill, UserSkill, SwapRequest, Review, MonthlySwapStats, LocationSwapStats
+)
+
+
+class AnalyticsTests(TestCase):
+    """Test the demo_queries.sql reports"""
+
+    def setUp(self):
+        self.client = Client()
+        self.staff = User.objects.create_user(username='staff', password='pass123', is_staff=True)
+        category = Category.objects.create(name='Programming')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.python = Skill.objects.create(name='Python', category=category)
+            self.teacher = self._user('teacher', 'Mumbai')
+            self.learner = self._user('learner', 'Pune')
+            UserSkill.objects.create(user=self.teacher, skill=self.python, can_teach=True)
+            UserSkill.objects.create(user=self.learner, skill=self.python, can_teach=False)
+            for month, status in [(1, 'completed'), (1, 'pending'), (2, 'accepted')]:
+                swap = SwapRequest.objects.create(from_user=self.learner, to_user=self.teacher,
+                                                  requested_skill=self.python, status=status)
+                SwapRequest.objects.filter(pk=swap.pk).update(
+                    created_at=timezone.make_aware(datetime(2025, month, 15)))
+            Review.objects.create(from_user=self.learner, to_user=self.teacher, rating=4,
+                                  swap_request=SwapRequest.objects.get(status='completed'))
+        call_command('rebuild_rollups', stdout=StringIO())
+        self.client.force_login(self.staff)
+
+    def _user(self, username, location):
+        user = User.objects.create_user(username=username, password='pass123')
+        Profile.objects.create(user=user, location=location)
+        return user
+
+    def _rows(self, report, **params):
+        response = self.client.get(f'/api/analytics/{report}/', params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()['rows']
+
+    def test_staff_only(self):
+        """Test that anonymous and non-staff users are refused"""
+        self.client.logout()
+        self.assertEqual(self.client.get('/api/analytics/demand/').status_code, 401)
+        self.client.force_login(self.learner)
+        self.assertEqual(self.client.get('/api/analytics/demand/').status_code, 403)
+
+    def test_report_index_and_unknown(self):
+        response = self.client.get('/api/analytics/')
+        self.assertEqual(len(response.json()['reports']), 8)
+        self.assertIsNotNone(response.json()['rollups_as_of'])
+        self.assertEqual(self.client.get('/api/analytics/nope/').status_code, 404)
+
+    def test_teachers_report(self):
+        """Test report 1 with and without a location"""
+        self.assertEqual([r['username'] for r in self._rows('teachers', skill='Python', location='Mumbai')],
+                         ['teacher'])
+        self.assertEqual(self._rows('teachers', skill='Python', location='Pune'), [])
+        self.assertEqual(self.client.get('/api/analytics/teachers/').status_code, 400)
+
+    def test_summary_backed_reports(self):
+        """Test reports 2, 3, 5 and 6 read the summary tables"""
+        self.assertEqual(self._rows('popular-skills')[0]['teacher_count'], 1)
+        self.assertEqual(self._rows('user-rankings')[0], {
+            'username': 'teacher', 'location': 'Mumbai', 'skills_taught': 1, 'avg_rating': 4.0, 'total_reviews': 1,
+        })
+        demand = self._rows('demand')[0]
+        self.assertEqual((demand['times_requested'], demand['demand_status']), (3, 'High Demand'))
+        self.assertEqual(self._rows('matches')[0]['potential_pairs'], 1)
+        self.assertEqual(self._rows('matches', skill_id=self.python.id)[0]['learner'], 'learner')
+
+    def test_rollup_reports(self):
+        """Test reports 4, 7 and 8 read the rebuilt rollups"""
+        trends = self._rows('monthly-trends')
+        self.assertEqual([(r['month'], r['total_requests']) for r in trends], [(2, 1), (1, 2)])
+        self.assertEqual(trends[1]['completed'], 1)
+
+        activity = {r['location']: r for r in self._rows('location-activity')}
+        self.assertEqual(activity['Mumbai']['total_requests'], 3)
+        self.assertEqual(activity['Pune']['completion_rate'], 33.33)
+        self.assertEqual(self._rows('location-activity', **{'from': '2025-02'})[0]['total_requests'], 1)
+        self.assertEqual(self.client.get('/api/analytics/location-activity/', {'from': 'feb'}).status_code, 400)
+
+        category = self._rows('categories')[0]
+        self.assertEqual((category['total_skills'], category['total_teachers'], category['total_requests']),
+                         (1, 1, 3))
+
+    def test_rebuild_replaces_rows(self):
+        """Test that a rebuild in small batches produces the same rollups"""
+        call_command('rebuild_rollups', '--batch-size', '1', stdout=StringIO())
+        self.assertEqual(MonthlySwapStats.objects.count(), 2)
+        self.assertEqual(LocationSwapStats.objects.count(), 4)
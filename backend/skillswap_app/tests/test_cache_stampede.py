@@ -0,0 +1,180 @@
+"""
+Cache stampede tests
+Tests single-flight recomputation, stale-while-revalidate and early expiry
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from unittest import mock, skipUnless
+
+from django.conf import settings
+from django.core.cache import cache as django_cache
+from django.test import SimpleTestCase, TestCase, Client, override_settings
+from skillswap_app import cache
+from skillswap_app.models import Category
+
+
+@override_settings(CACHE_STALE_TIMEOUT=30, CACHE_LOCK_TIMEOUT=5, CACHE_EARLY_EXPIRY_BETA=0)
+class GetOrComputeTests(SimpleTestCase):
+    """Test cache.get_or_compute under concurrency"""
+
+    workers = 16
+
+    def setUp(self):
+        django_cache.clear()
+        self.calls = 0
+        self.calls_lock = threading.Lock()
+
+    def _slow_compute(self, value='fresh'):
+        def compute():
+            with self.calls_lock:
+                self.calls += 1
+            time.sleep(0.2)
+            return value
+        return compute
+
+    def _run_concurrently(self, compute, timeout=60):
+        barrier = threading.Barrier(self.workers)
+        results = []
+
+        def worker():
+            barrier.wait()
+            results.append(cache.get_or_compute('hot-key', compute, timeout))
+
+        threads = [threading.Thread(target=worker) for _ in range(self.workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def test_cold_miss_computes_once(self):
+        """Test that N concurrent readers of a missing key trigger one compute"""
+        results = self._run_concurrently(self._slow_compute())
+        self.assertEqual(self.calls, 1)
+        self.assertEqual({value for value, _ in results}, {'fresh'})
+        self.assertEqual(sum(outcome == cache.MISS for _, outcome in results), 1)
+
+    def test_expiry_recomputes_once_and_serves_stale(self):
+        """Test that an expired entry is recomputed once while others get the stale value"""
+        cache.get_or_compute('hot-key', lambda: 'old', timeout=60)
+        # Push the soft expiry into the past but keep the entry stored
+        entry = django_cache.get('hot-key')
+        entry['expires'] = time.time() - 1
+        django_cache.set('hot-key', entry, 60)
+
+        results = self._run_concurrently(self._slow_compute('new'))
+        self.assertEqual(self.calls, 1)
+        outcomes = [outcome for _, outcome in results]
+        self.assertEqual(outcomes.count(cache.MISS), 1)
+        self.assertEqual(outcomes.count(cache.STALE), self.workers - 1)
+        self.assertEqual({value for value, outcome in results if outcome == cache.STALE}, {'old'})
+        self.assertEqual(cache.get_or_compute('hot-key', lambda: 'unused', 60), ('new', cache.HIT))
+
+    def test_uncacheable_value_is_not_stored(self):
+        """Test that compute() returning None leaves nothing behind"""
+        value, outcome = cache.get_or_compute('hot-key', lambda: None, 60)
+        self.assertEqual((value, outcome), (None, cache.MISS))
+        self.assertIsNone(django_cache.get('hot-key'))
+
+    def test_lease_is_released_after_failure(self):
+        """Test that an exception in compute() does not leave the key locked"""
+        with self.assertRaises(RuntimeError):
+            cache.get_or_compute('hot-key', mock.Mock(side_effect=RuntimeError), 60)
+        self.assertEqual(cache.get_or_compute('hot-key', lambda: 'ok', 60), ('ok', cache.MISS))
+
+    @override_settings(CACHE_EARLY_EXPIRY_BETA=1.0)
+    def test_early_expiry_probability_grows_near_expiry(self):
+        """Test XFetch: refreshes start before expiry, more often as it nears"""
+        now = time.time()
+        far = {'expires': now + 60, 'delta': 0.5}
+        near = {'expires': now + 0.1, 'delta': 0.5}
+        with mock.patch.object(cache.random, 'random', return_value=0.5):
+            self.assertFalse(cache._should_refresh(far, 1.0))
+            self.assertTrue(cache._should_refresh(near, 1.0))
+
+
+@override_settings(RESPONSE_CACHE_ENABLED=True)
+class CatalogCacheTests(TestCase):
+    """Test that catalog endpoints go through the stampede-safe cache"""
+
+    def setUp(self):
+        django_cache.clear()
+        self.client = Client()
+        Category.objects.create(name='Music')
+
+    def test_categories_cached_and_invalidated(self):
+        """Test that categories are cached and refreshed after a catalog change"""
+        self.client.get('/api/categories/')
+        self.client.get('/api/categories/')
+        self.assertEqual(cache.get_stats(['get_categories'])['get_categories']['hits'], 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            Category.objects.create(name='Cooking')
+        response = self.client.get('/api/categories/')
+        self.assertEqual(len(response.json()['categories']), 2)
+
+
+# Runs in each racing process: a separate interpreter with its own
+# connections, so the lease has to hold through the shared backend
+LEASE_RACE_SCRIPT = """
+import os, sys, time
+os.environ['DJANGO_SETTINGS_MODULE'] = 'skillswap_project.settings'
+import skillswap_project.settings as conf
+conf.DATABASES = {'default': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': os.environ['RACE_DB'],
+                              'OPTIONS': {'timeout': 30}}}
+conf.CACHES = {'default': {'BACKEND': os.environ['RACE_BACKEND'], 'LOCATION': os.environ['RACE_LOCATION']}}
+conf.CACHE_EARLY_EXPIRY_BETA = 0
+import django
+django.setup()
+from django.core.management import call_command
+if sys.argv[1] == 'setup':
+    call_command('createcachetable', verbosity=0)
+    sys.exit()
+from skillswap_app import cache
+
+def compute():
+    with open(os.environ['RACE_LOG'], 'a') as log:
+        log.write(f'{os.getpid()}\\n')
+    time.sleep(0.5)
+    return 'fresh'
+
+while time.time() < float(sys.argv[1]):
+    time.sleep(0.001)
+print(cache.get_or_compute('hot-key', compute, 60)[0])
+"""
+
+
+class SharedBackendLeaseTests(SimpleTestCase):
+    """Test the single-flight lease across worker processes on a shared cache backend"""
+
+    processes = 6
+
+    def _race(self, backend, location):
+        """Number of processes that computed a cold key they all read at once"""
+        with tempfile.TemporaryDirectory() as tmp:
+            env = dict(os.environ, RACE_DB=os.path.join(tmp, 'race.sqlite3'), RACE_BACKEND=backend,
+                       RACE_LOCATION=location, RACE_LOG=os.path.join(tmp, 'computes.log'),
+                       DB_ENGINE='django.db.backends.sqlite3')
+            options = dict(cwd=settings.BASE_DIR, env=env, text=True)
+            setup = subprocess.run([sys.executable, '-c', LEASE_RACE_SCRIPT, 'setup'], capture_output=True, **options)
+            self.assertEqual(setup.returncode, 0, setup.stderr)
+            start = str(time.time() + 3)
+            racers = [subprocess.Popen([sys.executable, '-c', LEASE_RACE_SCRIPT, start],
+                                       stdout=subprocess.PIPE, stderr=subprocess.PIPE, **options)
+                      for _ in range(self.processes)]
+            for racer in racers:
+                out, err = racer.communicate(timeout=120)
+                self.assertEqual((racer.returncode, out.strip()), (0, 'fresh'), err)
+            with open(env['RACE_LOG']) as log:
+                return len(log.read().split())
+
+    def test_database_cache_lease_is_won_once(self):
+        """Test that racing processes on DatabaseCache compute a cold key once"""
+        self.assertEqual(self._race('django.core.cache.backends.db.DatabaseCache', 'skillswap_cache'), 1)
+
+    @skipUnless(os.environ.get('REDIS_URL'), 'REDIS_URL not set')
+    def test_redis_lease_is_won_once(self):
+        self.assertEqual(self._race('django.core.cache.backends.redis.RedisCache', os.environ['REDIS_URL']), 1)
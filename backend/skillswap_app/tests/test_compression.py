@@ -0,0 +1,106 @@
+"""
+Response compression tests
+Tests encoding negotiation, size thresholds, streaming and pre-compressed variants
+"""
+import gzip
+import unittest
+
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import SimpleTestCase, RequestFactory, override_settings
+from skillswap_app import middleware
+from skillswap_app.middleware import CompressionMiddleware
+from skillswap_app.responses import FastJsonResponse
+
+
+@override_settings(COMPRESSION_ENABLED=True, COMPRESSION_MIN_SIZE=200,
+                   COMPRESSION_ENCODINGS=['br', 'gzip'], COMPRESSION_STREAMING=True)
+class CompressionMiddlewareTests(SimpleTestCase):
+    """Test CompressionMiddleware behaviour"""
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.payload = {'skills': [{'id': i, 'name': f'Skill {i}', 'teachers': []} for i in range(100)]}
+
+    def _process(self, response, accept='gzip'):
+        request = self.factory.get('/api/skills/', HTTP_ACCEPT_ENCODING=accept)
+        return CompressionMiddleware(lambda req: response)(request)
+
+    def test_large_json_is_gzipped(self):
+        """Test that bodies above the threshold are compressed"""
+        original = FastJsonResponse(self.payload)
+        body = original.content
+        response = self._process(original)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), body)
+        self.assertEqual(response['Content-Length'], str(len(response.content)))
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+    def test_small_body_is_not_compressed(self):
+        """Test that bodies under the threshold go out as-is"""
+        response = self._process(FastJsonResponse({'status': 'healthy'}))
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_client_without_gzip(self):
+        """Test that clients which do not accept an encoding get plain bodies"""
+        response = self._process(FastJsonResponse(self.payload), accept='identity')
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_zero_quality_is_refused(self):
+        """Test that q=0 disables an encoding"""
+        response = self._process(FastJsonResponse(self.payload), accept='gzip;q=0')
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_non_text_content_type_is_skipped(self):
+        """Test that already-compressed media types are left alone"""
+        response = self._process(HttpResponse(b'\x89PNG' * 500, content_type='image/png'))
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_strong_etag_is_weakened(self):
+        """Test that a compressed representation carries a weak ETag"""
+        original = FastJsonResponse(self.payload)
+        original['ETag'] = '"abc"'
+        response = self._process(original)
+        self.assertEqual(response['ETag'], 'W/"abc"')
+
+    def test_streaming_response(self):
+        """Test that streaming responses are compressed chunk by chunk"""
+        chunks = [b'data: {"event": %d}\n\n' % i for i in range(50)]
+        original = StreamingHttpResponse(iter(chunks), content_type='text/event-stream')
+        response = self._process(original)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(b''.join(response.streaming_content)), b''.join(chunks))
+
+    @override_settings(COMPRESSION_STREAMING=False)
+    def test_streaming_can_be_disabled(self):
+        """Test that streaming mode can be switched off"""
+        original = StreamingHttpResponse(iter([b'x' * 1000]), content_type='text/plain')
+        response = self._process(original)
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_precompressed_variant_is_reused(self):
+        """Test that a variant stored alongside a cached body is served as-is"""
+        original = FastJsonResponse(self.payload)
+        # Level 1 output differs from the configured level, so reuse is observable
+        cached = gzip.compress(original.content, compresslevel=1)
+        original.compressed_variants = {'gzip': cached}
+        response = self._process(original)
+        self.assertEqual(response.content, cached)
+
+    def test_new_variant_is_written_back(self):
+        """Test that freshly compressed bytes are stored in the variants dict"""
+        original = FastJsonResponse(self.payload)
+        original.compressed_variants = {}
+        response = self._process(original)
+        self.assertEqual(original.compressed_variants['gzip'], response.content)
+
+    @unittest.skipIf(middleware.brotli is None, 'brotli is not installed')
+    def test_brotli_preferred_when_available(self):
+        """Test that brotli wins when both sides support it"""
+        response = self._process(FastJsonResponse(self.payload), accept='gzip, br')
+        self.assertEqual(response['Content-Encoding'], 'br')
+
+    @override_settings(COMPRESSION_ENABLED=False)
+    def test_disabled(self):
+        """Test that the middleware can be switched off"""
+        response = self._process(FastJsonResponse(self.payload))
+        self.assertFalse(response.has_header('Content-Encoding'))
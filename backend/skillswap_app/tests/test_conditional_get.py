@@ -0,0 +1,100 @@
+"""
+Conditional GET tests
+Tests ETag / If-None-Match handling on the catalog and browse endpoints
+"""
+from django.test import TestCase, Client
+from django.contrib.auth.models import User
+from skillswap_app.models import Profile, Category, Skill, UserSkill, Review, SwapRequest
+from skillswap_app import versions
+
+
+class ConditionalGetTests(TestCase):
+    """Test ETags derived from data version counters"""
+
+    def setUp(self):
+        self.client = Client()
+        self.category = Category.objects.create(name='Music')
+        self.skill = Skill.objects.create(name='Guitar', category=self.category)
+        self.teacher = User.objects.create_user(username='teacher', password='pass123')
+        self.profile = Profile.objects.create(user=self.teacher, location='Pune')
+        UserSkill.objects.create(user=self.teacher, skill=self.skill, can_teach=True)
+
+    def _etag(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response['ETag']
+
+    def test_etag_is_strong(self):
+        """Test that catalog and browse responses carry strong ETags"""
+        for url in ('/api/categories/', '/api/skills/', '/api/skills/browse/'):
+            etag = self._etag(url)
+            self.assertTrue(etag.startswith('"'), etag)
+
+    def test_matching_etag_returns_304_without_main_query(self):
+        """Test that If-None-Match short-circuits before the heavy query"""
+        etag = self._etag('/api/skills/browse/')
+        # Only the version lookup runs
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/skills/browse/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+    def test_weak_etag_from_compressed_response_still_matches(self):
+        """Test that the W/ form sent back after gzip still yields a 304"""
+        etag = self._etag('/api/categories/')
+        response = self.client.get('/api/categories/', HTTP_IF_NONE_MATCH='W/' + etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_query_string_changes_etag(self):
+        """Test that different filters get different ETags"""
+        self.assertNotEqual(
+            self._etag('/api/skills/browse/?location=Pune'),
+            self._etag('/api/skills/browse/?location=Delhi'),
+        )
+
+    def test_query_parameter_order_does_not_matter(self):
+        """Test that the query string is normalized"""
+        self.assertEqual(
+            self._etag('/api/skills/browse/?location=Pune&search=gui'),
+            self._etag('/api/skills/browse/?search=gui&location=Pune'),
+        )
+
+    def test_skill_change_invalidates_catalog(self):
+        """Test that a new skill changes skills and browse ETags"""
+        skills_etag = self._etag('/api/skills/')
+        browse_etag = self._etag('/api/skills/browse/')
+        with self.captureOnCommitCallbacks(execute=True):
+            Skill.objects.create(name='Piano', category=self.category)
+        self.assertNotEqual(self._etag('/api/skills/'), skills_etag)
+        self.assertNotEqual(self._etag('/api/skills/browse/'), browse_etag)
+
+    def test_teacher_change_invalidates_browse_only(self):
+        """Test that teacher data changes browse but not the catalog"""
+        categories_etag = self._etag('/api/categories/')
+        browse_etag = self._etag('/api/skills/browse/')
+        self.profile.location = 'Mumbai'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.profile.save()
+        self.assertEqual(self._etag('/api/categories/'), categories_etag)
+        self.assertNotEqual(self._etag('/api/skills/browse/'), browse_etag)
+
+    def test_review_invalidates_browse(self):
+        """Test that a new rating changes browse ETags"""
+        learner = User.objects.create_user(username='learner', password='pass123')
+        swap = SwapRequest.objects.create(from_user=learner, to_user=self.teacher,
+                                          requested_skill=self.skill, status='completed')
+        browse_etag = self._etag('/api/skills/browse/')
+        with self.captureOnCommitCallbacks(execute=True):
+            Review.objects.create(from_user=learner, to_user=self.teacher, swap_request=swap, rating=5)
+        self.assertNotEqual(self._etag('/api/skills/browse/'), browse_etag)
+
+    def test_version_bumped_after_commit(self):
+        """Test that a write bumps its version group only once its transaction commits"""
+        before = versions.get_versions(versions.TEACHERS)
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.profile.location = 'Mumbai'
+            self.profile.save()
+            self.assertEqual(versions.get_versions(versions.TEACHERS), before)
+        for callback in callbacks:
+            callback()
+        self.assertGreater(versions.get_versions(versions.TEACHERS), before)
@@ -0,0 +1,124 @@
+"""
+Geo-proximity tests
+Tests geohash encoding, cell coverage and the browse radius filter
+"""
+import json
+import random
+
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth.models import User
+from skillswap_app import geo
+from skillswap_app.models import Profile, Category, Skill, UserSkill
+
+
+class GeohashTests(SimpleTestCase):
+    """Test the pure-Python geohash helpers"""
+
+    def test_encode_matches_reference_geohash(self):
+        """Test against well-known geohash strings"""
+        self.assertEqual(geo.to_string(geo.encode(57.64911, 10.40744)), 'u4pruydqq')
+        self.assertEqual(geo.to_string(geo.encode(-25.382708, -49.265506, 6), 6), '6gkzwg')
+
+    def test_prefix_is_contained_in_its_range(self):
+        """Test that a point's full code falls inside every coarser cell range"""
+        code = geo.encode(19.076, 72.8777)
+        for precision in range(1, geo.MAX_PRECISION + 1):
+            low, high = geo.cell_range(geo.encode(19.076, 72.8777, precision), precision)
+            self.assertTrue(low <= code < high)
+
+    def test_covering_ranges_contain_every_point_in_radius(self):
+        """Test that no point within the radius falls outside the covering cells"""
+        rng = random.Random(7)
+        for lat, lon, radius in [(19.07, 72.87, 10), (51.5, -0.12, 2), (0.0, 179.99, 25),
+                                 (-33.86, 151.2, 150), (78.2, 15.6, 40)]:
+            ranges = geo.covering_ranges(lat, lon, radius)
+            for _ in range(500):
+                p_lat = lat + rng.uniform(-1, 1) * radius / geo.KM_PER_DEGREE
+                p_lon = lon + rng.uniform(-3, 3) * radius / geo.KM_PER_DEGREE
+                p_lon = (p_lon + 180) % 360 - 180
+                if geo.haversine_km(lat, lon, p_lat, p_lon) > radius:
+                    continue
+                code = geo.encode(p_lat, p_lon)
+                self.assertTrue(any(low <= code < high for low, high in ranges), (lat, lon, p_lat, p_lon))
+
+    def test_small_radius_uses_few_narrow_ranges(self):
+        """Test that a 10 km search only touches cells around the point"""
+        ranges = geo.covering_ranges(19.07, 72.87, 10)
+        self.assertLessEqual(len(ranges), 9)
+        covered = sum(high - low for low, high in ranges)
+        self.assertLess(covered, (1 << geo.BITS) // 100000)
+
+
+class BrowseRadiusTests(TestCase):
+    """Test the browse_skills lat/lon/radius_km filter"""
+
+    def setUp(self):
+        self.client = Client()
+        category = Category.objects.create(name='Music')
+        self.skill = Skill.objects.create(name='Guitar', category=category)
+
+    def _teacher(self, username, lat, lon):
+        user = User.objects.create_user(username=username, password='pass123')
+        Profile.objects.create(user=user, location='Mumbai', latitude=lat, longitude=lon)
+        UserSkill.objects.create(user=user, skill=self.skill, can_teach=True)
+        return user
+
+    def _browse(self, **params):
+        return self.client.get('/api/skills/browse/', params)
+
+    def test_profile_save_sets_geohash(self):
+        """Test that coordinates are indexed and clearing them clears the hash"""
+        user = self._teacher('a', 19.07, 72.87)
+        profile = Profile.objects.get(user=user)
+        self.assertEqual(profile.geohash, geo.encode(19.07, 72.87))
+        profile.latitude = None
+        profile.save()
+        self.assertIsNone(Profile.objects.get(user=user).geohash)
+
+    def test_radius_filter_and_distances(self):
+        """Test that nearby teachers match, with distance, and far ones do not"""
+        self._teacher('colaba', 18.91, 72.81)       # ~18 km from the search point
+        self._teacher('thane', 19.22, 72.98)        # ~20 km
+        self._teacher('pune', 18.52, 73.86)         # ~120 km
+        self._teacher('nowhere', None, None)
+
+        response = self._browse(lat=19.07, lon=72.87, radius_km=25)
+        self.assertEqual(response.status_code, 200)
+        teachers = {t['username']: t['distance_km'] for s in response.json()['skills'] for t in s['teachers']}
+        self.assertEqual(sorted(teachers), ['colaba', 'thane'])
+        self.assertAlmostEqual(teachers['colaba'], 18.9, delta=1)
+
+        response = self._browse(lat=19.07, lon=72.87, radius_km=5)
+        self.assertEqual(response.json()['skills'], [])
+
+    def test_radius_candidates_stay_in_sql(self):
+        """Test that the candidate cells are a subquery of the browse query, not an id list"""
+        for i in range(5):
+            self._teacher(f't{i}', 19.07 + i * 0.001, 72.87)
+        with CaptureQueriesContext(connection) as context:
+            response = self._browse(lat=19.07, lon=72.87, radius_km=25)
+        self.assertEqual(len(response.json()['skills'][0]['teachers']), 5)
+        [browse_sql] = [q['sql'] for q in context.captured_queries if 'user_skills' in q['sql']]
+        self.assertIn('geohash', browse_sql)
+
+    def test_invalid_parameters(self):
+        """Test that bad coordinates or radius are rejected"""
+        self.assertEqual(self._browse(lat='abc', lon=72.8).status_code, 400)
+        self.assertEqual(self._browse(lat=19.0).status_code, 400)
+        self.assertEqual(self._browse(lat=19.0, lon=72.8, radius_km=0).status_code, 400)
+        self.assertEqual(self._browse(lat=95, lon=72.8).status_code, 400)
+
+    def test_update_profile_coordinates(self):
+        """Test that coordinates can be set and validated through the API"""
+        user = User.objects.create_user(username='me', password='pass123')
+        Profile.objects.create(user=user)
+        self.client.force_login(user)
+        response = self.client.post('/api/profile/update/', json.dumps({'latitude': 19.07, 'longitude': 72.87}),
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Profile.objects.get(user=user).geohash, geo.encode(19.07, 72.87))
+        response = self.client.post('/api/profile/update/', json.dumps({'latitude': 120}),
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 400)
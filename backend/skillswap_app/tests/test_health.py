@@ -0,0 +1,81 @@
+"""
+Health probe tests
+Tests the liveness short-circuit and the cached, time-limited readiness checks
+"""
+import threading
+from unittest import mock
+
+from django.test import TestCase, Client, override_settings
+from skillswap_app import health
+
+
+class HealthProbeTests(TestCase):
+    """Test the liveness and readiness endpoints"""
+
+    def setUp(self):
+        self.client = Client()
+        health.readiness.reset()
+        self.addCleanup(health.readiness.reset)
+
+    def test_liveness_skips_middleware(self):
+        """Test that liveness runs no queries, sets no cookies and ignores ALLOWED_HOSTS"""
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/health/live/', HTTP_HOST='10.0.0.7')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'status': 'alive'})
+        self.assertFalse(response.cookies)
+        self.assertNotIn('Vary', response)
+        self.assertEqual(self.client.head('/api/health/live/').status_code, 200)
+        self.assertEqual(self.client.post('/api/health/live/').status_code, 405)
+
+    def test_ready(self):
+        response = self.client.get('/api/health/ready/')
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['status'], 'ready')
+        self.assertEqual(set(data['checks']), {'database', 'migrations', 'cache'})
+        self.assertTrue(all(check['ok'] for check in data['checks'].values()))
+
+    def test_failing_check(self):
+        def broken():
+            raise RuntimeError('connection refused')
+
+        with mock.patch.dict(health.CHECKS, {'database': broken}):
+            response = self.client.get('/api/health/ready/')
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json()['checks']['database'], {
+            'ok': False, 'error': 'connection refused', 'ms': response.json()['checks']['database']['ms'],
+        })
+
+    def test_result_is_cached(self):
+        """Test that probes within HEALTH_CHECK_CACHE_SECONDS reuse the last run"""
+        check = mock.Mock()
+        with mock.patch.dict(health.CHECKS, {'database': check}, clear=True):
+            self.client.get('/api/health/ready/')
+            self.client.get('/api/health/ready/')
+            self.assertEqual(check.call_count, 1)
+            with override_settings(HEALTH_CHECK_CACHE_SECONDS=0):
+                self.client.get('/api/health/ready/')
+            self.assertEqual(check.call_count, 2)
+
+    @override_settings(HEALTH_CHECK_TIMEOUT=0.05)
+    def test_timeout_does_not_pile_up(self):
+        """Test that a hung check fails the probe and later probes wait on the same run"""
+        release = threading.Event()
+        calls = []
+
+        def hung():
+            calls.append(1)
+            release.wait(5)
+
+        with mock.patch.dict(health.CHECKS, {'database': hung}, clear=True):
+            first = self.client.get('/api/health/ready/')
+            second = self.client.get('/api/health/ready/')
+            running = health.readiness.running
+            release.set()
+            running.wait(5)
+            third = self.client.get('/api/health/ready/')
+        self.assertEqual((first.status_code, second.status_code), (503, 503))
+        self.assertIn('did not finish', first.json()['error'])
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(third.status_code, 200)
@@ -0,0 +1,73 @@
+"""
+Instrumentation middleware tests
+Tests the Server-Timing header, sampled request logs and the disabled path
+"""
+import json
+
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from django.test import TestCase, Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth.models import User
+from skillswap_app.middleware import InstrumentationMiddleware
+from skillswap_app.models import Profile, Category, Skill
+
+
+@override_settings(INSTRUMENTATION_ENABLED=True, INSTRUMENTATION_SERVER_TIMING=True,
+                   INSTRUMENTATION_LOG_SAMPLE_RATE=0, INSTRUMENTATION_LOG_SLOW_MS=0)
+class InstrumentationTests(TestCase):
+    """Test InstrumentationMiddleware behaviour"""
+
+    def setUp(self):
+        self.client = Client()
+        category = Category.objects.create(name='Music')
+        Skill.objects.create(name='Guitar', category=category)
+        self.user = User.objects.create_user(username='user', password='pass123')
+        Profile.objects.create(user=self.user)
+
+    def _timings(self, response):
+        timings = {}
+        for part in response['Server-Timing'].split(', '):
+            name, *params = part.split(';')
+            timings[name] = dict(param.split('=', 1) for param in params)
+        return timings
+
+    def test_server_timing_header(self):
+        """Test that the header carries total/db/serialize/view and the query count"""
+        self.client.force_login(self.user)
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get('/api/profile/')
+        timings = self._timings(response)
+        self.assertEqual(set(timings), {'total', 'db', 'serialize', 'view'})
+        # Session saving runs in an outer middleware, after this one
+        queries = int(timings['db']['desc'].strip('"').split()[0])
+        self.assertTrue(0 < queries <= len(captured.captured_queries))
+        self.assertGreater(float(timings['total']['dur']), 0)
+        self.assertGreaterEqual(float(timings['total']['dur']), float(timings['db']['dur']))
+
+    def test_sampled_log_line(self):
+        """Test the structured log line when a request is sampled"""
+        with override_settings(INSTRUMENTATION_LOG_SAMPLE_RATE=1.0), \
+                self.assertLogs('skillswap_app.requests', 'INFO') as logs:
+            Client().get('/api/skills/')
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual((record['view'], record['status'], record['slow']), ('get_skills', 200, False))
+        self.assertGreater(record['queries'], 0)
+        self.assertGreater(record['bytes'], 0)
+
+        with self.assertNoLogs('skillswap_app.requests', 'INFO'):
+            Client().get('/api/skills/')
+
+    def test_slow_requests_always_logged(self):
+        with override_settings(INSTRUMENTATION_LOG_SLOW_MS=0.000001), \
+                self.assertLogs('skillswap_app.requests', 'INFO') as logs:
+            Client().get('/api/health/')
+        self.assertTrue(json.loads(logs.records[0].getMessage())['slow'])
+
+    def test_disabled_removes_middleware(self):
+        """Test that the disabled middleware opts out and adds no header"""
+        with override_settings(INSTRUMENTATION_ENABLED=False):
+            with self.assertRaises(MiddlewareNotUsed):
+                InstrumentationMiddleware(lambda request: None)
+            response = Client().get('/api/health/')
+        self.assertNotIn('Server-Timing', response)
@@ -0,0 +1,108 @@
+"""
+Job queue tests
+Tests enqueueing in the write's transaction, batching, retries, leases and the worker command
+"""
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import transaction
+from django.test import TestCase, override_settings
+from django.contrib.auth.models import User
+from django.utils import timezone
+from skillswap_app import jobs
+from skillswap_app.models import Category, Skill, UserSkill, Job, SkillPopularity
+
+
+@override_settings(JOBS_EAGER=False, JOBS_MAX_ATTEMPTS=2, JOBS_RETRY_DELAY=30)
+class JobQueueTests(TestCase):
+    """Test the database-backed job queue"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='teacher', password='pass123')
+        self.skill = Skill.objects.create(name='Guitar', category=Category.objects.create(name='Music'))
+        Job.objects.all().delete()
+        self.calls = []
+        patcher = mock.patch.dict(jobs.HANDLERS, {'record': self.calls.append})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_write_queues_refresh_instead_of_running_it(self):
+        """Test that a write only inserts a job and the worker refreshes the summary"""
+        UserSkill.objects.create(user=self.user, skill=self.skill, can_teach=True)
+        self.assertFalse(SkillPopularity.objects.filter(skill=self.skill, teacher_count=1).exists())
+        job = Job.objects.get(name='refresh_summaries', payload__skill_ids=[self.skill.id])
+        self.assertEqual(job.payload['user_ids'], [self.user.id])
+
+        jobs.run_batch()
+        self.assertEqual(SkillPopularity.objects.get(skill=self.skill).teacher_count, 1)
+        self.assertFalse(Job.objects.exists())
+
+    def test_rolled_back_write_queues_nothing(self):
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            jobs.enqueue('record', n=1)
+            raise RuntimeError
+        self.assertFalse(Job.objects.exists())
+
+    def test_similar_jobs_are_batched(self):
+        """Test that every due job of one name goes to a single handler call"""
+        for n in range(3):
+            jobs.enqueue('record', n=n)
+        results = jobs.run_batch()
+        self.assertEqual(results, {'record': (3, None)})
+        self.assertEqual(self.calls, [[{'n': 0}, {'n': 1}, {'n': 2}]])
+
+    def test_retries_with_backoff_then_fails(self):
+        def broken(payloads):
+            raise ValueError('boom')
+
+        jobs.HANDLERS['record'] = broken
+        job = jobs.enqueue('record', n=1)
+        jobs.run_batch()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts, job.last_error), ('queued', 1, 'ValueError: boom'))
+        self.assertGreater(job.run_after, timezone.now() + timedelta(seconds=25))
+        self.assertEqual(jobs.run_batch(), {})
+
+        Job.objects.update(run_after=timezone.now())
+        jobs.run_batch()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ('failed', 2))
+        self.assertEqual(jobs.run_batch(), {})
+
+        self.assertEqual(jobs.retry_failed(), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ('queued', 0))
+
+    def test_expired_lease_is_redelivered(self):
+        """Test at-least-once delivery when a worker dies holding a job"""
+        job = jobs.enqueue('record', n=1)
+        self.assertEqual([claimed.id for claimed in jobs.claim(10)], [job.id])
+        self.assertEqual(jobs.claim(10), [])
+
+        Job.objects.update(locked_until=timezone.now() - timedelta(seconds=1))
+        self.assertEqual([claimed.id for claimed in jobs.claim(10)], [job.id])
+
+    def test_failure_after_lease_expiry_leaves_new_claim_alone(self):
+        """Test that a slow worker's failure does not undo another worker's re-claim"""
+        jobs.enqueue('record', n=1)
+        [stale] = jobs.claim(10)
+        Job.objects.update(locked_until=timezone.now() - timedelta(seconds=1))
+        [current] = jobs.claim(10)
+
+        jobs._finish([stale], 'ValueError: too late')
+        job = Job.objects.get()
+        self.assertEqual((job.status, job.locked_by, job.attempts), ('running', current.locked_by, 0))
+
+    def test_unknown_job_name(self):
+        with self.assertRaises(KeyError):
+            jobs.enqueue('nope')
+
+    def test_worker_command(self):
+        jobs.enqueue('record', n=1)
+        out = StringIO()
+        call_command('run_jobs', '--once', stdout=out)
+        self.assertIn('record: 1 job(s)', out.getvalue())
+        self.assertIn('1 done, 0 failed', out.getvalue())
+        self.assertEqual(self.calls, [[{'n': 1}]])
@@ -0,0 +1,60 @@
+"""
+Load data generator tests
+Tests that generate_load_data writes consistent, reproducible rows
+"""
+from io import StringIO
+
+from django.core.management import call_command
+from django.db.models import Count, F
+from django.test import TestCase
+from django.contrib.auth.models import User
+from skillswap_app.models import Profile, UserSkill, SwapRequest, Review, SkillPopularity
+
+
+class GenerateLoadDataTests(TestCase):
+    """Test the synthetic dataset generator"""
+
+    def _generate(self, *args):
+        out = StringIO()
+        call_command('generate_load_data', '--users', '300', '--skills', '20', '--batch-size', '64',
+                     *args, stdout=out)
+        return out.getvalue()
+
+    def test_generates_consistent_rows(self):
+        output = self._generate()
+        self.assertIn('rows/s', output)
+        self.assertEqual(User.objects.count(), 300)
+        self.assertEqual(Profile.objects.exclude(geohash=None).exclude(canonical_location=None).count(), 300)
+        self.assertGreaterEqual(UserSkill.objects.count(), 300)
+        self.assertEqual(SwapRequest.objects.count(), 600)
+        self.assertFalse(SwapRequest.objects.filter(from_user=F('to_user')).exists())
+        # Reviews only for completed requests, backdated rather than "now"
+        self.assertFalse(Review.objects.exclude(swap_request__status='completed').exists())
+        self.assertLess(SwapRequest.objects.order_by('created_at').first().created_at,
+                        User.objects.order_by('-date_joined').first().date_joined)
+        self.assertTrue(User.objects.first().check_password('loadtest'))
+        self.assertEqual(SkillPopularity.objects.count(), 20)
+
+    def test_single_user_makes_no_requests(self):
+        """Test that the generator finishes when nobody has a teacher to ask"""
+        out = StringIO()
+        call_command('generate_load_data', '--users', '1', '--skills', '3', stdout=out)
+        self.assertEqual(User.objects.count(), 1)
+        self.assertFalse(SwapRequest.objects.exists())
+        self.assertIn('skipping swap requests', out.getvalue())
+
+    def test_skill_popularity_is_skewed(self):
+        """Test the Zipfian skill distribution: the top skill dwarfs the median"""
+        self._generate('--no-summaries')
+        counts = sorted((row['n'] for row in UserSkill.objects.values('skill').annotate(n=Count('id'))),
+                        reverse=True)
+        self.assertGreater(counts[0], 4 * counts[len(counts) // 2])
+
+    def test_same_seed_same_data(self):
+        """Test that a seed reproduces the same rows"""
+        fields = ('from_user_id', 'to_user_id', 'requested_skill_id', 'status')
+        self._generate('--no-summaries', '--seed', '7')
+        first = list(SwapRequest.objects.order_by('id').values_list(*fields))
+        User.objects.all().delete()
+        self._generate('--no-summaries', '--seed', '7', '--prefix', 'again')
+        self.assertEqual(list(SwapRequest.objects.order_by('id').values_list(*fields)), first)
@@ -0,0 +1,132 @@
+"""
+Location normalization tests
+Tests the alias map, profile linking, browse location filtering and the backfill command
+"""
+import importlib
+from io import StringIO
+
+from django.apps import apps
+from django.core.management import call_command
+from django.test import TestCase, Client
+from django.contrib.auth.models import User
+from skillswap_app.models import (
+    Profile, Category, Skill, UserSkill, Location, LocationAlias, normalize_location
+)
+
+
+class LocationTests(TestCase):
+    """Test canonical locations and alias resolution"""
+
+    def setUp(self):
+        self.client = Client()
+        self.category = Category.objects.create(name='Music')
+        self.skill = Skill.objects.create(name='Guitar', category=self.category)
+
+    def _teacher(self, username, location):
+        user = User.objects.create_user(username=username, password='pass123')
+        Profile.objects.create(user=user, location=location)
+        UserSkill.objects.create(user=user, skill=self.skill, can_teach=True)
+        return user
+
+    def _browse_usernames(self, location):
+        response = self.client.get('/api/skills/browse/', {'location': location})
+        self.assertEqual(response.status_code, 200)
+        return sorted(t['username'] for s in response.json()['skills'] for t in s['teachers'])
+
+    def test_normalize_location(self):
+        """Test that case, accents, punctuation and spacing are folded"""
+        self.assertEqual(normalize_location('  São   Paulo. '), 'sao paulo')
+        self.assertEqual(normalize_location('NEW-DELHI'), 'new delhi')
+        self.assertEqual(normalize_location(''), '')
+
+    def test_profile_save_links_canonical_location(self):
+        """Test that spellings of the same place share one Location"""
+        first = self._teacher('a', 'Mumbai')
+        second = self._teacher('b', ' mumbai ')
+        self.assertIsNotNone(first.profile.canonical_location_id)
+        self.assertEqual(first.profile.canonical_location_id, second.profile.canonical_location_id)
+        self.assertEqual(Location.objects.count(), 1)
+
+    def test_profile_location_change_relinks(self):
+        """Test that editing the text moves the canonical link"""
+        user = self._teacher('a', 'Mumbai')
+        profile = Profile.objects.get(user=user)
+        profile.location = 'Pune'
+        profile.save()
+        self.assertEqual(profile.canonical_location.name, 'Pune')
+
+    def test_empty_location_has_no_canonical(self):
+        """Test that blank locations are not linked"""
+        user = self._teacher('a', '')
+        self.assertIsNone(user.profile.canonical_location_id)
+
+    def test_browse_filters_by_canonical_id(self):
+        """Test that browse resolves free text through the alias map"""
+        self._teacher('mumbai_teacher', 'Mumbai')
+        self._teacher('navi_teacher', 'Navi Mumbai')
+        self.assertEqual(self._browse_usernames('MUMBAI'), ['mumbai_teacher'])
+
+    def test_browse_alias_maps_other_spelling(self):
+        """Test that an alias added for a misspelling matches the canonical place"""
+        self._teacher('blr_teacher', 'Bangalore')
+        LocationAlias.objects.create(alias='bengaluru', location=Location.objects.get(name='Bangalore'))
+        self.assertEqual(self._browse_usernames('Bengaluru'), ['blr_teacher'])
+
+    def test_browse_unknown_text_falls_back_to_contains(self):
+        """Test that partial input still matches by text"""
+        self._teacher('mumbai_teacher', 'Mumbai')
+        self.assertEqual(self._browse_usernames('umba'), ['mumbai_teacher'])
+
+    def test_backfill_clusters_existing_strings(self):
+        """Test that the backfill merges spellings and links every profile"""
+        for username, location in [('a', 'Bangalore'), ('b', 'bangalore '), ('c', 'Banglore'),
+                                   ('d', 'Bangalore'), ('e', 'Delhi'), ('f', 'New Delhi')]:
+            self._teacher(username, location)
+        # Simulate rows written before locations existed
+        Profile.objects.update(canonical_location=None)
+        Location.objects.all().delete()
+
+        call_command('backfill_locations', stdout=StringIO())
+
+        self.assertEqual(sorted(Location.objects.values_list('name', flat=True)),
+                         ['Bangalore', 'Delhi', 'New Delhi'])
+        self.assertFalse(Profile.objects.filter(canonical_location=None).exists())
+        bangalore = Location.objects.get(name='Bangalore')
+        self.assertEqual(Profile.objects.filter(canonical_location=bangalore).count(), 4)
+        self.assertEqual(Location.objects.resolve('banglore'), bangalore.id)
+
+    def test_migration_links_existing_profiles(self):
+        """Test that profiles saved before locations existed still match a location filter"""
+        self._teacher('a', 'Mumbai')
+        self._teacher('b', 'mumbai')
+        Profile.objects.update(canonical_location=None)
+        Location.objects.all().delete()
+        migration = importlib.import_module('skillswap_app.migrations.0012_link_canonical_locations')
+        migration.link_canonical_locations(apps, None)
+
+        self.assertFalse(Profile.objects.filter(canonical_location=None).exists())
+        self._teacher('c', 'Mumbai')
+        self.assertEqual(self._browse_usernames('Mumbai'), ['a', 'b', 'c'])
+
+    def test_backfill_repoints_existing_aliases(self):
+        """Test that merging spellings that already had locations moves their aliases too"""
+        for username, location in [('a', 'Bangalore'), ('b', 'Bangalore'), ('c', 'Banglore')]:
+            self._teacher(username, location)
+        self.assertEqual(Location.objects.count(), 2)
+
+        call_command('backfill_locations', stdout=StringIO())
+
+        bangalore = Location.objects.get(name='Bangalore')
+        self.assertEqual(list(Location.objects.all()), [bangalore])
+        self.assertEqual(Location.objects.resolve('Banglore'), bangalore.id)
+        self.assertEqual(self._browse_usernames('Banglore'), ['a', 'b', 'c'])
+
+    def test_backfill_dry_run_writes_nothing(self):
+        """Test that --dry-run only reports"""
+        self._teacher('a', 'Pune')
+        Profile.objects.update(canonical_location=None)
+        Location.objects.all().delete()
+        out = StringIO()
+        call_command('backfill_locations', '--dry-run', stdout=out)
+        self.assertIn('Pune', out.getvalue())
+        self.assertFalse(Location.objects.exists())
@@ -0,0 +1,114 @@
+"""
+Metrics tests
+Tests the metrics middleware, multi-process aggregation and the /metrics endpoint
+"""
+import json
+import os
+import tempfile
+
+from django.test import TestCase, Client, override_settings
+from django.contrib.auth.models import User
+from skillswap_app import cache, metrics, outbox
+from skillswap_app.middleware import _TrackedStream
+from skillswap_app.models import Profile, Category, Skill, Job
+
+DEAD_PID = 2 ** 22 + 1  # above the default pid_max, so never a live process
+
+
+class MetricsTests(TestCase):
+    """Test the metrics registry and endpoint"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        settings = override_settings(METRICS_ENABLED=True, METRICS_DIR=self.directory.name,
+                                     METRICS_FLUSH_INTERVAL=0, METRICS_TOKEN='secret')
+        settings.enable()
+        self.addCleanup(settings.disable)
+        metrics._values.clear()
+        self.client = Client()
+        Skill.objects.create(name='Guitar', category=Category.objects.create(name='Music'))
+
+    def _scrape(self):
+        response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer secret')
+        self.assertEqual(response.status_code, 200)
+        return response.content.decode()
+
+    def test_request_metrics(self):
+        """Test per-view counts, latency and query histograms"""
+        self.client.get('/api/skills/')
+        self.client.get('/api/skills/')
+        self.client.get('/api/nope/')
+        body = self._scrape()
+        self.assertIn('skillswap_http_requests_total{view="get_skills",method="GET",status="200"} 2', body)
+        self.assertIn('skillswap_http_requests_total{view="unmatched",method="GET",status="404"} 1', body)
+        self.assertIn('skillswap_http_request_duration_seconds_bucket{view="get_skills",le="+Inf"} 2', body)
+        self.assertIn('skillswap_http_request_duration_seconds_count{view="get_skills"} 2', body)
+        self.assertIn('# TYPE skillswap_db_queries_per_request histogram', body)
+        self.assertIn('skillswap_db_queries_per_request_count{view="get_skills"} 2', body)
+
+    def test_session_writes_and_cache_ratio(self):
+        user = User.objects.create_user(username='user', password='pass123')
+        Profile.objects.create(user=user)
+        self.client.post('/api/auth/login/', json.dumps({'username': 'user', 'password': 'pass123'}),
+                         content_type='application/json')
+        cache.record('browse_skills', cache.HIT)
+        cache.record('browse_skills', cache.MISS)
+        body = self._scrape()
+        self.assertIn('skillswap_session_writes_total 1', body)
+        self.assertIn('skillswap_response_cache_hit_ratio{cache="browse_skills"} 0.5', body)
+
+    def test_aggregates_process_files(self):
+        """Test that counters of exited workers are kept and their gauges dropped"""
+        metrics.REQUESTS.inc(view='get_skills', method='GET', status=200)
+        metrics.IN_FLIGHT.inc()
+        with open(os.path.join(self.directory.name, f'metrics-{DEAD_PID}.json'), 'w') as handle:
+            json.dump({'pid': DEAD_PID, 'values': [
+                ['skillswap_http_requests_total', ['get_skills', 'GET', '200'], 3],
+                ['skillswap_http_requests_in_flight', [], 5],
+                ['skillswap_http_request_duration_seconds', ['get_skills'], [1] + [0] * 11 + [0.002, 1]],
+            ]}, handle)
+        totals = metrics.collect()
+        self.assertEqual(totals[('skillswap_http_requests_total', ('get_skills', 'GET', '200'))], 4)
+        self.assertEqual(totals[('skillswap_http_requests_in_flight', ())], 1)
+        self.assertEqual(totals[('skillswap_http_request_duration_seconds', ('get_skills',))][-1], 1)
+
+        metrics.clear()
+        self.assertEqual(os.listdir(self.directory.name), [])
+
+    def test_streaming_gauge(self):
+        stream = _TrackedStream(iter([b'a', b'b']))
+        self.assertEqual(metrics._values[('skillswap_streaming_responses_active', ())], 1)
+        self.assertEqual(list(stream), [b'a', b'b'])
+        stream.close()
+        self.assertEqual(metrics._values[('skillswap_streaming_responses_active', ())], 0)
+
+    def test_outbox_lag_sampled_from_database(self):
+        """Test that relay progress is reported by whichever process serves /metrics"""
+        outbox.cursors()
+        outbox.publish('review.created', 1, to_user_id=1, from_user_id=2, rating=5)
+        body = self._scrape()
+        self.assertIn('# TYPE skillswap_outbox_lag_events gauge', body)
+        self.assertIn('skillswap_outbox_lag_events{subscriber="notifications"} 1', body)
+        self.assertIn('skillswap_outbox_lag_seconds{subscriber="notifications"}', body)
+
+    def test_job_queue_sampled_from_database(self):
+        """Test that queue depth and failures are reported without the worker's counters"""
+        Job.objects.create(name='refresh_summaries', payload={})
+        Job.objects.create(name='refresh_summaries', payload={})
+        Job.objects.create(name='refresh_summaries', payload={}, status='failed')
+        body = self._scrape()
+        self.assertIn('skillswap_jobs{name="refresh_summaries",status="queued"} 2', body)
+        self.assertIn('skillswap_jobs{name="refresh_summaries",status="failed"} 1', body)
+
+    def test_token(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 401)
+        self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer wrong').status_code, 401)
+        self._scrape()
+
+    def test_token_required_in_production(self):
+        """Test that /metrics is refused without a token unless DEBUG is on"""
+        with override_settings(METRICS_TOKEN='', DEBUG=False):
+            self.assertEqual(self.client.get('/metrics').status_code, 403)
+        with override_settings(METRICS_TOKEN='', DEBUG=True):
+            self.assertEqual(self.client.get('/metrics').status_code, 200)
@@ -0,0 +1,164 @@
+"""
+Notification digest tests
+Tests coalescing per recipient, the digest window, batching across recipients, transports and the command
+"""
+import json
+import os
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core import mail
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth.models import User
+from django.utils import timezone
+from skillswap_app import notifications, outbox
+from skillswap_app.models import Category, Skill, SwapRequest, Review, Notification
+
+
+class ListTransport:
+    def __init__(self):
+        self.batches = []
+
+    def send(self, digests):
+        self.batches.append(digests)
+        return len(digests)
+
+
+class NotificationTests(TestCase):
+    """Test notification digests"""
+
+    def setUp(self):
+        self.teacher = User.objects.create_user(username='teacher', email='teacher@example.com', password='pass123')
+        self.learners = [User.objects.create_user(username=f'learner{i}', password='pass123') for i in range(5)]
+        music = Category.objects.create(name='Music')
+        self.guitar = Skill.objects.create(name='Guitar', category=music)
+        self.piano = Skill.objects.create(name='Piano', category=music)
+        patcher = mock.patch.dict(outbox.SUBSCRIBERS, {
+            'notifications': outbox.SUBSCRIBERS['notifications'],
+        }, clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        outbox.cursors()
+        self.transport = ListTransport()
+
+    def _request(self, learner, skill, to_user=None):
+        return SwapRequest.objects.create(from_user=learner, to_user=to_user or self.teacher, requested_skill=skill)
+
+    def _later(self):
+        return timezone.now() + timedelta(hours=2)
+
+    def test_events_coalesce_into_one_digest(self):
+        """Test that many swap requests and a review become a single digest for their recipient"""
+        for learner in self.learners:
+            self._request(learner, self.guitar)
+        first = SwapRequest.objects.filter(from_user=self.learners[0]).get()
+        self._request(self.learners[0], self.piano)
+        Review.objects.create(swap_request=first, from_user=self.learners[0], to_user=self.teacher, rating=5)
+        outbox.relay()
+        self.assertEqual(Notification.objects.filter(recipient=self.teacher).count(), 7)
+
+        self.assertEqual(notifications.send_digests(self.transport, now=self._later()), (1, 7, 0))
+        [[digest]] = self.transport.batches
+        self.assertEqual(digest.recipient, self.teacher)
+        self.assertEqual(digest.subject, 'SkillSwap: 6 new swap requests and 1 new review')
+        self.assertIn('Guitar: learner0, learner1, learner2 and 2 more', digest.body)
+        self.assertIn('Piano: learner0', digest.body)
+        self.assertIn('learner0: 5/5', digest.body)
+        self.assertFalse(Notification.objects.exists())
+
+    def test_waits_for_window(self):
+        self._request(self.learners[0], self.guitar)
+        outbox.relay()
+        self.assertEqual(notifications.send_digests(self.transport), (0, 0, 0))
+        self.assertEqual(Notification.objects.count(), 1)
+
+    def test_queries_per_batch_do_not_grow_with_events(self):
+        """Test that a batch costs the same queries for one event per recipient as for many"""
+        def queries(per_recipient):
+            Notification.objects.all().delete()
+            for learner in self.learners:
+                for _ in range(per_recipient):
+                    self._request(self.learners[0], self.guitar, to_user=learner)
+            outbox.relay()
+            with CaptureQueriesContext(connection) as context:
+                self.assertEqual(notifications.send_digests(self.transport, batch_size=2, now=self._later()),
+                                 (5, 5 * per_recipient, 0))
+            return len(context)
+
+        self.assertEqual(queries(1), queries(4))
+
+    @override_settings(NOTIFICATION_MAX_ATTEMPTS=2)
+    def test_failing_recipient_backs_off_without_blocking_others(self):
+        """Test that one rejected digest is retried later, then dropped, while the others go out"""
+        self._request(self.learners[0], self.guitar)
+        self._request(self.learners[1], self.guitar, to_user=self.learners[0])
+
+        def send(digests):
+            if digests[0].recipient == self.teacher:
+                raise RuntimeError('rejected')
+            self.transport.batches.append(digests)
+
+        now = self._later()
+        with mock.patch.object(self.transport, 'send', side_effect=send), \
+                self.assertLogs('skillswap_app.notifications', 'ERROR'):
+            outbox.relay()
+            self.assertEqual(notifications.send_digests(self.transport, now=now), (1, 1, 1))
+            self.assertEqual(list(Notification.objects.values_list('recipient_id', 'attempts')),
+                             [(self.teacher.id, 1)])
+            # Backing off: not due again straight away
+            self.assertEqual(notifications.send_digests(self.transport, now=now), (0, 0, 0))
+            later = now + notifications.retry_delay(1)
+            self.assertEqual(notifications.send_digests(self.transport, now=later), (0, 0, 1))
+        self.assertFalse(Notification.objects.exists())
+        self.assertEqual([[d.recipient for d in batch] for batch in self.transport.batches], [[self.learners[0]]])
+
+    def test_digest_sent_by_another_run_is_skipped(self):
+        """Test that rows another run has already claimed or sent are not sent twice"""
+        self._request(self.learners[0], self.guitar)
+        self._request(self.learners[1], self.guitar, to_user=self.learners[0])
+        outbox.relay()
+
+        def send(digests):
+            # Meanwhile an overlapping run sends everything else
+            Notification.objects.exclude(recipient=digests[0].recipient).delete()
+            self.transport.batches.append(digests)
+
+        with mock.patch.object(self.transport, 'send', side_effect=send):
+            self.assertEqual(notifications.send_digests(self.transport, now=self._later()), (1, 1, 0))
+        self.assertEqual(len(self.transport.batches), 1)
+
+    def test_file_transport(self):
+        self._request(self.learners[0], self.guitar)
+        outbox.relay()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'out', 'notifications.jsonl')
+            notifications.send_digests(notifications.FileTransport(path), now=self._later())
+            with open(path) as f:
+                [line] = f.readlines()
+        record = json.loads(line)
+        self.assertEqual((record['user_id'], record['to'], record['count']), (self.teacher.id, 'teacher@example.com', 1))
+        self.assertEqual(record['subject'], 'SkillSwap: 1 new swap request')
+
+    @override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+    def test_email_transport_skips_users_without_email(self):
+        self._request(self.learners[0], self.guitar)
+        self._request(self.learners[1], self.guitar, to_user=self.learners[0])
+        outbox.relay()
+        notifications.send_digests(notifications.EmailTransport(), now=self._later())
+        self.assertEqual([message.to for message in mail.outbox], [['teacher@example.com']])
+        self.assertFalse(Notification.objects.exists())
+
+    @override_settings(NOTIFICATION_DIGEST_WINDOW=0)
+    def test_send_digests_command(self):
+        self._request(self.learners[0], self.guitar)
+        self._request(self.learners[1], self.guitar)
+        outbox.relay()
+        out = StringIO()
+        with mock.patch('sys.stdout', StringIO()):
+            call_command('send_digests', '--transport', 'skillswap_app.notifications.ConsoleTransport', stdout=out)
+        self.assertIn('Sent 1 digest(s) covering 2 notification(s) via ConsoleTransport', out.getvalue())
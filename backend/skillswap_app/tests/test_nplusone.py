@@ -0,0 +1,63 @@
+"""
+N+1 detector tests
+Tests SQL fingerprinting, caller attribution and the raise/log switch
+"""
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse
+from django.test import TestCase, SimpleTestCase, RequestFactory, override_settings
+from skillswap_app import analytics
+from skillswap_app.middleware import NPlusOneMiddleware, NPlusOneError, fingerprint
+
+
+class FingerprintTests(SimpleTestCase):
+    """Test that parameters and literals are stripped"""
+
+    def test_placeholders_and_literals(self):
+        self.assertEqual(
+            fingerprint('SELECT "t"."id"  FROM "t"\n WHERE "t"."a" = %s AND "t"."b" = \'it\'\'s\' LIMIT 21'),
+            'SELECT "t"."id" FROM "t" WHERE "t"."a" = %s AND "t"."b" = ? LIMIT ?',
+        )
+
+    def test_in_lists_collapse(self):
+        self.assertEqual(fingerprint('SELECT 1 FROM t WHERE id IN (%s, %s)'),
+                         fingerprint('SELECT 1 FROM t WHERE id IN (%s, %s, %s, %s)'))
+
+    def test_identifiers_with_digits_are_kept(self):
+        self.assertIn('"t2"."c1"', fingerprint('SELECT "t2"."c1" FROM "t2"'))
+
+
+@override_settings(NPLUSONE_ENABLED=True, NPLUSONE_THRESHOLD=3, NPLUSONE_ACTION='raise')
+class NPlusOneMiddlewareTests(TestCase):
+    """Test NPlusOneMiddleware behaviour"""
+
+    def _run(self, repeats):
+        def view(request):
+            for _ in range(repeats):
+                analytics.rollups_as_of()
+            return HttpResponse('ok')
+        return NPlusOneMiddleware(view)(RequestFactory().get('/api/analytics/'))
+
+    def test_raises_with_caller(self):
+        """Test that a repeated statement raises, naming the app line that ran it"""
+        with self.assertRaises(NPlusOneError) as raised:
+            self._run(4)
+        message = str(raised.exception)
+        self.assertIn('GET /api/analytics/: 1 statements repeated more than 3 times', message)
+        self.assertIn('4x SELECT', message)
+        self.assertIn('4x from skillswap_app/analytics.py:', message)
+        self.assertIn('(rollups_as_of)', message)
+
+    def test_under_threshold(self):
+        self.assertEqual(self._run(3).status_code, 200)
+
+    def test_log_action(self):
+        """Test that production mode logs a warning and still returns the response"""
+        with override_settings(NPLUSONE_ACTION='log'), \
+                self.assertLogs('skillswap_app.nplusone', 'WARNING') as logs:
+            response = self._run(5)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('5x SELECT', logs.output[0])
+
+    def test_disabled(self):
+        with override_settings(NPLUSONE_ENABLED=False), self.assertRaises(MiddlewareNotUsed):
+            NPlusOneMiddleware(lambda request: None)
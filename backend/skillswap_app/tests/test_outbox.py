@@ -0,0 +1,127 @@
+"""
+Outbox tests
+Tests event publishing in the write's transaction, gap handling, per-subscriber cursors and the relay command
+"""
+import json
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase, Client, override_settings
+from django.contrib.auth.models import User
+from django.utils import timezone
+from skillswap_app import outbox
+from skillswap_app.models import Profile, Category, Skill, UserSkill, SwapRequest, OutboxEvent, OutboxCursor
+
+
+class OutboxTests(TestCase):
+    """Test the transactional outbox and its relay"""
+
+    def setUp(self):
+        self.client = Client()
+        self.teacher = User.objects.create_user(username='teacher', password='pass123')
+        self.learner = User.objects.create_user(username='learner', password='pass123')
+        for user in (self.teacher, self.learner):
+            Profile.objects.create(user=user)
+        self.skill = Skill.objects.create(name='Guitar', category=Category.objects.create(name='Music'))
+        self.received = []
+        patcher = mock.patch.dict(outbox.SUBSCRIBERS, {'test': (('swaprequest.*',), self.received.append)},
+                                  clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _events(self):
+        return list(OutboxEvent.objects.order_by('id').values_list('topic', 'payload'))
+
+    def test_view_writes_event_with_change(self):
+        """Test that a swap request and its status change each publish an event"""
+        self.client.force_login(self.learner)
+        response = self.client.post('/api/requests/send/', json.dumps({
+            'to_user_id': self.teacher.id, 'requested_skill_id': self.skill.id,
+        }), content_type='application/json')
+        request_id = response.json()['request_id']
+        self.client.force_login(self.teacher)
+        self.client.post(f'/api/requests/{request_id}/update/', json.dumps({'status': 'accepted'}),
+                         content_type='application/json')
+
+        events = [(topic, payload['status']) for topic, payload in self._events() if topic.startswith('swap')]
+        self.assertEqual(events, [('swaprequest.created', 'pending'), ('swaprequest.updated', 'accepted')])
+        self.assertEqual(OutboxEvent.objects.filter(topic='swaprequest.created').get().aggregate_id, request_id)
+
+    def test_skill_set_replace_publishes_one_event(self):
+        UserSkill.objects.create(user=self.learner, skill=self.skill)
+        OutboxEvent.objects.all().delete()
+        self.client.force_login(self.learner)
+        self.client.put('/api/profile/skills/', json.dumps({'skills': []}), content_type='application/json')
+        self.assertEqual(self._events(), [('userskill.replaced', {'user_id': self.learner.id,
+                                                                  'skill_ids': [self.skill.id]})])
+
+    def test_relay_batches_and_advances_cursor(self):
+        """Test that a new subscriber starts at the end and then gets matching events once"""
+        UserSkill.objects.create(user=self.learner, skill=self.skill)
+        self.assertEqual(outbox.relay(), {})
+        first = SwapRequest.objects.create(from_user=self.learner, to_user=self.teacher, requested_skill=self.skill)
+        first.status = 'accepted'
+        first.save()
+        UserSkill.objects.filter(user=self.learner).delete()
+
+        self.assertEqual(outbox.relay(), {'test': (2, None)})
+        self.assertEqual([[event.topic for event in batch] for batch in self.received],
+                         [['swaprequest.created', 'swaprequest.updated']])
+        self.assertEqual(OutboxCursor.objects.get(name='test').position, OutboxEvent.objects.latest('id').id)
+        self.assertEqual(outbox.relay(), {})
+
+    def test_failing_subscriber_retries_without_blocking_others(self):
+        def broken(events):
+            raise RuntimeError('down')
+
+        outbox.SUBSCRIBERS['broken'] = (('*',), broken)
+        outbox.cursors()
+        SwapRequest.objects.create(from_user=self.learner, to_user=self.teacher, requested_skill=self.skill)
+        with self.assertLogs('skillswap_app.outbox', 'ERROR'):
+            self.assertEqual(outbox.relay(), {'test': (1, None), 'broken': (1, 'RuntimeError: down')})
+            self.assertEqual(outbox.relay(), {'broken': (1, 'RuntimeError: down')})
+        self.assertEqual(outbox.lag()['broken'][0], 1)
+
+    def test_failing_subscriber_does_not_pin_read_window(self):
+        """Test that a healthy subscriber keeps reading past a broken one's batch size"""
+        def broken(events):
+            raise RuntimeError('down')
+
+        outbox.SUBSCRIBERS['broken'] = (('*',), broken)
+        outbox.cursors()
+        requests = [SwapRequest.objects.create(from_user=self.learner, to_user=self.teacher,
+                                               requested_skill=self.skill) for _ in range(5)]
+        with self.assertLogs('skillswap_app.outbox', 'ERROR'):
+            for _ in range(4):
+                outbox.relay(limit=2)
+        self.assertEqual([event.aggregate_id for batch in self.received for event in batch],
+                         [request.id for request in requests])
+        self.assertEqual(outbox.lag()['broken'][0], 5)
+
+    @override_settings(OUTBOX_GAP_TIMEOUT=60)
+    def test_waits_at_gap_until_timeout(self):
+        """Test that an id gap (a transaction still in flight) holds the relay back until it times out"""
+        outbox.cursors()
+        end = OutboxCursor.objects.get(name='test').position
+        OutboxEvent.objects.create(id=end + 2, topic='swaprequest.created', aggregate_id=1)
+        self.assertEqual(outbox.pending(end, 10), [])
+        OutboxEvent.objects.filter(id=end + 2).update(created_at=timezone.now() - timedelta(seconds=61))
+        self.assertEqual([event.id for event in outbox.pending(end, 10)], [end + 2])
+
+    def test_purge_keeps_unread_events(self):
+        outbox.cursors()
+        SwapRequest.objects.create(from_user=self.learner, to_user=self.teacher, requested_skill=self.skill)
+        OutboxEvent.objects.update(created_at=timezone.now() - timedelta(days=30))
+        self.assertEqual(outbox.purge(), 0)
+        outbox.relay()
+        self.assertEqual(outbox.purge(), 1)
+
+    def test_relay_command(self):
+        outbox.cursors()
+        SwapRequest.objects.create(from_user=self.learner, to_user=self.teacher, requested_skill=self.skill)
+        out = StringIO()
+        call_command('relay_outbox', '--once', stdout=out)
+        self.assertIn('test: 1 event(s)', out.getvalue())
+        self.assertIn('1 delivered, 0 failed', out.getvalue())
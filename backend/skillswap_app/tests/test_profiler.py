@@ -0,0 +1,89 @@
+"""
+Profiler tests
+Tests the stack sampler, the staff trigger, the signal and signed per-request profiling
+"""
+import os
+import signal
+import tempfile
+import threading
+import time
+
+from django.test import TestCase, Client, override_settings
+from django.contrib.auth.models import User
+from skillswap_app import profiler
+
+
+def _spin(seconds):
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        pass
+
+
+def _wait_for_files(directory, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if os.listdir(directory):
+            return os.listdir(directory)
+        time.sleep(0.02)
+    return []
+
+
+class ProfilerTests(TestCase):
+    """Test the sampling profiler"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        settings = override_settings(PROFILER_DIR=self.directory.name, PROFILER_INTERVAL=0.001,
+                                     PROFILER_REQUEST_INTERVAL=0.001, PROFILER_SIGNAL_SECONDS=0.05)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.client = Client()
+        self.staff = User.objects.create_user(username='staff', password='pass123', is_staff=True)
+
+    def test_sampler_collapsed_stacks(self):
+        """Test that a busy thread's function shows up in the collapsed output"""
+        worker = threading.Thread(target=_spin, args=(0.2,), name='busy')
+        worker.start()
+        sampler = profiler.Sampler(0.001, thread_ids={worker.ident}).start(5)
+        worker.join()
+        sampler.stop()
+        self.assertGreater(sampler.samples, 0)
+        path = sampler.write(os.path.join(self.directory.name, 'out.collapsed'))
+        with open(path) as handle:
+            lines = handle.read().splitlines()
+        stack, count = lines[0].rsplit(' ', 1)
+        self.assertTrue(stack.startswith('busy;'))
+        self.assertIn('_spin (skillswap_app/tests/test_profiler.py:', stack)
+        self.assertGreater(int(count), 0)
+
+    def test_staff_trigger(self):
+        """Test that only staff can start a worker profile, one at a time"""
+        self.assertEqual(self.client.post('/admin/profiler/').status_code, 401)
+        self.client.force_login(self.staff)
+        response = self.client.post('/admin/profiler/?seconds=0.1')
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.json()['pid'], os.getpid())
+        self.assertEqual(self.client.post('/admin/profiler/?seconds=1').status_code, 409)
+        self.assertEqual(_wait_for_files(self.directory.name), [os.path.basename(response.json()['file'])])
+        self.assertEqual(self.client.post('/admin/profiler/?seconds=x').status_code, 400)
+
+    def test_signal(self):
+        if not profiler.install_signal_handler():
+            self.skipTest('signal handlers can only be installed from the main thread')
+        os.kill(os.getpid(), getattr(signal, 'SIGUSR2'))
+        self.assertEqual(len(_wait_for_files(self.directory.name)), 1)
+
+    def test_signed_request_profiling(self):
+        """Test that a token profiles requests to its own path only"""
+        self.assertEqual(self.client.get('/admin/profiler/token/', {'path': '/api/skills/'}).status_code, 401)
+        self.client.force_login(self.staff)
+        token = self.client.get('/admin/profiler/token/', {'path': '/api/skills/'}).json()['token']
+        self.client.logout()
+
+        self.assertNotIn('X-Profile', self.client.get('/api/categories/', {'_profile': token}))
+        self.assertNotIn('X-Profile', self.client.get('/api/skills/', {'_profile': token + 'x'}))
+        response = self.client.get('/api/skills/', {'_profile': token})
+        self.assertEqual(response.status_code, 200)
+        name = response['X-Profile'].split(';')[0]
+        self.assertEqual(os.listdir(self.directory.name), [name])
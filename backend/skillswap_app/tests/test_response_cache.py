@@ -0,0 +1,161 @@
+"""
+Response cache tests
+Tests the anonymous browse_skills cache, its keys and signal-driven invalidation
+"""
+from unittest import mock
+
+from django.core.cache import cache as django_cache
+from django.test import TestCase, Client, override_settings
+from django.contrib.auth.models import User
+from skillswap_app import cache, versions
+from skillswap_app.models import Profile, Category, Skill, UserSkill, SwapRequest, Review
+import json
+
+
+@override_settings(RESPONSE_CACHE_ENABLED=True, COMPRESSION_MIN_SIZE=1)
+class BrowseResponseCacheTests(TestCase):
+    """Test browse_skills response caching"""
+
+    def setUp(self):
+        django_cache.clear()
+        self.client = Client()
+        self.music = Category.objects.create(name='Music')
+        self.code = Category.objects.create(name='Programming')
+        self.guitar = Skill.objects.create(name='Guitar', category=self.music)
+        self.python = Skill.objects.create(name='Python', category=self.code)
+        self.teacher = User.objects.create_user(username='teacher', password='pass123')
+        self.profile = Profile.objects.create(user=self.teacher, location='Pune')
+        UserSkill.objects.create(user=self.teacher, skill=self.guitar, can_teach=True)
+        UserSkill.objects.create(user=self.teacher, skill=self.python, can_teach=True)
+
+    def _stats(self):
+        return cache.get_stats(['browse_skills'])['browse_skills']
+
+    def _browse(self, query=''):
+        response = self.client.get('/api/skills/browse/' + query)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def _is_cached(self, query=''):
+        """Request the URL and report whether it was served from cache"""
+        hits = self._stats()['hits']
+        self._browse(query)
+        return self._stats()['hits'] == hits + 1
+
+    def test_second_request_is_a_hit(self):
+        """Test that repeated anonymous requests are served from cache"""
+        first = self._browse()
+        # Only the ETag version lookup touches the database
+        with self.assertNumQueries(1):
+            second = self._browse()
+        self.assertEqual(first.content, second.content)
+        self.assertEqual(self._stats(), {'hits': 1, 'misses': 1, 'stale': 0, 'hit_ratio': 0.5})
+
+    def test_authenticated_requests_bypass_cache(self):
+        """Test that logged-in users are never served cached responses"""
+        self.client.force_login(self.teacher)
+        self._browse()
+        self._browse()
+        self.assertEqual(self._stats()['hits'], 0)
+
+    def test_keys_are_filter_aware(self):
+        """Test that filters get separate entries and are normalized"""
+        self._browse('?location=Pune')
+        self.assertFalse(self._is_cached('?location=Delhi'))
+        self.assertTrue(self._is_cached('?location=pune'))
+        self.assertTrue(self._is_cached('?location=Pune&utm_source=mail'))
+
+    def test_user_skill_change_invalidates_only_its_category(self):
+        """Test selective invalidation by category"""
+        self._browse(f'?category_id={self.music.id}')
+        self._browse(f'?category_id={self.code.id}')
+        self._browse()
+        with self.captureOnCommitCallbacks(execute=True):
+            user_skill = UserSkill.objects.get(skill=self.guitar)
+            user_skill.experience_level = 'Advanced'
+            user_skill.save()
+        self.assertFalse(self._is_cached(f'?category_id={self.music.id}'))
+        self.assertFalse(self._is_cached())
+        self.assertTrue(self._is_cached(f'?category_id={self.code.id}'))
+
+    def test_location_change_invalidates(self):
+        """Test that moving a teacher invalidates browse entries"""
+        self._browse()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.profile.location = 'Mumbai'
+            self.profile.save()
+        response = self._browse()
+        teachers = json.loads(response.content)['skills'][0]['teachers']
+        self.assertEqual(teachers[0]['location'], 'Mumbai')
+
+    def test_bio_change_does_not_invalidate(self):
+        """Test that profile fields not shown in browse keep the cache warm"""
+        self._browse()
+        profile = Profile.objects.get(pk=self.profile.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            profile.bio = 'New bio'
+            profile.save()
+        self.assertTrue(self._is_cached())
+
+    def test_review_invalidates(self):
+        """Test that a new rating is not hidden behind the cache"""
+        self._browse()
+        learner = User.objects.create_user(username='learner', password='pass123')
+        swap = SwapRequest.objects.create(from_user=learner, to_user=self.teacher,
+                                          requested_skill=self.guitar, status='completed')
+        with self.captureOnCommitCallbacks(execute=True):
+            Review.objects.create(from_user=learner, to_user=self.teacher, swap_request=swap, rating=4)
+        self.assertFalse(self._is_cached())
+
+    def test_skill_change_invalidates_everything(self):
+        """Test that catalog edits invalidate every browse entry"""
+        self._browse(f'?category_id={self.code.id}')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.guitar.name = 'Electric Guitar'
+            self.guitar.save()
+        self.assertFalse(self._is_cached(f'?category_id={self.code.id}'))
+
+    def test_skill_set_replace_fires_single_invalidation(self):
+        """Test that a bulk skill-set rewrite invalidates once"""
+        self.client.force_login(self.teacher)
+        drums = Skill.objects.create(name='Drums', category=self.music)
+        with mock.patch.object(cache, 'invalidate_browse') as invalidate:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.put('/api/profile/skills/',
+                    json.dumps({'skills': [{'skill_id': drums.id}]}),
+                    content_type='application/json'
+                )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(invalidate.call_count, 1)
+        self.assertEqual(set(invalidate.call_args.args[0]), {self.music.id, self.code.id})
+
+    def test_compressed_variants_are_cached(self):
+        """Test that hits carry the pre-compressed body"""
+        self._browse()
+        response = self.client.get('/api/skills/browse/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+
+    def test_stats_endpoint(self):
+        """Test that hit/miss counters are exposed"""
+        self._browse()
+        self._browse()
+        self.assertEqual(self.client.get('/api/cache/stats/').status_code, 401)
+        self.client.force_login(User.objects.create_user(username='staff', password='pass123', is_staff=True))
+        response = self.client.get('/api/cache/stats/')
+        self.assertEqual(response.json()['caches']['browse_skills']['hits'], 1)
+
+    def test_cached_body_keeps_its_own_etag(self):
+        """Test that a body cached before a change made elsewhere is not served under the new ETag"""
+        first = self.client.get('/api/categories/')
+        # Another process: writes and bumps the version, but this process's
+        # generation tags are untouched
+        Category.objects.filter(id=self.code.id).update(name='Software')
+        versions.bump(versions.CATALOG)
+        second = self.client.get('/api/categories/')
+        self.assertEqual((second.content, second['ETag']), (first.content, first['ETag']))
+
+        cache.invalidate_catalog()
+        third = self.client.get('/api/categories/', HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(third.status_code, 200)
+        self.assertIn(b'Software', third.content)
+        self.assertNotEqual(third['ETag'], first['ETag'])
@@ -0,0 +1,48 @@
+"""
+JSON response tests
+Tests that FastJsonResponse serializes the same way with and without orjson
+"""
+from datetime import datetime, timezone
+from decimal import Decimal
+from unittest import mock
+
+from django.test import SimpleTestCase
+from skillswap_app import responses
+from skillswap_app.responses import FastJsonResponse
+import json
+
+
+class FastJsonResponseTests(SimpleTestCase):
+    """Test the orjson fast path and the stdlib fallback"""
+
+    payload = {
+        'created_at': datetime(2025, 3, 1, 9, 30, 15, 123456, tzinfo=timezone.utc),
+        'rating': Decimal('4.5'),
+        'teachers': [{'id': 1, 'username': 'raj_dev', 'offered_skill': None}],
+    }
+
+    def test_datetimes_match_isoformat(self):
+        """Test that datetimes are written exactly like isoformat()"""
+        data = json.loads(FastJsonResponse(self.payload).content)
+        self.assertEqual(data['created_at'], self.payload['created_at'].isoformat())
+
+    def test_stdlib_fallback_matches_fast_path(self):
+        """Test that the fallback encoder produces the same document"""
+        fast = json.loads(FastJsonResponse(self.payload).content)
+        with mock.patch.object(responses, 'orjson', None):
+            fallback = json.loads(FastJsonResponse(self.payload).content)
+        self.assertEqual(fast, fallback)
+
+    def test_content_type(self):
+        """Test that the response is served as JSON"""
+        self.assertEqual(FastJsonResponse({})['Content-Type'], 'application/json')
+
+    def test_non_dict_requires_safe_false(self):
+        """Test that lists are refused unless safe=False, like JsonResponse"""
+        with self.assertRaises(TypeError):
+            FastJsonResponse([1, 2])
+        self.assertEqual(json.loads(FastJsonResponse([1, 2], safe=False).content), [1, 2])
+
+    def test_status_is_passed_through(self):
+        """Test that extra HttpResponse arguments still work"""
+        self.assertEqual(FastJsonResponse({'error': 'x'}, status=404).status_code, 404)
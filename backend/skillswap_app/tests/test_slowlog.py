@@ -0,0 +1,88 @@
+"""
+Slow query log tests
+Tests the connection hook, EXPLAIN capture, log aggregation and the admin page
+"""
+import json
+import os
+import tempfile
+
+from django.db import connection
+from django.test import TestCase, Client, override_settings
+from django.contrib.auth.models import User
+from skillswap_app import analytics, slowlog
+
+
+@override_settings(SLOW_QUERY_LOG_ENABLED=True, SLOW_QUERY_MS=0, SLOW_QUERY_EXPLAIN=True,
+                   SLOW_QUERY_EXPLAIN_ASYNC=False)
+class SlowQueryLogTests(TestCase):
+    """Test the slow query wrapper and the log reader"""
+
+    def setUp(self):
+        slowlog.explainer.explained.clear()
+        slowlog.install(None, connection)
+        self.addCleanup(self._uninstall)
+
+    def _uninstall(self):
+        connection.execute_wrappers[:] = [wrapper for wrapper in connection.execute_wrappers
+                                          if not isinstance(wrapper, slowlog.SlowQueryWrapper)]
+
+    def _records(self, logs):
+        return [json.loads(record.getMessage()) for record in logs.records]
+
+    def test_slow_statement_logged_with_caller_and_plan(self):
+        """Test the query record and the EXPLAIN captured for a new fingerprint"""
+        with self.assertLogs('skillswap_app.slow_queries', 'INFO') as logs:
+            analytics.rollups_as_of()
+        query, plan = self._records(logs)
+        self.assertEqual(query['type'], 'query')
+        self.assertEqual(query['params'], ['rollups'])
+        self.assertIn('skillswap_app/analytics.py:', query['caller'])
+        self.assertIn('(rollups_as_of)', query['caller'])
+        self.assertEqual((plan['type'], plan['fingerprint']), ('explain', query['fingerprint']))
+        self.assertTrue(plan['plan'])
+
+    def test_install_is_idempotent_and_threshold_applies(self):
+        slowlog.install(None, connection)
+        self.assertEqual(sum(isinstance(w, slowlog.SlowQueryWrapper) for w in connection.execute_wrappers), 1)
+        with override_settings(SLOW_QUERY_MS=60000), \
+                self.assertNoLogs('skillswap_app.slow_queries', 'INFO'):
+            analytics.rollups_as_of()
+
+    def test_worst_ranks_by_total_time(self):
+        """Test aggregation of a rotated log file and its backup"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'slow.log')
+            rows = [
+                {'type': 'query', 'at': '1', 'fingerprint': 'A', 'sql': 'a', 'duration_ms': 300, 'caller': 'x'},
+                {'type': 'query', 'at': '2', 'fingerprint': 'B', 'sql': 'b', 'duration_ms': 250, 'caller': 'y'},
+                {'type': 'explain', 'at': '3', 'fingerprint': 'B', 'plan': ['SCAN t']},
+            ]
+            with open(path + '.1', 'w') as handle:
+                handle.write(json.dumps(rows[1]) + '\n')
+            with open(path, 'w') as handle:
+                handle.write('\n'.join(json.dumps(row) for row in [rows[0], rows[1], rows[2]]) + '\nnot json\n')
+            records = slowlog.read_records(path, backups=1)
+
+        ranked = slowlog.worst(records)
+        self.assertEqual([(g['fingerprint'], g['count'], g['total_ms']) for g in ranked],
+                         [('B', 2, 500.0), ('A', 1, 300.0)])
+        self.assertEqual(ranked[0]['plan'], ['SCAN t'])
+        self.assertEqual(ranked[0]['callers'], [('y', 2)])
+
+    def test_admin_page(self):
+        """Test that the page is staff only and lists logged statements"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'slow.log')
+            with open(path, 'w') as handle:
+                handle.write(json.dumps({'type': 'query', 'at': 'now', 'fingerprint': 'SELECT 1',
+                                         'sql': 'SELECT 1', 'duration_ms': 900, 'caller': 'views.py:1'}) + '\n')
+            client = Client()
+            # The manifest storage needs collectstatic, which tests do not run
+            with override_settings(SLOW_QUERY_LOG_FILE=path, STORAGES={
+                'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+            }):
+                self.assertEqual(client.get('/admin/slow-queries/').status_code, 302)
+                client.force_login(User.objects.create_superuser('admin', 'a@example.com', 'pass123'))
+                response = client.get('/admin/slow-queries/')
+        self.assertContains(response, 'SELECT 1')
+        self.assertContains(response, '900')
@@ -0,0 +1,70 @@
+"""
+Startup tests
+Tests that settings import no optional drivers and the profile_startup command
+"""
+import json
+import os
+import subprocess
+import sys
+import runpy
+import tempfile
+from io import StringIO
+from types import SimpleNamespace
+from unittest import mock
+
+from django.conf import settings
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+from skillswap_app.management.commands.profile_startup import parse_importtime
+
+
+class StartupTests(SimpleTestCase):
+    """Test the cold boot path"""
+
+    def test_settings_import_is_quiet_and_lean(self):
+        """Test that settings print nothing and skip unused database drivers"""
+        env = {key: value for key, value in os.environ.items() if key != 'DATABASE_URL'}
+        env['DB_ENGINE'] = 'django.db.backends.sqlite3'
+        result = subprocess.run(
+            [sys.executable, '-c', 'import sys, skillswap_project.settings; '
+             'print(sorted({"pymysql", "dj_database_url", "dotenv"} & set(sys.modules)))'],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+        )
+        self.assertEqual(result.returncode, 0, result.stderr)
+        expected = ['dotenv'] if (settings.BASE_DIR / '.env').exists() else []
+        self.assertEqual(result.stdout, f'{expected}\n')
+
+    def test_parse_importtime(self):
+        modules = parse_importtime([
+            'import time: self [us] | cumulative | imported package',
+            'import time:       120 |        120 |     _io',
+            'import time:      2000 |       2500 |   django.apps',
+            'unrelated line',
+        ])
+        self.assertEqual(modules, [('_io', 120, 120, 2), ('django.apps', 2000, 2500, 1)])
+
+    def test_command_reports_phases(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'boot.json')
+            out = StringIO()
+            call_command('profile_startup', '--top', '5', '--json', path, stdout=out)
+            with open(path) as handle:
+                report = json.load(handle)
+        self.assertIn('Cold boot', out.getvalue())
+        self.assertEqual(set(report['phases']), {'settings', 'apps', 'wsgi', 'urls', 'total'})
+        self.assertIn('skillswap_app', report['ready'])
+        self.assertIn('skillswap_app.views', {row['module'] for row in report['imports']})
+
+    def test_gunicorn_refuses_several_workers_without_atomic_shared_cache(self):
+        on_starting = runpy.run_path(str(settings.BASE_DIR / 'gunicorn.conf.py'))['on_starting']
+        for backend in ('locmem.LocMemCache', 'filebased.FileBasedCache'):
+            with override_settings(CACHES={'default': {'BACKEND': f'django.core.cache.backends.{backend}',
+                                                       'LOCATION': '/tmp/unused'}}):
+                with self.assertRaisesMessage(RuntimeError, 'need a shared cache'):
+                    on_starting(SimpleNamespace(cfg=SimpleNamespace(workers=2)))
+        with mock.patch('skillswap_app.metrics.clear') as clear:
+            on_starting(SimpleNamespace(cfg=SimpleNamespace(workers=1)))
+            with override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+                                                       'LOCATION': 'skillswap_cache'}}):
+                on_starting(SimpleNamespace(cfg=SimpleNamespace(workers=2)))
+        self.assertEqual(clear.call_count, 2)
@@ -0,0 +1,144 @@
+"""
+Summary table tests
+Tests incremental refresh of skill_popularity / user_summary, the rebuild command and read endpoints
+"""
+import json
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, Client
+from django.contrib.auth.models import User
+from skillswap_app import summaries
+from skillswap_app.models import (
+    Profile, Category, Skill, UserSkill, SwapRequest, Review, SkillPopularity, UserSummary
+)
+
+
+class SummaryTests(TestCase):
+    """Test that summary rows follow the source tables"""
+
+    def setUp(self):
+        self.client = Client()
+        category = Category.objects.create(name='Music')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.guitar = Skill.objects.create(name='Guitar', category=category)
+            self.piano = Skill.objects.create(name='Piano', category=category)
+            self.teacher = self._user('teacher', 'Mumbai')
+            self.learner = self._user('learner', 'Pune')
+            UserSkill.objects.create(user=self.teacher, skill=self.guitar, can_teach=True)
+            UserSkill.objects.create(user=self.teacher, skill=self.piano, can_teach=True)
+            UserSkill.objects.create(user=self.learner, skill=self.guitar, can_teach=False)
+
+    def _user(self, username, location):
+        user = User.objects.create_user(username=username, password='pass123')
+        Profile.objects.create(user=user, location=location)
+        return user
+
+    def _complete_with_review(self, rating):
+        with self.captureOnCommitCallbacks(execute=True):
+            swap = SwapRequest.objects.create(from_user=self.learner, to_user=self.teacher,
+                                              requested_skill=self.guitar)
+        with self.captureOnCommitCallbacks(execute=True):
+            swap.status = 'completed'
+            swap.save()
+            Review.objects.create(from_user=self.learner, to_user=self.teacher, swap_request=swap, rating=rating)
+        return swap
+
+    def test_user_skill_changes_refresh_rows(self):
+        """Test teacher/learner counts and skills_count after inserts and deletes"""
+        guitar = SkillPopularity.objects.get(skill=self.guitar)
+        self.assertEqual((guitar.teacher_count, guitar.learner_count), (1, 1))
+        self.assertEqual(UserSummary.objects.get(user=self.teacher).skills_count, 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            UserSkill.objects.filter(user=self.teacher, skill=self.piano).delete()
+        self.assertEqual(SkillPopularity.objects.get(skill=self.piano).teacher_count, 0)
+        self.assertEqual(UserSummary.objects.get(user=self.teacher).skills_count, 1)
+
+    def test_requests_and_reviews_refresh_rows(self):
+        """Test request counts and ratings for the skill and the reviewed user"""
+        self._complete_with_review(4)
+        self._complete_with_review(5)
+        guitar = SkillPopularity.objects.get(skill=self.guitar)
+        self.assertEqual((guitar.request_count, guitar.completed_count, guitar.review_count), (2, 2, 2))
+        self.assertEqual(guitar.avg_rating, 4.5)
+        summary = UserSummary.objects.get(user=self.teacher)
+        self.assertEqual((summary.reviews_received, summary.avg_rating), (2, 4.5))
+
+    def test_bulk_skill_set_refreshes_once(self):
+        """Test that replacing a skill set refreshes the summaries after commit"""
+        self.client.force_login(self.learner)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.put('/api/profile/skills/', json.dumps({'skills': [
+                {'skill_id': self.piano.id, 'can_teach': True},
+            ]}), content_type='application/json')
+        self.assertEqual(SkillPopularity.objects.get(skill=self.guitar).learner_count, 0)
+        self.assertEqual(SkillPopularity.objects.get(skill=self.piano).teacher_count, 2)
+        self.assertEqual(UserSummary.objects.get(user=self.learner).skills_count, 1)
+
+    def test_rebuild_matches_incremental(self):
+        """Test that the rebuild command recomputes the same rows from scratch"""
+        self._complete_with_review(3)
+        expected = list(SkillPopularity.objects.order_by('skill').values_list(
+            'skill', 'teacher_count', 'request_count', 'avg_rating'))
+        SkillPopularity.objects.all().delete()
+        UserSummary.objects.all().delete()
+
+        out = StringIO()
+        call_command('rebuild_summaries', '--batch-size', '1', stdout=out)
+        self.assertIn('Rebuilt 2 skills rows', out.getvalue())
+        self.assertEqual(list(SkillPopularity.objects.order_by('skill').values_list(
+            'skill', 'teacher_count', 'request_count', 'avg_rating')), expected)
+        self.assertEqual(UserSummary.objects.get(user=self.learner).location, 'Pune')
+
+    def test_trending_and_top_teachers(self):
+        """Test the read endpoints served from the summary tables"""
+        self._complete_with_review(5)
+        response = self.client.get('/api/skills/trending/')
+        self.assertEqual([s['name'] for s in response.json()['skills']], ['Guitar'])
+
+        response = self.client.get('/api/users/top-teachers/', {'limit': 5})
+        teachers = response.json()['teachers']
+        self.assertEqual([t['username'] for t in teachers], ['teacher'])
+        self.assertEqual(teachers[0]['avg_rating'], 5.0)
+
+        self.assertEqual(self.client.get('/api/skills/trending/', {'limit': 'x'}).status_code, 400)
+
+    def test_demand_gap_counters_and_endpoint(self):
+        """Test pending/accepted counters against teachers and the in-demand ranking"""
+        with self.captureOnCommitCallbacks(execute=True):
+            for _ in range(3):
+                SwapRequest.objects.create(from_user=self.learner, to_user=self.teacher, requested_skill=self.guitar)
+            SwapRequest.objects.create(from_user=self.learner, to_user=self.teacher, requested_skill=self.piano)
+        guitar = SkillPopularity.objects.get(skill=self.guitar)
+        self.assertEqual((guitar.pending_count, guitar.teacher_count, guitar.demand_gap), (3, 1, 2))
+        self.assertEqual(SkillPopularity.objects.get(skill=self.piano).demand_gap, 0)
+
+        response = self.client.get('/api/skills/in-demand/')
+        self.assertEqual([(s['name'], s['demand_gap']) for s in response.json()['skills']], [('Guitar', 2)])
+
+        # Accepting keeps the demand open; completing closes it
+        swap = SwapRequest.objects.filter(requested_skill=self.guitar).first()
+        with self.captureOnCommitCallbacks(execute=True):
+            swap.status = 'accepted'
+            swap.save()
+        guitar.refresh_from_db()
+        self.assertEqual((guitar.pending_count, guitar.accepted_count, guitar.demand_gap), (2, 1, 2))
+        with self.captureOnCommitCallbacks(execute=True):
+            swap.status = 'completed'
+            swap.save()
+        guitar.refresh_from_db()
+        self.assertEqual(guitar.demand_gap, 1)
+
+    def test_upsert_without_conflict_target(self):
+        """Test that backends without ON CONFLICT (target) (MySQL) upsert without unique_fields"""
+        with mock.patch.object(connection.features, 'supports_update_conflicts_with_target', False), \
+                mock.patch.object(SkillPopularity.objects, 'bulk_create') as bulk_create:
+            summaries.refresh_skills([self.guitar.id])
+        args, kwargs = bulk_create.call_args
+        self.assertEqual([row.skill_id for row in args[0]], [self.guitar.id])
+        self.assertNotIn('unique_fields', kwargs)
+        self.assertTrue(kwargs['update_conflicts'])
+        self.assertIn('teacher_count', kwargs['update_fields'])
@@ -0,0 +1,131 @@
+"""
+User skill set tests
+Tests removing a single skill and replacing the whole skill set with set-diff writes
+"""
+from django.test import TestCase, Client
+from django.contrib.auth.models import User
+from skillswap_app.models import Profile, Category, Skill, UserSkill
+from skillswap_app.signals import user_skills_changed
+import json
+
+
+class UserSkillSetTests(TestCase):
+    """Test remove-skill and replace-skill-set endpoints"""
+
+    def setUp(self):
+        """Set up a user with two skills"""
+        self.client = Client()
+        self.user = User.objects.create_user(username='skilluser', password='pass123')
+        Profile.objects.create(user=self.user)
+        self.category = Category.objects.create(name='Programming')
+        self.python = Skill.objects.create(name='Python', category=self.category)
+        self.django = Skill.objects.create(name='Django', category=self.category)
+        self.rust = Skill.objects.create(name='Rust', category=self.category)
+        UserSkill.objects.create(user=self.user, skill=self.python, can_teach=True, experience_level='Advanced')
+        UserSkill.objects.create(user=self.user, skill=self.django, can_teach=True, experience_level='Beginner')
+        self.client.force_login(self.user)
+
+        self.signals = []
+        user_skills_changed.connect(self._record_signal)
+
+    def tearDown(self):
+        user_skills_changed.disconnect(self._record_signal)
+
+    def _record_signal(self, sender, user, skill_ids, **kwargs):
+        self.signals.append((user.id, set(skill_ids)))
+
+    def _replace(self, skills):
+        return self.client.put('/api/profile/skills/',
+            json.dumps({'skills': skills}),
+            content_type='application/json'
+        )
+
+    # Remove skill
+
+    def test_remove_skill(self):
+        """Test removing a skill from the profile"""
+        response = self.client.post('/api/profile/remove-skill/',
+            json.dumps({'skill_id': self.python.id}),
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(UserSkill.objects.filter(user=self.user, skill=self.python).exists())
+
+    def test_remove_skill_not_in_profile(self):
+        """Test removing a skill the user does not have"""
+        response = self.client.post('/api/profile/remove-skill/',
+            json.dumps({'skill_id': self.rust.id}),
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_remove_skill_unauthenticated(self):
+        """Test removing a skill requires authentication"""
+        self.client.logout()
+        response = self.client.post('/api/profile/remove-skill/',
+            json.dumps({'skill_id': self.python.id}),
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 401)
+
+    # Replace skill set
+
+    def test_replace_applies_minimal_diff(self):
+        """Test that unchanged rows are untouched and others are deleted/created/updated"""
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self._replace([
+                {'skill_id': self.python.id, 'can_teach': True, 'experience_level': 'Advanced'},
+                {'skill_id': self.django.id, 'can_teach': False, 'experience_level': 'Beginner'},
+                {'skill_id': self.rust.id, 'can_teach': True, 'experience_level': 'Intermediate'},
+            ])
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual((data['created'], data['updated'], data['deleted']), (1, 1, 0))
+        self.assertFalse(UserSkill.objects.get(user=self.user, skill=self.django).can_teach)
+        self.assertTrue(UserSkill.objects.filter(user=self.user, skill=self.rust).exists())
+        self.assertEqual(self.signals, [(self.user.id, {self.django.id, self.rust.id})])
+
+    def test_replace_with_empty_set_deletes_all(self):
+        """Test that submitting an empty set clears the profile"""
+        response = self._replace([])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['deleted'], 2)
+        self.assertFalse(UserSkill.objects.filter(user=self.user).exists())
+
+    def test_replace_unchanged_set_issues_no_writes(self):
+        """Test that resubmitting the same set only reads and fires no invalidation"""
+        skills = [
+            {'skill_id': self.python.id, 'can_teach': True, 'experience_level': 'Advanced'},
+            {'skill_id': self.django.id, 'can_teach': True, 'experience_level': 'Beginner'},
+        ]
+        # session, user, skill validation, locked read and session save (plus savepoints)
+        with self.captureOnCommitCallbacks(execute=True), self.assertNumQueries(9):
+            response = self._replace(skills)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.signals, [])
+
+    def test_replace_unknown_skill(self):
+        """Test that unknown skill ids are rejected without writing"""
+        response = self._replace([{'skill_id': 99999}])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(UserSkill.objects.filter(user=self.user).count(), 2)
+
+    def test_replace_invalid_experience_level(self):
+        """Test that invalid experience levels are rejected"""
+        response = self._replace([{'skill_id': self.rust.id, 'experience_level': 'Guru'}])
+        self.assertEqual(response.status_code, 400)
+
+    def test_replace_requires_list(self):
+        """Test that a non-list skills payload is rejected"""
+        response = self.client.put('/api/profile/skills/',
+            json.dumps({'skills': 'Python'}),
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_replace_does_not_touch_other_users(self):
+        """Test that replacing a skill set leaves other users' skills alone"""
+        other = User.objects.create_user(username='other', password='pass123')
+        UserSkill.objects.create(user=other, skill=self.python)
+        self._replace([])
+        self.assertTrue(UserSkill.objects.filter(user=other, skill=self.python).exists())
@@ -5,6 +5,9 @@ from . import views
 urlpatterns = [
     # Health check
     path('health/', views.health_check, name='health_check'),
+    path('health/live/', views.liveness, name='liveness'),
+    path('health/ready/', views.readiness, name='readiness'),
+    path('cache/stats/', views.cache_stats, name='cache_stats'),
 
     # Authentication
     path('auth/register/', views.register, name='register'),
@@ -15,17 +18,26 @@ urlpatterns = [
     path('profile/', views.get_profile, name='get_profile'),
     path('profile/update/', views.update_profile, name='update_profile'),
     path('profile/add-skill/', views.add_user_skill, name='add_user_skill'),
+    path('profile/remove-skill/', views.remove_user_skill, name='remove_user_skill'),
+    path('profile/skills/', views.replace_user_skills, name='replace_user_skills'),
     
     # Skills and categories
     path('categories/', views.get_categories, name='get_categories'),
     path('skills/', views.get_skills, name='get_skills'),
     path('skills/browse/', views.browse_skills, name='browse_skills'),
+    path('skills/trending/', views.trending_skills, name='trending_skills'),
+    path('skills/in-demand/', views.in_demand_skills, name='in_demand_skills'),
+    path('users/top-teachers/', views.top_teachers, name='top_teachers'),
     
     # Swap requests
     path('requests/', views.get_swap_requests, name='get_swap_requests'),
     path('requests/send/', views.send_swap_request, name='send_swap_request'),
     path('requests/<int:request_id>/update/', views.update_swap_request, name='update_swap_request'),
     
+    # Analytics (staff only)
+    path('analytics/', views.analytics_reports, name='analytics_reports'),
+    path('analytics/<slug:report>/', views.analytics_report, name='analytics_report'),
+    
     # Reviews
     path('reviews/create/', views.create_review, name='create_review'),
     path('reviews/user/<int:user_id>/', views.get_reviews, name='get_reviews'),
@@ -0,0 +1,74 @@
+# backend/skillswap_app/versions.py
+import hashlib
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from .models import DataVersion
+
+# Version groups. Catalog covers categories and skills, teachers covers
+# everything else that shows up in browse results (user skills, profile
+# locations and review ratings).
+CATALOG = 'catalog'
+TEACHERS = 'teachers'
+# Bumped by analytics.rebuild(); its updated_at is the rollups' "as of" time
+ROLLUPS = 'rollups'
+
+
+def get_versions(*names):
+    """Current version of each group, in the order given, in one query"""
+    found = dict(DataVersion.objects.filter(name__in=names).values_list('name', 'version'))
+    return tuple(found.get(name, 0) for name in names)
+
+
+def request_versions(request, names):
+    """get_versions() once per request, shared by the ETag and the response cache"""
+    memo = request.__dict__.setdefault('_data_versions', {})
+    if names not in memo:
+        memo[names] = get_versions(*names)
+    return memo[names]
+
+
+def bump(*names):
+    """Increment the given version groups. Runs inside the caller's transaction
+
+    Writers should use bump_on_commit(): every write to a group updates the
+    same row, so bumping inside a long transaction serializes all of them.
+    """
+    for name in names:
+        if DataVersion.objects.filter(name=name).update(version=F('version') + 1):
+            continue
+        try:
+            with transaction.atomic():
+                DataVersion.objects.create(name=name, version=1)
+        except IntegrityError:
+            # Someone else created the row first
+            DataVersion.objects.filter(name=name).update(version=F('version') + 1)
+
+
+def bump_on_commit(*names):
+    """bump() once the current transaction commits (right away outside one)
+
+    The row lock is then held for a single autocommitted UPDATE instead of
+    until the writer commits. Until it lands, requests can still match the
+    previous ETag, the same short window as the after-commit cache
+    invalidation.
+    """
+    transaction.on_commit(lambda: bump(*names))
+
+
+def etag_func(*names):
+    """Build an etag_func for @condition from the version groups a view reads
+
+    The ETag depends only on the path, the query string and the versions,
+    so it is known before the view runs its main query.
+    """
+    def compute_etag(request, *args, **kwargs):
+        return make_etag(request, request_versions(request, names))
+    return compute_etag
+
+
+def make_etag(request, versions):
+    query = sorted(request.GET.lists())
+    raw = f'{request.path}|{query}|{versions}'
+    return '"%s"' % hashlib.sha1(raw.encode()).hexdigest()
@@ -1,19 +1,26 @@
 # backend/skillswap_app/views.py
-from django.http import JsonResponse
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.models import User
 from django.views.decorators.csrf import csrf_exempt
-from django.views.decorators.http import require_http_methods
+from django.views.decorators.http import require_http_methods, condition
+from django.db import transaction
 from django.db.models import Q, Avg, Count
 from django.conf import settings
+from django.http import HttpResponse
 import json
+import os
 
-from .models import Profile, Category, Skill, UserSkill, SwapRequest, Review
+from .models import (
+    Profile, Category, Skill, UserSkill, SwapRequest, Review, Location, SkillPopularity, UserSummary
+)
+from .responses import FastJsonResponse
+from .signals import user_skills_changed, skill_set_update
+from . import analytics, cache, geo, health, metrics, outbox, profiler, versions
 
 @require_http_methods(["GET"])
 def health_check(request):
-    """Health check endpoint for debugging"""
-    return JsonResponse({
+    """Settings summary for debugging (probes use liveness / readiness)"""
+    return FastJsonResponse({
         'status': 'healthy',
         'debug_mode': settings.DEBUG,
         'session_cookie_samesite': getattr(settings, 'SESSION_COOKIE_SAMESITE', 'Not set'),
@@ -22,6 +29,17 @@ def health_check(request):
         'csrf_trusted_origins': getattr(settings, 'CSRF_TRUSTED_ORIGINS', []),
     })
 
+@require_http_methods(["GET", "HEAD"])
+def liveness(request):
+    """Liveness probe: the process answers (served by HealthCheckMiddleware)"""
+    return FastJsonResponse({'status': 'alive'})
+
+@require_http_methods(["GET", "HEAD"])
+def readiness(request):
+    """Readiness probe: database, migrations and cache (served by HealthCheckMiddleware)"""
+    result = health.readiness.check()
+    return FastJsonResponse(result, status=200 if result['status'] == 'ready' else 503)
+
 @csrf_exempt
 @require_http_methods(["POST"])
 def register(request):
@@ -33,14 +51,14 @@ def register(request):
         password = data.get('password')
         
         if User.objects.filter(username=username).exists():
-            return JsonResponse({'error': 'Username already exists'}, status=400)
+            return FastJsonResponse({'error': 'Username already exists'}, status=400)
         
         user = User.objects.create_user(username=username, email=email, password=password)
         Profile.objects.create(user=user)  # Create profile automatically
         
-        return JsonResponse({'message': 'User registered successfully', 'user_id': user.id})
+        return FastJsonResponse({'message': 'User registered successfully', 'user_id': user.id})
     except Exception as e:
-        return JsonResponse({'error': str(e)}, status=400)
+        return FastJsonResponse({'error': str(e)}, status=400)
 
 @csrf_exempt
 @require_http_methods(["POST"])
@@ -55,7 +73,7 @@ def user_login(request):
         if user:
             login(request, user)
             profile = Profile.objects.get(user=user)
-            return JsonResponse({
+            return FastJsonResponse({
                 'message': 'Login successful',
                 'user': {
                     'id': user.id,
@@ -66,21 +84,21 @@ def user_login(request):
                 }
             })
         else:
-            return JsonResponse({'error': 'Invalid credentials'}, status=401)
+            return FastJsonResponse({'error': 'Invalid credentials'}, status=401)
     except Exception as e:
-        return JsonResponse({'error': str(e)}, status=400)
+        return FastJsonResponse({'error': str(e)}, status=400)
 
 @require_http_methods(["POST"])
 def user_logout(request):
     """User logout"""
     logout(request)
-    return JsonResponse({'message': 'Logout successful'})
+    return FastJsonResponse({'message': 'Logout successful'})
 
 @require_http_methods(["GET"])
 def get_profile(request):
     """Get current user's profile"""
     if not request.user.is_authenticated:
-        return JsonResponse({'error': 'Not authenticated'}, status=401)
+        return FastJsonResponse({'error': 'Not authenticated'}, status=401)
     
     try:
         profile = Profile.objects.get(user=request.user)
@@ -94,24 +112,26 @@ def get_profile(request):
             'experience_level': us.experience_level
         } for us in user_skills]
         
-        return JsonResponse({
+        return FastJsonResponse({
             'id': request.user.id,
             'username': request.user.username,
             'email': request.user.email,
             'bio': profile.bio,
             'location': profile.location,
+            'latitude': profile.latitude,
+            'longitude': profile.longitude,
             'phone': profile.phone,
             'skills': skills_data
         })
     except Profile.DoesNotExist:
-        return JsonResponse({'error': 'Profile not found'}, status=404)
+        return FastJsonResponse({'error': 'Profile not found'}, status=404)
 
 @csrf_exempt
 @require_http_methods(["POST"])
 def update_profile(request):
     """Update user profile"""
     if not request.user.is_authenticated:
-        return JsonResponse({'error': 'Not authenticated'}, status=401)
+        return FastJsonResponse({'error': 'Not authenticated'}, status=401)
     
     try:
         data = json.loads(request.body)
@@ -120,19 +140,31 @@ def update_profile(request):
         profile.bio = data.get('bio', profile.bio)
         profile.location = data.get('location', profile.location)
         profile.phone = data.get('phone', profile.phone)
+        for field, limit in (('latitude', 90), ('longitude', 180)):
+            if field in data:
+                value = None if data[field] is None else float(data[field])
+                if value is not None and not -limit <= value <= limit:
+                    return FastJsonResponse({'error': f'{field} must be between -{limit} and {limit}'}, status=400)
+                setattr(profile, field, value)
         profile.save()
         
-        return JsonResponse({'message': 'Profile updated successfully'})
+        return FastJsonResponse({'message': 'Profile updated successfully'})
     except Exception as e:
-        return JsonResponse({'error': str(e)}, status=400)
+        return FastJsonResponse({'error': str(e)}, status=400)
 
 @require_http_methods(["GET"])
+@condition(etag_func=versions.etag_func(versions.CATALOG))
+@cache.cached_response('get_categories', cache.no_params, cache.catalog_tags, (versions.CATALOG,),
+                       anonymous_only=False)
 def get_categories(request):
     """Get all skill categories"""
     categories = Category.objects.all().values('id', 'name', 'description')
-    return JsonResponse({'categories': list(categories)})
+    return FastJsonResponse({'categories': list(categories)})
 
 @require_http_methods(["GET"])
+@condition(etag_func=versions.etag_func(versions.CATALOG))
+@cache.cached_response('get_skills', cache.skills_params, cache.catalog_tags, (versions.CATALOG,),
+                       anonymous_only=False)
 def get_skills(request):
     """Get skills, optionally filtered by category"""
     category_id = request.GET.get('category_id')
@@ -154,9 +186,12 @@ def get_skills(request):
         'description': skill.description
     } for skill in skills]
     
-    return JsonResponse({'skills': skills_data})
+    return FastJsonResponse({'skills': skills_data})
 
 @require_http_methods(["GET"])
+@condition(etag_func=versions.etag_func(versions.CATALOG, versions.TEACHERS))
+@cache.cached_response('browse_skills', cache.browse_params, cache.browse_tags,
+                       (versions.CATALOG, versions.TEACHERS))
 def browse_skills(request):
     """Browse skills with teachers and filters"""
     from django.db.models import Subquery, OuterRef
@@ -164,6 +199,20 @@ def browse_skills(request):
     location = request.GET.get('location', '')
     category_id = request.GET.get('category_id')
     search = request.GET.get('search', '')
+    origin = None
+
+    if any(request.GET.get(param) for param in ('lat', 'lon', 'radius_km')):
+        try:
+            lat = float(request.GET['lat'])
+            lon = float(request.GET['lon'])
+            radius_km = float(request.GET.get('radius_km', geo.DEFAULT_RADIUS_KM))
+        except (KeyError, ValueError):
+            return FastJsonResponse({'error': 'lat, lon and radius_km must be numbers'}, status=400)
+        if not (-90 <= lat <= 90 and -180 <= lon <= 180 and 0 < radius_km <= geo.MAX_RADIUS_KM):
+            return FastJsonResponse(
+                {'error': f'lat/lon out of range or radius_km not in (0, {geo.MAX_RADIUS_KM:g}]'}, status=400
+            )
+        origin = (lat, lon, radius_km)
 
     # Pre-calculate average ratings for all users in a single query
     user_ratings = Review.objects.filter(to_user=OuterRef('user')).values('to_user').annotate(
@@ -178,7 +227,18 @@ def browse_skills(request):
     )
 
     if location:
-        skills_query = skills_query.filter(user__profile__location__icontains=location)
+        # Known places filter on the indexed canonical id; anything the alias
+        # map does not know (e.g. partial input) falls back to a text match
+        location_id = Location.objects.resolve(location)
+        if location_id:
+            skills_query = skills_query.filter(user__profile__canonical_location_id=location_id)
+        else:
+            skills_query = skills_query.filter(user__profile__location__icontains=location)
+
+    if origin is not None:
+        # Candidate cells stay in SQL as a subquery; exact distances are
+        # checked below for the rows actually returned
+        skills_query = skills_query.filter(user_id__in=Profile.objects.near(*origin).values('user_id'))
 
     if category_id:
         skills_query = skills_query.filter(skill__category_id=category_id)
@@ -191,6 +251,11 @@ def browse_skills(request):
     # Group by skill and collect teachers
     skills_dict = {}
     for user_skill in skills_query:
+        if origin is not None:
+            profile = user_skill.user.profile
+            distance = geo.haversine_km(origin[0], origin[1], profile.latitude, profile.longitude)
+            if distance > origin[2]:
+                continue
         skill_id = user_skill.skill.id
         if skill_id not in skills_dict:
             skills_dict[skill_id] = {
@@ -204,22 +269,201 @@ def browse_skills(request):
         # Use pre-calculated rating from annotation
         avg_rating = user_skill.teacher_avg_rating or 0
 
-        skills_dict[skill_id]['teachers'].append({
+        teacher = {
             'id': user_skill.user.id,
             'username': user_skill.user.username,
             'location': user_skill.user.profile.location,
             'experience_level': user_skill.experience_level,
             'avg_rating': round(avg_rating, 1)
-        })
+        }
+        if origin is not None:
+            teacher['distance_km'] = round(distance, 1)
+        skills_dict[skill_id]['teachers'].append(teacher)
+
+    return FastJsonResponse({'skills': list(skills_dict.values())})
+
+def _limit_param(request, default=10, maximum=100):
+    """?limit= clamped to [1, maximum]; None if it is not a number"""
+    try:
+        return min(max(int(request.GET.get('limit', default)), 1), maximum)
+    except ValueError:
+        return None
+
+@require_http_methods(["GET"])
+def trending_skills(request):
+    """Most requested skills, from the skill_popularity table"""
+    limit = _limit_param(request)
+    if limit is None:
+        return FastJsonResponse({'error': 'limit must be a number'}, status=400)
+    
+    rows = SkillPopularity.objects.select_related('skill__category').filter(
+        request_count__gt=0
+    ).order_by('-request_count', '-teacher_count')[:limit]
+    
+    return FastJsonResponse({'skills': [{
+        'id': row.skill_id,
+        'name': row.skill.name,
+        'category': row.skill.category.name,
+        'teacher_count': row.teacher_count,
+        'request_count': row.request_count,
+        'completed_count': row.completed_count,
+        'avg_rating': round(row.avg_rating, 1) if row.avg_rating is not None else None,
+    } for row in rows]})
+
+@require_http_methods(["GET"])
+def in_demand_skills(request):
+    """Skills with the most open requests per available teacher"""
+    limit = _limit_param(request)
+    if limit is None:
+        return FastJsonResponse({'error': 'limit must be a number'}, status=400)
+    
+    # Top-k straight off the (-demand_gap, -pending_count) index
+    rows = SkillPopularity.objects.select_related('skill__category').filter(
+        demand_gap__gt=0
+    ).order_by('-demand_gap', '-pending_count')[:limit]
+    
+    return FastJsonResponse({'skills': [{
+        'id': row.skill_id,
+        'name': row.skill.name,
+        'category': row.skill.category.name,
+        'pending_requests': row.pending_count,
+        'accepted_requests': row.accepted_count,
+        'teacher_count': row.teacher_count,
+        'demand_gap': row.demand_gap,
+    } for row in rows]})
+
+@require_http_methods(["GET"])
+def top_teachers(request):
+    """Best rated teachers, from the user_summary table"""
+    limit = _limit_param(request)
+    try:
+        min_reviews = max(int(request.GET.get('min_reviews', 1)), 1)
+    except ValueError:
+        min_reviews = None
+    if limit is None or min_reviews is None:
+        return FastJsonResponse({'error': 'limit and min_reviews must be numbers'}, status=400)
+    
+    rows = UserSummary.objects.select_related('user').filter(
+        skills_count__gt=0, reviews_received__gte=min_reviews
+    ).order_by('-avg_rating', '-reviews_received')[:limit]
+    
+    return FastJsonResponse({'teachers': [{
+        'id': row.user_id,
+        'username': row.user.username,
+        'location': row.location,
+        'skills_count': row.skills_count,
+        'reviews_received': row.reviews_received,
+        'avg_rating': round(row.avg_rating, 1),
+    } for row in rows]})
+
+def _staff_error(request):
+    if not request.user.is_authenticated:
+        return FastJsonResponse({'error': 'Not authenticated'}, status=401)
+    if not request.user.is_staff:
+        return FastJsonResponse({'error': 'Staff only'}, status=403)
+    return None
+
+@require_http_methods(["GET"])
+def analytics_reports(request):
+    """List the analytics reports"""
+    error = _staff_error(request)
+    if error:
+        return error
+    
+    return FastJsonResponse({
+        'reports': [{'name': name, 'description': func.__doc__} for name, func in analytics.REPORTS.items()],
+        'rollups_as_of': analytics.rollups_as_of(),
+    })
+
+@require_http_methods(["GET"])
+def analytics_report(request, report):
+    """Run one analytics report (staff only)"""
+    error = _staff_error(request)
+    if error:
+        return error
+    
+    func = analytics.REPORTS.get(report)
+    if func is None:
+        return FastJsonResponse({'error': 'Unknown report', 'reports': list(analytics.REPORTS)}, status=404)
+    limit = _limit_param(request, default=20)
+    if limit is None:
+        return FastJsonResponse({'error': 'limit must be a number'}, status=400)
+    
+    try:
+        rows = func(request.GET, limit)
+    except analytics.ReportError as e:
+        return FastJsonResponse({'error': str(e)}, status=400)
+    
+    return FastJsonResponse({'report': report, 'rows': rows, 'rollups_as_of': analytics.rollups_as_of()})
+
+@csrf_exempt
+@require_http_methods(["POST"])
+def start_profiler(request):
+    """Sample the stacks of the worker serving this request for ?seconds= (staff only)"""
+    error = _staff_error(request)
+    if error:
+        return error
+    
+    try:
+        seconds = float(request.GET.get('seconds', 10))
+    except ValueError:
+        return FastJsonResponse({'error': 'seconds must be a number'}, status=400)
+    if seconds <= 0:
+        return FastJsonResponse({'error': 'seconds must be positive'}, status=400)
+    
+    path = profiler.start_worker_profile(seconds)
+    if path is None:
+        return FastJsonResponse({'error': 'A profile is already running in this worker'}, status=409)
+    return FastJsonResponse({
+        'pid': os.getpid(),
+        'seconds': min(seconds, settings.PROFILER_MAX_SECONDS),
+        'file': path,
+    }, status=202)
+
+@require_http_methods(["GET"])
+def profiler_token(request):
+    """Signed ?_profile= token for profiling single requests to ?path= (staff only)"""
+    error = _staff_error(request)
+    if error:
+        return error
+    
+    path = request.GET.get('path', '')
+    if not path.startswith('/'):
+        return FastJsonResponse({'error': 'path must be an absolute URL path'}, status=400)
+    token = profiler.make_token(path)
+    return FastJsonResponse({
+        'token': token,
+        'expires_in': settings.PROFILER_TOKEN_MAX_AGE,
+        'url': f'{path}?{profiler.QUERY_PARAM}={token}',
+    })
+
+@require_http_methods(["GET"])
+def cache_stats(request):
+    """Response cache hit/miss counters"""
+    error = _staff_error(request)
+    if error:
+        return error
+    return FastJsonResponse({'caches': cache.get_stats(['browse_skills', 'get_skills', 'get_categories'])})
+
+@require_http_methods(["GET"])
+def prometheus_metrics(request):
+    """Prometheus metrics summed over all worker processes
 
-    return JsonResponse({'skills': list(skills_dict.values())})
+    Open without a METRICS_TOKEN only under DEBUG; in production the token is required.
+    """
+    token = settings.METRICS_TOKEN
+    if not token and not settings.DEBUG:
+        return FastJsonResponse({'error': 'Metrics require METRICS_TOKEN'}, status=403)
+    if token and request.headers.get('Authorization') != f'Bearer {token}':
+        return FastJsonResponse({'error': 'Not authenticated'}, status=401)
+    return HttpResponse(metrics.render(metrics.collect()), content_type='text/plain; version=0.0.4; charset=utf-8')
 
 @csrf_exempt
 @require_http_methods(["POST"])
 def send_swap_request(request):
     """Send a skill swap request"""
     if not request.user.is_authenticated:
-        return JsonResponse({'error': 'Not authenticated'}, status=401)
+        return FastJsonResponse({'error': 'Not authenticated'}, status=401)
     
     try:
         data = json.loads(request.body)
@@ -237,35 +481,40 @@ def send_swap_request(request):
         ).exists()
         
         if existing:
-            return JsonResponse({'error': 'Request already sent'}, status=400)
+            return FastJsonResponse({'error': 'Request already sent'}, status=400)
         
-        swap_request = SwapRequest.objects.create(
-            from_user=request.user,
-            to_user_id=to_user_id,
-            requested_skill_id=requested_skill_id,
-            offered_skill_id=offered_skill_id,
-            message=message
-        )
+        # Atomic so the outbox event commits (or not) with the row
+        with transaction.atomic():
+            swap_request = SwapRequest.objects.create(
+                from_user=request.user,
+                to_user_id=to_user_id,
+                requested_skill_id=requested_skill_id,
+                offered_skill_id=offered_skill_id,
+                message=message
+            )
         
-        return JsonResponse({'message': 'Swap request sent', 'request_id': swap_request.id})
+        return FastJsonResponse({'message': 'Swap request sent', 'request_id': swap_request.id})
     except Exception as e:
-        return JsonResponse({'error': str(e)}, status=400)
+        return FastJsonResponse({'error': str(e)}, status=400)
 
 @require_http_methods(["GET"])
 def get_swap_requests(request):
     """Get user's swap requests (sent and received)"""
     if not request.user.is_authenticated:
-        return JsonResponse({'error': 'Not authenticated'}, status=401)
+        return FastJsonResponse({'error': 'Not authenticated'}, status=401)
     
     # Sent requests
     sent = SwapRequest.objects.filter(from_user=request.user).select_related(
         'to_user__profile', 'requested_skill', 'offered_skill'
-    )
+    ).order_by('-created_at')
     
     # Received requests
     received = SwapRequest.objects.filter(to_user=request.user).select_related(
         'from_user__profile', 'requested_skill', 'offered_skill'
-    )
+    ).order_by('-created_at')
+    status = request.GET.get('status')
+    if status:
+        received = received.filter(status=status)
     
     sent_data = [{
         'id': req.id,
@@ -274,7 +523,7 @@ def get_swap_requests(request):
         'offered_skill': req.offered_skill.name if req.offered_skill else None,
         'message': req.message,
         'status': req.status,
-        'created_at': req.created_at.isoformat()
+        'created_at': req.created_at
     } for req in sent]
     
     received_data = [{
@@ -284,10 +533,10 @@ def get_swap_requests(request):
         'offered_skill': req.offered_skill.name if req.offered_skill else None,
         'message': req.message,
         'status': req.status,
-        'created_at': req.created_at.isoformat()
+        'created_at': req.created_at
     } for req in received]
     
-    return JsonResponse({
+    return FastJsonResponse({
         'sent_requests': sent_data,
         'received_requests': received_data
     })
@@ -297,7 +546,7 @@ def get_swap_requests(request):
 def update_swap_request(request, request_id):
     """Accept/reject a swap request"""
     if not request.user.is_authenticated:
-        return JsonResponse({'error': 'Not authenticated'}, status=401)
+        return FastJsonResponse({'error': 'Not authenticated'}, status=401)
     
     try:
         data = json.loads(request.body)
@@ -305,20 +554,21 @@ def update_swap_request(request, request_id):
         
         swap_request = SwapRequest.objects.get(id=request_id, to_user=request.user)
         swap_request.status = status
-        swap_request.save()
+        with transaction.atomic():
+            swap_request.save()
         
-        return JsonResponse({'message': f'Request {status}'})
+        return FastJsonResponse({'message': f'Request {status}'})
     except SwapRequest.DoesNotExist:
-        return JsonResponse({'error': 'Request not found'}, status=404)
+        return FastJsonResponse({'error': 'Request not found'}, status=404)
     except Exception as e:
-        return JsonResponse({'error': str(e)}, status=400)
+        return FastJsonResponse({'error': str(e)}, status=400)
 
 @csrf_exempt
 @require_http_methods(["POST"])
 def create_review(request):
     """Create a review after completed swap"""
     if not request.user.is_authenticated:
-        return JsonResponse({'error': 'Not authenticated'}, status=401)
+        return FastJsonResponse({'error': 'Not authenticated'}, status=401)
     
     try:
         data = json.loads(request.body)
@@ -335,21 +585,22 @@ def create_review(request):
         
         # Check if review already exists
         if Review.objects.filter(from_user=request.user, swap_request=swap_request).exists():
-            return JsonResponse({'error': 'Review already exists'}, status=400)
+            return FastJsonResponse({'error': 'Review already exists'}, status=400)
         
-        review = Review.objects.create(
-            from_user=request.user,
-            to_user=swap_request.to_user,
-            swap_request=swap_request,
-            rating=rating,
-            comment=comment
-        )
+        with transaction.atomic():
+            review = Review.objects.create(
+                from_user=request.user,
+                to_user=swap_request.to_user,
+                swap_request=swap_request,
+                rating=rating,
+                comment=comment
+            )
         
-        return JsonResponse({'message': 'Review created', 'review_id': review.id})
+        return FastJsonResponse({'message': 'Review created', 'review_id': review.id})
     except SwapRequest.DoesNotExist:
-        return JsonResponse({'error': 'Swap request not found or not completed'}, status=404)
+        return FastJsonResponse({'error': 'Swap request not found or not completed'}, status=404)
     except Exception as e:
-        return JsonResponse({'error': str(e)}, status=400)
+        return FastJsonResponse({'error': str(e)}, status=400)
 
 @require_http_methods(["GET"])
 def get_reviews(request, user_id):
@@ -365,7 +616,7 @@ def get_reviews(request, user_id):
             'rating': review.rating,
             'comment': review.comment,
             'skill': review.swap_request.requested_skill.name,
-            'created_at': review.created_at.isoformat()
+            'created_at': review.created_at
         } for review in reviews]
         
         # Calculate average rating
@@ -373,20 +624,20 @@ def get_reviews(request, user_id):
             avg_rating=Avg('rating')
         )['avg_rating'] or 0
         
-        return JsonResponse({
+        return FastJsonResponse({
             'reviews': reviews_data,
             'average_rating': round(avg_rating, 1),
             'total_reviews': len(reviews_data)
         })
     except Exception as e:
-        return JsonResponse({'error': str(e)}, status=400)
+        return FastJsonResponse({'error': str(e)}, status=400)
 
 @csrf_exempt
 @require_http_methods(["POST"])
 def add_user_skill(request):
     """Add a skill to user's profile"""
     if not request.user.is_authenticated:
-        return JsonResponse({'error': 'Not authenticated'}, status=401)
+        return FastJsonResponse({'error': 'Not authenticated'}, status=401)
     
     try:
         data = json.loads(request.body)
@@ -394,20 +645,129 @@ def add_user_skill(request):
         can_teach = data.get('can_teach', True)
         experience_level = data.get('experience_level', 'Intermediate')
         
-        user_skill, created = UserSkill.objects.get_or_create(
-            user=request.user,
-            skill_id=skill_id,
-            defaults={
-                'can_teach': can_teach,
-                'experience_level': experience_level
-            }
-        )
+        with transaction.atomic():
+            user_skill, created = UserSkill.objects.get_or_create(
+                user=request.user,
+                skill_id=skill_id,
+                defaults={
+                    'can_teach': can_teach,
+                    'experience_level': experience_level
+                }
+            )
+            
+            if not created:
+                user_skill.can_teach = can_teach
+                user_skill.experience_level = experience_level
+                user_skill.save()
+        
+        return FastJsonResponse({'message': 'Skill added to profile'})
+    except Exception as e:
+        return FastJsonResponse({'error': str(e)}, status=400)
+
+@csrf_exempt
+@require_http_methods(["POST"])
+def remove_user_skill(request):
+    """Remove a skill from user's profile"""
+    if not request.user.is_authenticated:
+        return FastJsonResponse({'error': 'Not authenticated'}, status=401)
+    
+    try:
+        data = json.loads(request.body)
+        skill_id = data.get('skill_id')
         
-        if not created:
+        deleted, _ = UserSkill.objects.filter(user=request.user, skill_id=skill_id).delete()
+        if not deleted:
+            return FastJsonResponse({'error': 'Skill not found in profile'}, status=404)
+        
+        return FastJsonResponse({'message': 'Skill removed from profile'})
+    except Exception as e:
+        return FastJsonResponse({'error': str(e)}, status=400)
+
+def _diff_user_skills(existing, submitted):
+    """Split a submitted skill set into rows to delete, create and update.
+
+    ``existing`` maps skill_id -> UserSkill, ``submitted`` maps
+    skill_id -> (can_teach, experience_level). Rows whose values did not
+    change are left out entirely so they cost no writes.
+    """
+    to_delete = [us.id for skill_id, us in existing.items() if skill_id not in submitted]
+    to_create = []
+    to_update = []
+    for skill_id, (can_teach, experience_level) in submitted.items():
+        user_skill = existing.get(skill_id)
+        if user_skill is None:
+            to_create.append((skill_id, can_teach, experience_level))
+        elif (user_skill.can_teach, user_skill.experience_level) != (can_teach, experience_level):
             user_skill.can_teach = can_teach
             user_skill.experience_level = experience_level
-            user_skill.save()
+            to_update.append(user_skill)
+    return to_delete, to_create, to_update
+
+@csrf_exempt
+@require_http_methods(["PUT"])
+def replace_user_skills(request):
+    """Replace user's whole skill set with the submitted one"""
+    if not request.user.is_authenticated:
+        return FastJsonResponse({'error': 'Not authenticated'}, status=401)
+    
+    try:
+        data = json.loads(request.body)
+        skills = data.get('skills')
+        if not isinstance(skills, list):
+            return FastJsonResponse({'error': 'skills must be a list'}, status=400)
         
-        return JsonResponse({'message': 'Skill added to profile'})
+        levels = dict(UserSkill.EXPERIENCE_CHOICES)
+        submitted = {}
+        for item in skills:
+            try:
+                skill_id = int(item['skill_id'])
+            except (KeyError, TypeError, ValueError):
+                return FastJsonResponse({'error': 'Each skill needs a numeric skill_id'}, status=400)
+            experience_level = item.get('experience_level', 'Intermediate')
+            if experience_level not in levels:
+                return FastJsonResponse({'error': f'Invalid experience level: {experience_level}'}, status=400)
+            submitted[skill_id] = (bool(item.get('can_teach', True)), experience_level)
+        
+        known = set(Skill.objects.filter(id__in=submitted).values_list('id', flat=True))
+        unknown = sorted(set(submitted) - known)
+        if unknown:
+            return FastJsonResponse({'error': f'Unknown skill ids: {unknown}'}, status=400)
+        
+        with transaction.atomic(), skill_set_update():
+            existing = {
+                us.skill_id: us
+                for us in UserSkill.objects.select_for_update().filter(user=request.user)
+            }
+            to_delete, to_create, to_update = _diff_user_skills(existing, submitted)
+            
+            if to_delete:
+                UserSkill.objects.filter(id__in=to_delete).delete()
+            if to_create:
+                UserSkill.objects.bulk_create([
+                    UserSkill(user=request.user, skill_id=skill_id,
+                              can_teach=can_teach, experience_level=experience_level)
+                    for skill_id, can_teach, experience_level in to_create
+                ])
+            if to_update:
+                UserSkill.objects.bulk_update(to_update, ['can_teach', 'experience_level'])
+            
+            changed = (
+                {skill_id for skill_id in existing if skill_id not in submitted}
+                | {skill_id for skill_id, _, _ in to_create}
+                | {us.skill_id for us in to_update}
+            )
+            if changed:
+                user = request.user
+                outbox.publish('userskill.replaced', user.id, user_id=user.id, skill_ids=sorted(changed))
+                transaction.on_commit(lambda: user_skills_changed.send(
+                    sender=UserSkill, user=user, skill_ids=changed
+                ))
+        
+        return FastJsonResponse({
+            'message': 'Skills updated',
+            'created': len(to_create),
+            'updated': len(to_update),
+            'deleted': len(to_delete)
+        })
     except Exception as e:
-        return JsonResponse({'error': str(e)}, status=400)
+        return FastJsonResponse({'error': str(e)}, status=400)
@@ -1,18 +1,16 @@
 #backend/skillswap_project/settings.py
 
 import os
-import pymysql
 from pathlib import Path
-from dotenv import load_dotenv
-
-# Load environment variables from .env file
-load_dotenv()
-
-# Initialize PyMySQL
-pymysql.install_as_MySQLdb()
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# Load environment variables from .env file (local development only;
+# deployments set real environment variables and skip the import)
+if (BASE_DIR / '.env').exists():
+    from dotenv import load_dotenv
+    load_dotenv(BASE_DIR / '.env')
+
 # SECURITY WARNING: keep the secret key used in production secret!
 SECRET_KEY = os.environ.get('SECRET_KEY', 'django-insecure-demo-key-change-in-production')
 
@@ -20,7 +18,6 @@ SECRET_KEY = os.environ.get('SECRET_KEY', 'django-insecure-demo-key-change-in-pr
 # Handle DEBUG as string (case-insensitive) to avoid issues with different platforms
 DEBUG_ENV = os.environ.get('DEBUG', 'True').lower()
 DEBUG = DEBUG_ENV in ('true', '1', 'yes')
-print(f"🔧 Django DEBUG mode: {DEBUG} (from env: {DEBUG_ENV})")
 
 # Parse ALLOWED_HOSTS from environment variable (comma-separated)
 ALLOWED_HOSTS = os.environ.get('ALLOWED_HOSTS', 'localhost,127.0.0.1').split(',')
@@ -43,8 +40,12 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
-    'corsheaders.middleware.CorsMiddleware',  # Must be first
+    'skillswap_app.middleware.HealthCheckMiddleware',  # Probes answered before anything else runs
+    'corsheaders.middleware.CorsMiddleware',  # First after the probes
     'django.middleware.security.SecurityMiddleware',
+    'skillswap_app.middleware.MetricsMiddleware',  # Outside sessions/compression, see its docstring
+    'skillswap_app.middleware.ProfilerMiddleware',  # ?_profile=<signed token> samples one request
+    'skillswap_app.middleware.CompressionMiddleware',  # gzip/brotli for API responses
     'whitenoise.middleware.WhiteNoiseMiddleware',  # For serving static files in production
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -52,6 +53,8 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'skillswap_app.middleware.NPlusOneMiddleware',
+    'skillswap_app.middleware.InstrumentationMiddleware',  # Last, so it times the view itself
 ]
 
 ROOT_URLCONF = 'skillswap_project.urls'
@@ -91,9 +94,9 @@ DATABASES = {
 }
 
 # Parse DATABASE_URL if provided (for services like Render)
-import dj_database_url
 DATABASE_URL = os.environ.get('DATABASE_URL')
 if DATABASE_URL:
+    import dj_database_url
     DATABASES['default'] = dj_database_url.parse(DATABASE_URL) # type: ignore
 
 # Password validation
@@ -172,6 +175,160 @@ CORS_ALLOW_METHODS = [
     'PUT',
 ]
 
+# Cache - per-process memory by default. Several gunicorn workers need a
+# shared backend with atomic add (gunicorn.conf.py refuses to start them on
+# LocMemCache or FileBasedCache): Redis, Memcached, or the database with
+# CACHE_BACKEND=django.core.cache.backends.db.DatabaseCache,
+# CACHE_LOCATION=skillswap_cache and `manage.py createcachetable` at deploy.
+# Backends that cull (database, file, memory) drop entries, tags included,
+# past CACHE_MAX_ENTRIES
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', 'skillswap'),
+    }
+}
+if CACHES['default']['BACKEND'].rsplit('.', 2)[-2] in ('db', 'filebased', 'locmem'):
+    # Redis and memcached clients reject unknown options and evict by memory
+    CACHES['default']['OPTIONS'] = {'MAX_ENTRIES': int(os.environ.get('CACHE_MAX_ENTRIES', '100000'))}
+
+# Anonymous browse_skills and all catalog responses are cached per filter
+# combination and invalidated by signals when the underlying data changes
+RESPONSE_CACHE_ENABLED = os.environ.get('RESPONSE_CACHE_ENABLED', 'True').lower() in ('true', '1', 'yes')
+RESPONSE_CACHE_TIMEOUT = int(os.environ.get('RESPONSE_CACHE_TIMEOUT', '60'))
+
+# Stampede protection for cached hot queries: one worker recomputes an
+# expired entry while the others keep serving it for up to
+# CACHE_STALE_TIMEOUT seconds; entries are also refreshed slightly early
+# at random (higher beta = earlier)
+CACHE_STALE_TIMEOUT = int(os.environ.get('CACHE_STALE_TIMEOUT', '30'))
+CACHE_LOCK_TIMEOUT = int(os.environ.get('CACHE_LOCK_TIMEOUT', '10'))
+CACHE_EARLY_EXPIRY_BETA = float(os.environ.get('CACHE_EARLY_EXPIRY_BETA', '1.0'))
+
+# Response compression (gzip, plus brotli when the package is installed)
+# Bodies below COMPRESSION_MIN_SIZE bytes are not worth the CPU and go out as-is
+COMPRESSION_ENABLED = os.environ.get('COMPRESSION_ENABLED', 'True').lower() in ('true', '1', 'yes')
+COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', '1024'))
+COMPRESSION_ENCODINGS = [enc.strip() for enc in os.environ.get('COMPRESSION_ENCODINGS', 'br,gzip').split(',')]
+COMPRESSION_GZIP_LEVEL = int(os.environ.get('COMPRESSION_GZIP_LEVEL', '6'))
+COMPRESSION_BROTLI_QUALITY = int(os.environ.get('COMPRESSION_BROTLI_QUALITY', '5'))
+COMPRESSION_STREAMING = True
+
+# Per-request instrumentation: DB query count/time, view and serialization
+# time as a Server-Timing header, plus sampled JSON log lines (slow requests
+# are always logged). Disabled, the middleware is removed at startup
+INSTRUMENTATION_ENABLED = os.environ.get('INSTRUMENTATION_ENABLED', 'False').lower() in ('true', '1', 'yes')
+INSTRUMENTATION_SERVER_TIMING = os.environ.get('INSTRUMENTATION_SERVER_TIMING', 'True').lower() in ('true', '1', 'yes')
+INSTRUMENTATION_LOG_SAMPLE_RATE = float(os.environ.get('INSTRUMENTATION_LOG_SAMPLE_RATE', '0.01'))
+INSTRUMENTATION_LOG_SLOW_MS = int(os.environ.get('INSTRUMENTATION_LOG_SLOW_MS', '500'))
+
+# Prometheus metrics at /metrics: each worker process writes its values to
+# METRICS_DIR (at most every METRICS_FLUSH_INTERVAL seconds) and the
+# endpoint sums them. Scrapers send "Authorization: Bearer <METRICS_TOKEN>";
+# without a token the endpoint is only served when DEBUG is on
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'True').lower() in ('true', '1', 'yes')
+METRICS_DIR = os.environ.get('METRICS_DIR') or os.environ.get('PROMETHEUS_MULTIPROC_DIR') or None
+METRICS_FLUSH_INTERVAL = float(os.environ.get('METRICS_FLUSH_INTERVAL', '1.0'))
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+
+# Sampling profiler (see skillswap_app/profiler.py): collapsed-stack files
+# for flamegraphs are written to PROFILER_DIR. kill -<PROFILER_SIGNAL> <pid>
+# profiles a worker for PROFILER_SIGNAL_SECONDS
+PROFILER_DIR = os.environ.get('PROFILER_DIR', str(BASE_DIR / 'profiles'))
+PROFILER_INTERVAL = float(os.environ.get('PROFILER_INTERVAL', '0.005'))
+PROFILER_REQUEST_INTERVAL = float(os.environ.get('PROFILER_REQUEST_INTERVAL', '0.001'))
+PROFILER_MAX_SECONDS = float(os.environ.get('PROFILER_MAX_SECONDS', '60'))
+PROFILER_SIGNAL = os.environ.get('PROFILER_SIGNAL', 'SIGUSR2')
+PROFILER_SIGNAL_SECONDS = float(os.environ.get('PROFILER_SIGNAL_SECONDS', '30'))
+PROFILER_TOKEN_MAX_AGE = int(os.environ.get('PROFILER_TOKEN_MAX_AGE', '600'))
+
+# Probes: /api/health/live/ checks nothing; /api/health/ready/ checks the
+# database, migrations and cache, waiting at most HEALTH_CHECK_TIMEOUT seconds
+# and reusing the result for HEALTH_CHECK_CACHE_SECONDS
+HEALTH_CHECK_TIMEOUT = float(os.environ.get('HEALTH_CHECK_TIMEOUT', '2'))
+HEALTH_CHECK_CACHE_SECONDS = float(os.environ.get('HEALTH_CHECK_CACHE_SECONDS', '5'))
+
+# Job queue (jobs.py): side effects of writes run in `manage.py run_jobs`.
+# JOBS_EAGER runs them after commit in the request instead (no worker needed)
+JOBS_EAGER = os.environ.get('JOBS_EAGER', 'False').lower() in ('true', '1', 'yes')
+JOBS_BATCH_SIZE = int(os.environ.get('JOBS_BATCH_SIZE', '100'))
+JOBS_LEASE_SECONDS = int(os.environ.get('JOBS_LEASE_SECONDS', '60'))
+JOBS_MAX_ATTEMPTS = int(os.environ.get('JOBS_MAX_ATTEMPTS', '5'))
+JOBS_RETRY_DELAY = float(os.environ.get('JOBS_RETRY_DELAY', '5'))
+JOBS_RETRY_MAX_DELAY = float(os.environ.get('JOBS_RETRY_MAX_DELAY', '3600'))
+JOBS_POLL_INTERVAL = float(os.environ.get('JOBS_POLL_INTERVAL', '1'))
+
+# Outbox (outbox.py): domain events relayed to subscribers by `manage.py relay_outbox`.
+# A gap in event ids is waited on for OUTBOX_GAP_TIMEOUT seconds (a transaction
+# may still commit it); events every subscriber has read are kept for
+# OUTBOX_RETENTION_DAYS
+OUTBOX_BATCH_SIZE = int(os.environ.get('OUTBOX_BATCH_SIZE', '500'))
+OUTBOX_POLL_INTERVAL = float(os.environ.get('OUTBOX_POLL_INTERVAL', '1'))
+OUTBOX_GAP_TIMEOUT = float(os.environ.get('OUTBOX_GAP_TIMEOUT', '10'))
+OUTBOX_RETENTION_DAYS = int(os.environ.get('OUTBOX_RETENTION_DAYS', '7'))
+
+# Notification digests (notifications.py): `manage.py send_digests` sends one
+# digest per user once their oldest pending notification is
+# NOTIFICATION_DIGEST_WINDOW seconds old, NOTIFICATION_BATCH_SIZE users at a time.
+# Transports: ...ConsoleTransport, ...FileTransport (NOTIFICATION_FILE), ...EmailTransport
+NOTIFICATION_TRANSPORT = os.environ.get('NOTIFICATION_TRANSPORT', 'skillswap_app.notifications.ConsoleTransport')
+NOTIFICATION_DIGEST_WINDOW = int(os.environ.get('NOTIFICATION_DIGEST_WINDOW', '3600'))
+NOTIFICATION_BATCH_SIZE = int(os.environ.get('NOTIFICATION_BATCH_SIZE', '200'))
+# A failed digest is retried after a backoff, then dropped after this many attempts
+NOTIFICATION_MAX_ATTEMPTS = int(os.environ.get('NOTIFICATION_MAX_ATTEMPTS', '5'))
+NOTIFICATION_FILE = os.environ.get('NOTIFICATION_FILE', str(BASE_DIR / 'logs' / 'notifications.jsonl'))
+
+# N+1 detection: a statement (parameters stripped) repeated more than
+# NPLUSONE_THRESHOLD times in one request is logged with the lines that ran
+# it, or raised as NPlusOneError (the test run below uses 'raise')
+NPLUSONE_ENABLED = os.environ.get('NPLUSONE_ENABLED', 'False').lower() in ('true', '1', 'yes')
+NPLUSONE_THRESHOLD = int(os.environ.get('NPLUSONE_THRESHOLD', '5'))
+NPLUSONE_ACTION = os.environ.get('NPLUSONE_ACTION', 'log')
+
+# Slow query log: statements over SLOW_QUERY_MS are written with their
+# parameters and calling view to a rotating file, and the first (or a
+# slower) occurrence of each SELECT gets its EXPLAIN captured in the
+# background. Staff can browse the worst offenders at /admin/slow-queries/
+SLOW_QUERY_LOG_ENABLED = os.environ.get('SLOW_QUERY_LOG_ENABLED', 'True').lower() in ('true', '1', 'yes')
+SLOW_QUERY_MS = float(os.environ.get('SLOW_QUERY_MS', '200'))
+SLOW_QUERY_EXPLAIN = os.environ.get('SLOW_QUERY_EXPLAIN', 'True').lower() in ('true', '1', 'yes')
+SLOW_QUERY_LOG_FILE = os.environ.get('SLOW_QUERY_LOG_FILE', str(BASE_DIR / 'logs' / 'slow_queries.log'))
+SLOW_QUERY_LOG_MAX_BYTES = int(os.environ.get('SLOW_QUERY_LOG_MAX_BYTES', str(5 * 1024 * 1024)))
+SLOW_QUERY_LOG_BACKUPS = int(os.environ.get('SLOW_QUERY_LOG_BACKUPS', '3'))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'message': {'format': '%(message)s'},
+    },
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+        'slow_queries': {
+            'class': 'logging.handlers.RotatingFileHandler',
+            'filename': SLOW_QUERY_LOG_FILE,
+            'maxBytes': SLOW_QUERY_LOG_MAX_BYTES,
+            'backupCount': SLOW_QUERY_LOG_BACKUPS,
+            'formatter': 'message',
+            'encoding': 'utf-8',
+            'delay': True,  # no file until the first slow query
+        },
+    },
+    'loggers': {
+        'skillswap_app': {
+            'handlers': ['console'],
+            'level': os.environ.get('APP_LOG_LEVEL', 'INFO'),
+        },
+        'skillswap_app.slow_queries': {
+            'handlers': ['slow_queries'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
+if SLOW_QUERY_LOG_ENABLED:
+    os.makedirs(os.path.dirname(SLOW_QUERY_LOG_FILE), exist_ok=True)
+
 # Session settings
 SESSION_COOKIE_AGE = 86400  # 24 hours
 SESSION_SAVE_EVERY_REQUEST = True
@@ -199,4 +356,19 @@ if 'test' in sys.argv:
             'ENGINE': 'django.db.backends.sqlite3',
             'NAME': ':memory:',
         }
-    }
\ No newline at end of file
+    }
+    # Test transactions are rolled back without firing invalidations, so
+    # only tests that exercise the response cache turn it on
+    RESPONSE_CACHE_ENABLED = False
+    NPLUSONE_ENABLED = True
+    NPLUSONE_ACTION = 'raise'
+    SLOW_QUERY_LOG_ENABLED = False
+    METRICS_ENABLED = False
+    # Side effects run after commit, as the existing tests expect;
+    # test_jobs turns this off to exercise the queue itself
+    JOBS_EAGER = True
+
+# Initialize PyMySQL, only when MySQL is the database actually in use
+if DATABASES['default']['ENGINE'] == 'django.db.backends.mysql':
+    import pymysql
+    pymysql.install_as_MySQLdb()
@@ -2,7 +2,14 @@
 from django.contrib import admin
 from django.urls import path, include
 
+from skillswap_app import views
+from skillswap_app.admin import slow_queries_view
+
 urlpatterns = [
+    path('admin/slow-queries/', admin.site.admin_view(slow_queries_view), name='slow_queries'),
+    path('admin/profiler/', views.start_profiler, name='start_profiler'),
+    path('admin/profiler/token/', views.profiler_token, name='profiler_token'),
     path('admin/', admin.site.urls),
     path('api/', include('skillswap_app.urls')),
+    path('metrics', views.prometheus_metrics, name='metrics'),
 ]
\ No newline at end of file
@@ -24,17 +24,41 @@ CREATE TABLE skills (
     INDEX idx_name (name)
 );
 
+-- Canonical places that profile locations resolve to
+CREATE TABLE locations (
+    id INT PRIMARY KEY AUTO_INCREMENT,
+    name VARCHAR(100) NOT NULL UNIQUE,
+    latitude DOUBLE NULL,
+    longitude DOUBLE NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Normalized spellings (case, accents, punctuation folded) -> location
+CREATE TABLE location_aliases (
+    id INT PRIMARY KEY AUTO_INCREMENT,
+    alias VARCHAR(100) NOT NULL UNIQUE,
+    location_id INT NOT NULL,
+    FOREIGN KEY (location_id) REFERENCES locations(id) ON DELETE CASCADE
+);
+
 -- User profiles (extends Django's built-in User model)
 CREATE TABLE profiles (
     id INT PRIMARY KEY AUTO_INCREMENT,
     user_id INT NOT NULL UNIQUE,
     bio TEXT,
     location VARCHAR(100),
+    canonical_location_id INT NULL,
+    latitude DOUBLE NULL,
+    longitude DOUBLE NULL,
+    geohash BIGINT NULL,  -- interleaved lat/lon bits, for radius range scans
     phone VARCHAR(20),
-    avatar_url VARCHAR(255),
+    avatar_url VARCHAR(200),
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-    INDEX idx_location (location)
+    FOREIGN KEY (canonical_location_id) REFERENCES locations(id) ON DELETE SET NULL,
+    INDEX idx_location (location),
+    INDEX idx_canonical_location (canonical_location_id),
+    INDEX idx_geohash (geohash)
 );
 
 -- Many-to-many: Users and Skills they can teach
@@ -49,7 +73,7 @@ CREATE TABLE user_skills (
     UNIQUE KEY unique_user_skill (user_id, skill_id),
     INDEX idx_user (user_id),
     INDEX idx_skill (skill_id),
-    INDEX idx_can_teach (can_teach)
+    INDEX idx_teachers (can_teach, skill_id, user_id)
 );
 
 -- Skill swap requests
@@ -68,7 +92,10 @@ CREATE TABLE swap_requests (
     INDEX idx_from_user (from_user_id),
     INDEX idx_to_user (to_user_id),
     INDEX idx_status (status),
-    INDEX idx_requested_skill (requested_skill_id)
+    INDEX idx_requested_skill (requested_skill_id),
+    INDEX idx_requested_skill_status (requested_skill_id, status),
+    INDEX idx_inbox (to_user_id, status, created_at),
+    INDEX idx_outbox (from_user_id, created_at)
 );
 
 -- Reviews and ratings after skill swaps
@@ -84,35 +111,125 @@ CREATE TABLE reviews (
     UNIQUE KEY unique_review (from_user_id, swap_request_id),
     INDEX idx_to_user (to_user_id),
     INDEX idx_rating (rating),
-    INDEX idx_swap_request (swap_request_id)
-);
-
--- Create views for complex queries (demo purposes)
-
--- View: Skills with categories and teacher counts
-CREATE VIEW skill_popularity AS
-SELECT 
-    s.id,
-    s.name as skill_name,
-    c.name as category_name,
-    COUNT(us.user_id) as teacher_count,
-    AVG(r.rating) as avg_rating
-FROM skills s
-LEFT JOIN categories c ON s.category_id = c.id
-LEFT JOIN user_skills us ON s.id = us.skill_id AND us.can_teach = TRUE
-LEFT JOIN swap_requests sr ON s.id = sr.requested_skill_id AND sr.status = 'completed'
-LEFT JOIN reviews r ON sr.id = r.swap_request_id
-GROUP BY s.id, s.name, c.name;
-
--- View: User profiles with skill counts and ratings
-CREATE VIEW user_summary AS
-SELECT 
-    p.user_id,
-    p.location,
-    COUNT(us.skill_id) as skills_count,
-    AVG(r.rating) as avg_rating,
-    COUNT(DISTINCT r.id) as reviews_received
-FROM profiles p
-LEFT JOIN user_skills us ON p.user_id = us.user_id AND us.can_teach = TRUE
-LEFT JOIN reviews r ON p.user_id = r.to_user_id
-GROUP BY p.user_id, p.location;
\ No newline at end of file
+    INDEX idx_swap_request (swap_request_id),
+    INDEX idx_to_user_created (to_user_id, created_at)
+);
+
+-- Summary tables (formerly views that re-aggregated four tables on every read).
+-- Owned by the Django models SkillPopularity / UserSummary: rows are refreshed
+-- incrementally on writes, and `python manage.py rebuild_summaries` recomputes all.
+
+-- Skills with teacher, request and rating counts
+CREATE TABLE skill_popularity (
+    skill_id INT PRIMARY KEY,
+    teacher_count INT NOT NULL DEFAULT 0,
+    learner_count INT NOT NULL DEFAULT 0,
+    request_count INT NOT NULL DEFAULT 0,
+    pending_count INT NOT NULL DEFAULT 0,
+    accepted_count INT NOT NULL DEFAULT 0,
+    completed_count INT NOT NULL DEFAULT 0,
+    review_count INT NOT NULL DEFAULT 0,
+    avg_rating DOUBLE NULL,
+    demand_gap INT NOT NULL DEFAULT 0,  -- pending + accepted - teacher_count
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    FOREIGN KEY (skill_id) REFERENCES skills(id) ON DELETE CASCADE,
+    INDEX idx_trending (request_count DESC, teacher_count DESC),
+    INDEX idx_teachers (teacher_count DESC),
+    INDEX idx_demand_gap (demand_gap DESC, pending_count DESC)
+);
+
+-- User profiles with skill counts and ratings
+CREATE TABLE user_summary (
+    user_id INT PRIMARY KEY,
+    location VARCHAR(100) NOT NULL DEFAULT '',
+    skills_count INT NOT NULL DEFAULT 0,
+    reviews_received INT NOT NULL DEFAULT 0,
+    avg_rating DOUBLE NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    INDEX idx_top_rated (avg_rating DESC, reviews_received DESC)
+);
+
+-- Analytics rollups, recomputed by `python manage.py rebuild_rollups`
+
+CREATE TABLE rollup_monthly_swaps (
+    id INT PRIMARY KEY AUTO_INCREMENT,
+    month DATE NOT NULL UNIQUE,
+    total INT NOT NULL DEFAULT 0,
+    pending INT NOT NULL DEFAULT 0,
+    accepted INT NOT NULL DEFAULT 0,
+    rejected INT NOT NULL DEFAULT 0,
+    completed INT NOT NULL DEFAULT 0
+);
+
+CREATE TABLE rollup_location_swaps (
+    id INT PRIMARY KEY AUTO_INCREMENT,
+    month DATE NOT NULL,
+    location VARCHAR(100) NOT NULL,
+    total INT NOT NULL DEFAULT 0,
+    pending INT NOT NULL DEFAULT 0,
+    completed INT NOT NULL DEFAULT 0,
+    UNIQUE KEY unique_month_location (month, location)
+);
+
+CREATE TABLE rollup_categories (
+    category_id INT PRIMARY KEY,
+    total_skills INT NOT NULL DEFAULT 0,
+    total_teachers INT NOT NULL DEFAULT 0,
+    total_requests INT NOT NULL DEFAULT 0,
+    total_reviews INT NOT NULL DEFAULT 0,
+    avg_rating DOUBLE NULL,
+    FOREIGN KEY (category_id) REFERENCES categories(id) ON DELETE CASCADE
+);
+
+-- Version counters behind the API's ETags
+CREATE TABLE data_versions (
+    id INT PRIMARY KEY AUTO_INCREMENT,
+    name VARCHAR(50) NOT NULL UNIQUE,
+    version BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+);
+
+-- Job queue for post-write side effects (`python manage.py run_jobs`)
+CREATE TABLE jobs (
+    id BIGINT PRIMARY KEY AUTO_INCREMENT,
+    name VARCHAR(100) NOT NULL,
+    payload JSON NOT NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'queued',  -- queued, running, failed
+    attempts INT NOT NULL DEFAULT 0,
+    run_after DATETIME(6) NOT NULL,
+    locked_by VARCHAR(100) NOT NULL DEFAULT '',
+    locked_until DATETIME(6) NULL,
+    last_error TEXT NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_due (status, run_after),
+    INDEX idx_leases (status, locked_until)
+);
+
+-- Transactional outbox of domain events (`python manage.py relay_outbox`)
+CREATE TABLE outbox (
+    id BIGINT PRIMARY KEY AUTO_INCREMENT,
+    topic VARCHAR(100) NOT NULL,
+    aggregate_id BIGINT NOT NULL,
+    payload JSON NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Position of each outbox subscriber
+CREATE TABLE outbox_cursors (
+    id INT PRIMARY KEY AUTO_INCREMENT,
+    name VARCHAR(100) NOT NULL UNIQUE,
+    position BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+);
+
+-- Notifications waiting for the recipient's next digest (`python manage.py send_digests`)
+CREATE TABLE notifications (
+    id BIGINT PRIMARY KEY AUTO_INCREMENT,
+    recipient_id INT NOT NULL,
+    kind VARCHAR(20) NOT NULL,  -- swap_request, review
+    payload JSON NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    attempts INT UNSIGNED NOT NULL DEFAULT 0,
+    retry_after DATETIME(6) NULL,
+    INDEX idx_recipient_created (recipient_id, created_at)
+);